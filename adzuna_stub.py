@@ -0,0 +1,124 @@
+import argparse
+import glob
+import json
+import os
+import random
+import re
+import threading
+import time
+from functools import lru_cache
+
+from flask import Flask, jsonify, request
+
+from benchmark import synthetic_jobs
+
+# Local stand-in for the Adzuna search API, for load tests and offline runs.
+# GET /v1/api/jobs/<country>/search/<page> answers like Adzuna: either pages
+# of generated postings (stable ids per role and page, so repeated syncs
+# dedupe) or pages of recorded responses replayed from a directory. Every
+# answer can be delayed and a share of them turned into 5xx errors or 429s.
+# Point the apps at it with
+#   ADZUNA_BASE_URL=http://127.0.0.1:8001/v1/api/jobs/in/search
+PORT = 8001
+PAGES = 5             # pages of generated postings per role; later pages are empty
+RETRY_AFTER = 1       # seconds, sent with 429 answers
+
+
+def slug(text):
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-') or 'all'
+
+
+@lru_cache(maxsize=1024)
+def generated_page(role, page, results_per_page):
+    seed = int.from_bytes(f"{slug(role)}:{page}".encode('utf-8'), 'little') % (2 ** 32)
+    jobs = synthetic_jobs(results_per_page, seed=seed)
+    for i, job in enumerate(jobs):
+        job['id'] = f"stub-{slug(role)}-{page}-{i}"
+        job['redirect_url'] = f"https://example.com/jobs/{job['id']}"
+        if role:
+            job['title'] = role.title()
+    return jobs
+
+
+def load_recorded(directory):
+    # Every *.json file: an Adzuna response ({"results": [...]}) or a list of postings
+    jobs = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.json'))):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        jobs.extend(data.get('results', []) if isinstance(data, dict) else data)
+    return jobs
+
+
+def recorded_page(jobs, role, page, results_per_page):
+    words = role.lower().split()
+    matching = [job for job in jobs
+                if all(word in f"{job.get('title', '')} {job.get('description', '')}".lower() for word in words)]
+    start = (page - 1) * results_per_page
+    return matching[start:start + results_per_page]
+
+
+def create_app(replay=None, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, rate_limit_rate=0.0, pages=PAGES,
+               seed=0):
+    app = Flask(__name__)
+    recorded = load_recorded(replay) if replay else None
+    rng = random.Random(seed)
+    rng_lock = threading.Lock()
+    app.config['STUB_STATS'] = stats = {'requests': 0, 'errors': 0, 'rate_limited': 0}
+
+    @app.route('/v1/api/jobs/<country>/search/<int:page>')
+    def search(country, page):
+        with rng_lock:
+            stats['requests'] += 1
+            delay = max(0.0, latency_ms + rng.uniform(-jitter_ms, jitter_ms)) / 1000
+            roll = rng.random()
+        if delay:
+            time.sleep(delay)
+        if roll < rate_limit_rate:
+            stats['rate_limited'] += 1
+            return jsonify({'exception': 'TOO_MANY_REQUESTS'}), 429, {'Retry-After': str(RETRY_AFTER)}
+        if roll < rate_limit_rate + error_rate:
+            stats['errors'] += 1
+            return jsonify({'exception': 'INTERNAL_ERROR'}), 503
+
+        role = request.args.get('what', '')
+        results_per_page = min(int(request.args.get('results_per_page', 10)), 50)
+        if recorded is not None:
+            results = recorded_page(recorded, role, page, results_per_page)
+            count = len(recorded)
+        else:
+            results = generated_page(role, page, results_per_page) if page <= pages else []
+            count = pages * results_per_page
+        salary_min = request.args.get('salary_min', type=float)
+        if salary_min:
+            results = [job for job in results if (job.get('salary_max') or 0) >= salary_min]
+        return jsonify({'count': count, 'results': results, '__CLASS__': 'Adzuna::API::Response::JobSearchResults'})
+
+    @app.route('/stats')
+    def stub_stats():
+        return jsonify(stats)
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Adzuna-compatible search API stand-in.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--replay', help="directory of recorded Adzuna JSON responses to serve instead of "
+                                         "generated postings")
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="mean added latency per request")
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help="latency varies uniformly by this much")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="share of requests answered with 503")
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help="share of requests answered with 429")
+    parser.add_argument('--pages', type=int, default=PAGES)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    app = create_app(args.replay, args.latency_ms, args.jitter_ms, args.error_rate, args.rate_limit_rate,
+                     args.pages, args.seed)
+    app.run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == '__main__':
+    main()
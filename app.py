@@ -1,29 +1,42 @@
+import json
 import os
-import fitz  # PyMuPDF
-import spacy
-import requests
-from flask import Flask, render_template, request, redirect, url_for, flash, session
+import time
+from collections import deque
+from datetime import datetime, timezone
+from flask import (Flask, render_template, request, redirect, url_for, flash, session, jsonify, abort, make_response,
+                   Response, stream_with_context)
+import numpy as np
 from functools import wraps
-from sentence_transformers import SentenceTransformer, util
+import embedding_service
+import job_store
+import match_queue
+import metrics
+import models
+import chunking
+import pdf_text
+import result_cache
+import resume_profiles
+import upload_store
+import user_store
+from documents import ProcessedDocument, as_document
+from job_filters import JobFilters
+from skills import get_extractor
+from job_fetcher import fetch_jobs_from_adzuna as fetch_jobs
+from vector_index import normalize, top_k_indices
 
 app = Flask(__name__)
 app.secret_key = 'your-very-secret-key'
-
-# Setup upload folder
-UPLOAD_FOLDER = os.path.join(os.getcwd(), 'uploads')
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
-
-# NLP & model
-model = SentenceTransformer('all-MiniLM-L6-v2')
-nlp = spacy.load('en_core_web_sm')
-
-# Adzuna API keys
-APP_ID = 'acb861bf'
-APP_KEY = 'aa3b402d110d32be2cf914e5dc28d0f6'
-
-# In-memory users: email -> user info dict
-users = {}
+upload_store.configure(app)
+
+# Jobs pulled from the vector index before exact scoring
+CANDIDATE_POOL = 200
+# Bump when match_jobs changes in a way that changes its output
+MATCH_VERSION = 2
+# STREAM_RESULTS=1 scores in the /results/stream request instead of the queue
+STREAM_RESULTS = os.environ.get('STREAM_RESULTS', '0') == '1'
+STREAM_BATCH = 10          # candidates scored exactly per streamed batch
+# (time to first result, total) seconds of recent streams
+stream_timings = deque(maxlen=1000)
 
 # --- Helper functions ---
 
@@ -36,56 +49,83 @@ def login_required(f):
         return f(*args, **kwargs)
     return decorated
 
-def extract_text_from_pdf(pdf_path):
-    text = ""
-    with fitz.open(pdf_path) as doc:
-        for page in doc:
-            text += page.get_text()
-    return text
-
 def extract_skills(text):
-    doc = nlp(text)
-    skills = [chunk.text.lower() for chunk in doc.noun_chunks if len(chunk.text.split()) <= 3]
-    return list(set(skills))
-
-def fetch_jobs(role):
-    url = "https://api.adzuna.com/v1/api/jobs/in/search/1"
-    params = {
-        "app_id": APP_ID,
-        "app_key": APP_KEY,
-        "results_per_page": 50,
-        "what": role,
-        "content-type": "application/json"
-    }
-    try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        return response.json().get('results', [])
-    except Exception as e:
-        print(f"Error fetching jobs: {e}")
-        return []
-
-def match_jobs(skills, job_listings, similarity_threshold=30.0):
+    return get_extractor().extract(text)
+
+def encode_skills(skills):
+    return models.encode([" ".join(skills)])
+
+def scoring_version():
+    # Everything besides the resume, role and corpus that decides a result
+    return ":".join([str(MATCH_VERSION), models.cache_name(models.MODEL_NAME), chunking.SCORING_MODE,
+                     get_extractor().version])
+
+def result_key(resume_hash, job_role, filters):
+    query = f"{job_store.normalize_role(job_role)}|{json.dumps(filters.to_dict(), sort_keys=True)}"
+    return result_cache.make_key(resume_hash, query, scoring_version(), job_store.corpus_version(job_role))
+
+def match_jobs(skills, job_listings, similarity_threshold=30.0, job_embeds=None, resume_embed=None, top_k=10,
+               scoring=chunking.SCORING_MODE, filters=None, stats=None):
+    # stats, if given, collects the number of postings each stage removed
     matched_jobs = []
     if not skills:
         return matched_jobs
-    resume_embed = model.encode(" ".join(skills), convert_to_tensor=True)
+    if not job_listings:
+        return matched_jobs
 
-    for job in job_listings:
+    # Metadata filters run first, so dropped postings are never encoded or scored
+    keep = (filters or JobFilters()).apply(job_listings, stats)
+    if len(keep) < len(job_listings):
+        job_listings = [job_listings[i] for i in keep]
+        if job_embeds is not None:
+            job_embeds = job_embeds[keep]
+    if not job_listings:
+        return matched_jobs
+    metrics.inc('jobs_scored_total', len(job_listings))
+    with metrics.span('score'):
+        if scoring != chunking.SINGLE:
+            # Long postings: score every chunk instead of the truncated vector
+            similarities = chunking.chunk_scores(
+                " ".join(skills), [job.get('description', '') for job in job_listings], scoring) * 100
+        else:
+            if resume_embed is None:
+                resume_embed = encode_skills(skills)
+            # Stored postings carry their vectors; otherwise encode them in one batch
+            if job_embeds is None:
+                job_embeds = models.encode([job.get('description', '') for job in job_listings])
+            similarities = (normalize(job_embeds) @ normalize(resume_embed)[0]) * 100
+
+    with metrics.span('rank'):
+        eligible = [i for i in range(len(job_listings)) if similarities[i] >= similarity_threshold]
+        if stats is not None:
+            filtered = stats.setdefault('filtered', {})
+            filtered['threshold'] = filtered.get('threshold', 0) + len(job_listings) - len(eligible)
+        # Partial top-k selection instead of sorting every candidate
+        top = [eligible[i] for i in top_k_indices(similarities[eligible], top_k)]
+
+    # Stored postings carry pre-extracted skills; tag the rest in one pass
+    extractor = get_extractor()
+    untagged = [i for i in top if 'skills' not in job_listings[i]]
+    with metrics.span('job_skills'):
+        job_skills = dict(zip(untagged, extractor.extract_many(
+            [job_listings[i].get('description', '') for i in untagged])))
+    resume_mask = extractor.mask(skills)
+
+    for i in top:
+        job = job_listings[i]
         job_desc = job.get('description', '')
-        job_embed = model.encode(job_desc, convert_to_tensor=True)
-        similarity = util.cos_sim(resume_embed, job_embed).item() * 100
-
-        if similarity >= similarity_threshold and "india" in job.get('location', {}).get('display_name', '').lower():
-            matched_jobs.append({
-                'title': job.get('title'),
-                'location': job.get('location', {}).get('display_name'),
-                'description': job_desc[:400] + "...",
-                'similarity': round(similarity, 2),
-                'redirect_url': job.get('redirect_url', '#')
-            })
-
-    return sorted(matched_jobs, key=lambda x: x['similarity'], reverse=True)[:10]
+        job_mask = extractor.mask(job_skills[i] if i in job_skills else job['skills'])
+        matched_jobs.append({
+            'id': job.get('id'),
+            'title': job.get('title'),
+            'location': job.get('location', {}).get('display_name'),
+            'description': job_desc[:400] + "...",
+            'similarity': round(float(similarities[i]), 2),
+            'matched_skills': extractor.names(resume_mask & job_mask),
+            'redirect_url': job.get('redirect_url', '#')
+        })
+
+    return matched_jobs
 
 # --- Routes ---
 
@@ -111,16 +151,10 @@ def register():
         flash("All fields are required and Terms must be accepted.", "error")
         return render_template('register.html')
 
-    if email in users:
-        flash("Email already registered.", "error")
+    if not user_store.add_user(username, email, password, country):
+        flash("Email or username already registered.", "error")
         return render_template('register.html')
 
-    users[email] = {
-        "username": username,
-        "email": email,
-        "password": password,
-        "country": country
-    }
     flash("Registration successful! Please login.", "success")
     return redirect(url_for('login'))
 
@@ -132,8 +166,8 @@ def login():
     email = request.form.get('email', '').strip().lower()
     password = request.form.get('password', '').strip()
 
-    user = users.get(email)
-    if user and user['password'] == password:
+    user = user_store.authenticate(email, password)
+    if user:
         session['user_email'] = email
         session['username'] = user['username']
         flash(f"Welcome, {user['username']}!", "success")
@@ -167,47 +201,320 @@ def index():
             flash("Only PDF resumes are allowed.", "danger")
             return render_template('index.html', username=session.get('username'))
 
-        filename = resume_file.filename
-        save_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        resume_file.save(save_path)
+        try:
+            filters = JobFilters.from_form(request.form)
+        except ValueError as e:
+            flash(str(e), "danger")
+            return render_template('index.html', username=session.get('username'))
+
+        try:
+            with metrics.span('pdf_extract'):
+                resume_hash, resume_text = upload_store.receive(resume_file)
+        except pdf_text.ExtractionError as e:
+            flash(f"Failed to extract text from resume: {e}", "danger")
+            return render_template('index.html', username=session.get('username'))
 
-        session['uploaded_resume'] = save_path
+        session['uploaded_resume'] = resume_hash
         session['job_role'] = job_role
+        session['filters'] = filters.to_dict()
+        for stale in ('result_key', 'match_task', 'stream'):
+            session.pop(stale, None)
+        # Same resume, role and corpus as an earlier match: reuse its result
+        if job_store.is_fresh(job_role):
+            key = result_key(resume_hash, job_role, filters)
+            cached = result_cache.get_cache().get(key)
+            if cached is not None:
+                session['result_key'] = key
+                remember_profile(session['user_email'], resume_text, resume_hash, job_role, filters, cached[0])
+                return redirect(url_for('results'))
+
+        if STREAM_RESULTS:
+            # /results opens /results/stream, which reads the text back from
+            # the extraction cache by hash
+            session['stream'] = True
+            return redirect(url_for('results'))
+
+        with metrics.span('enqueue'):
+            session['match_task'] = match_queue.enqueue({
+                'user_email': session['user_email'],
+                'resume_text': resume_text,
+                'resume_hash': resume_hash,
+                'job_role': job_role,
+                'filters': filters.to_dict(),
+            })
+        if match_queue.WORKERS == 0:
+            # No worker pool (e.g. tests): run the task inline
+            match_queue.run_one(run_match_task)
 
         return redirect(url_for('results'))
 
-    return render_template('index.html', username=session.get('username'))
+    # Postings synced since the last match that beat the saved profile's list
+    new_matches = [dict(job_store.to_job(row), similarity=round(row['score'], 2))
+                   for row in resume_profiles.new_matches(session['user_email'])]
+    return render_template('index.html', username=session.get('username'), new_matches=new_matches)
+
+def run_match_task(payload):
+    # Runs in a match_queue worker; the result is stored for /results and
+    # in the result cache under a key taken after the role is synced
+    with metrics.record('task', 'match'):
+        job_role = payload['job_role']
+        filters = JobFilters(**payload.get('filters', {}))
+        with metrics.span('sync'):
+            job_store.ensure_fresh(job_role)
+        resume_hash = payload.get('resume_hash') or pdf_text.content_hash(payload['resume_text'].encode('utf-8'))
+        key = result_key(resume_hash, job_role, filters)
+        cache = result_cache.get_cache()
+        cached = cache.get(key)
+        # Matching and the saved profile share one set of skills and vectors
+        resume = ProcessedDocument(payload['resume_text'])
+        if cached is None:
+            result = compute_match(resume, job_role, filters)
+            cache.put(key, result)
+        else:
+            result = cached[0]
+        with metrics.span('save_profile'):
+            remember_profile(payload['user_email'], resume, resume_hash, job_role, filters, result)
+        return dict(result, result_key=key)
+
+def remember_profile(user_email, resume, resume_hash, job_role, filters, result):
+    # Later syncs score their new postings against this profile
+    resume = as_document(resume)
+    if not resume.skills:
+        return
+    matches = [(job['id'], job['similarity']) for job in result['matched_jobs'] if job.get('id')]
+    resume_profiles.save_profile(user_email, resume_hash, job_store.normalize_role(job_role), filters.to_dict(),
+                                 resume.skills, resume.skills_embedding, matches)
+
+def find_candidates(skills, resume_embed, job_role, filters):
+    # Filters are applied inside the index search / SQL query
+    if skills:
+        return job_store.search_candidates(resume_embed[0], job_role, k=CANDIDATE_POOL, filters=filters)
+    return job_store.load_candidates(job_role, limit=CANDIDATE_POOL, filters=filters)
+
+def prepare_match(resume, job_role, filters):
+    # Skills, resume vector and filtered candidates with their stored vectors
+    resume = as_document(resume)
+    with metrics.span('extract_skills'):
+        skills = resume.skills
+    with metrics.span('encode'):
+        resume_embed = resume.skills_embedding[None, :] if skills else None
+    with metrics.span('candidates'):
+        jobs, job_embeds = find_candidates(skills, resume_embed, job_role, filters)
+    if not jobs and filters.adzuna_params():
+        # Nothing stored matches: ask Adzuna for matching postings directly
+        with metrics.span('sync'):
+            job_store.sync(job_role, filters=filters)
+        with metrics.span('candidates'):
+            jobs, job_embeds = find_candidates(skills, resume_embed, job_role, filters)
+    return skills, resume_embed, jobs, job_embeds
+
+def match_result(matched_jobs, stats):
+    if stats['candidates'] == 0:
+        return {'matched_jobs': [], 'message': "No jobs found for this role and filters.", 'category': 'warning'}
+    if not matched_jobs:
+        return {'matched_jobs': [], 'message': "No job matches with similarity above 30%.", 'category': 'warning',
+                'stats': stats}
+    return {'matched_jobs': matched_jobs, 'message': None, 'category': None, 'stats': stats}
+
+def compute_match(resume, job_role, filters=None):
+    # resume: text or ProcessedDocument
+    filters = filters or JobFilters()
+    skills, resume_embed, jobs, job_embeds = prepare_match(resume, job_role, filters)
+    stats = {'candidates': len(jobs)}
+    matched_jobs = match_jobs(skills, jobs, job_embeds=job_embeds, resume_embed=resume_embed, filters=filters,
+                              stats=stats) if jobs else []
+    return match_result(matched_jobs, stats)
+
+def stream_match(resume_text, resume_hash, job_role, filters, top_k=10, batch_size=STREAM_BATCH, user_email=None):
+    # Yields ('match', job) events best-first, then ('done', result). Stored
+    # vectors give a cheap first-pass score for every candidate; candidates
+    # are then scored exactly in batches of that order, so the strongest
+    # matches reach the client first.
+    with metrics.span('sync'):
+        job_store.ensure_fresh(job_role)
+    resume = ProcessedDocument(resume_text)
+    key = result_key(resume_hash, job_role, filters)
+    cache = result_cache.get_cache()
+    cached = cache.get(key)
+    if cached is not None:
+        for job in cached[0]['matched_jobs']:
+            yield 'match', job
+        if user_email:
+            remember_profile(user_email, resume, resume_hash, job_role, filters, cached[0])
+        yield 'done', cached[0]
+        return
+
+    skills, resume_embed, jobs, job_embeds = prepare_match(resume, job_role, filters)
+    stats = {'candidates': len(jobs)}
+    matched_jobs = []
+    if skills and jobs:
+        keep = filters.apply(jobs, stats)
+        jobs, job_embeds = [jobs[i] for i in keep], job_embeds[keep]
+        first_pass = normalize(job_embeds) @ normalize(resume_embed)[0] if jobs else np.zeros(0)
+        order = np.argsort(-first_pass)
+        unfiltered = JobFilters(location=None)
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            scored = match_jobs(skills, [jobs[i] for i in batch], job_embeds=job_embeds[batch],
+                                resume_embed=resume_embed, top_k=len(batch), filters=unfiltered, stats=stats)
+            for job in scored:
+                yield 'match', job
+            matched_jobs.extend(scored)
+    matched_jobs.sort(key=lambda job: job['similarity'], reverse=True)
+    result = match_result(matched_jobs[:top_k], stats)
+    cache.put(key, result)
+    if user_email:
+        remember_profile(user_email, resume, resume_hash, job_role, filters, result)
+    yield 'done', result
+
+def get_user_task(task_id):
+    task = match_queue.get_task(task_id) if task_id else None
+    if task is None or task['payload'].get('user_email') != session.get('user_email'):
+        return None
+    return task
+
+@app.route('/status/<task_id>')
+@login_required
+def status(task_id):
+    task = get_user_task(task_id)
+    if task is None:
+        abort(404)
+    return jsonify({
+        'status': task['status'],
+        'error': task['error'],
+        'results_url': url_for('results'),
+    })
+
+@app.before_request
+def begin_request_record():
+    metrics.begin('http', request.endpoint or 'unknown')
+
+@app.after_request
+def finish_request_record(response):
+    metrics.finish(method=request.method, path=request.path, status=response.status_code)
+    return response
+
+@app.teardown_request
+def abandon_request_record(error=None):
+    # after_request is skipped when a view raises
+    if metrics.active() is not None:
+        metrics.finish(method=request.method, path=request.path, status=500,
+                       error=error.__class__.__name__ if error else None)
+
+@app.route('/metrics')
+def metrics_endpoint():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/embedding/stats')
+def embedding_stats():
+    return jsonify({'services': embedding_service.all_stats()})
 
 @app.route('/results')
 @login_required
 def results():
-    uploaded_resume_path = session.get('uploaded_resume')
     job_role = session.get('job_role')
+    key = session.get('result_key')
+    cached = result_cache.get_cache().get(key) if key and job_role else None
+    if cached is not None:
+        return render_result(*cached, key=key, job_role=job_role)
 
-    if not uploaded_resume_path or not job_role:
+    if session.get('stream') and job_role:
+        return render_template('results.html', streaming=True, matched_jobs=[], role=job_role,
+                               username=session.get('username'))
+
+    task = get_user_task(session.get('match_task'))
+    if task is None or not job_role:
         flash("Please upload your resume and enter job role first.", "warning")
         return redirect(url_for('index'))
 
-    try:
-        resume_text = extract_text_from_pdf(uploaded_resume_path)
-    except Exception as e:
-        flash(f"Failed to extract text from resume: {e}", "danger")
+    if task['status'] in (match_queue.QUEUED, match_queue.RUNNING):
+        return render_template('results.html', pending=True, task_id=task['id'], matched_jobs=[],
+                               role=job_role, username=session.get('username'))
+
+    if task['status'] == match_queue.FAILED:
+        flash(f"Failed to match your resume: {task['error']}", "danger")
         return redirect(url_for('index'))
 
-    skills = extract_skills(resume_text)
+    result = task['result']
+    key = result.get('result_key')
+    if key:
+        # Later visits are served from the result cache
+        session['result_key'] = key
+    return render_result(result, task['updated'], key=key or task['id'], job_role=job_role)
 
-    jobs = fetch_jobs(job_role)
-    if not jobs:
-        flash("No jobs found for this role.", "warning")
-        return redirect(url_for('index'))
+def sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
-    matched_jobs = match_jobs(skills, jobs)
-    if not matched_jobs:
-        flash("No job matches with similarity above 30%.", "warning")
+@app.route('/results/stream')
+@login_required
+def results_stream():
+    job_role = session.get('job_role')
+    resume_hash = session.get('uploaded_resume')
+    resume_text = pdf_text.get_cache().get(resume_hash) if resume_hash else None
+    filters = JobFilters(**session.get('filters', {}))
+    user_email = session['user_email']
+
+    def generate():
+        if resume_text is None or not job_role:
+            yield sse('error', {'message': "Please upload your resume and enter job role first."})
+            return
+        started = time.perf_counter()
+        first_result = None
+        try:
+            # The response headers are already sent: the stream gets its own record
+            with metrics.record('stream', 'results_stream'):
+                for event, data in stream_match(resume_text, resume_hash, job_role, filters,
+                                                user_email=user_email):
+                    if event == 'match' and first_result is None:
+                        first_result = time.perf_counter() - started
+                    if event == 'done':
+                        data = {'message': data['message'], 'category': data['category'],
+                                'count': len(data['matched_jobs'])}
+                    yield sse(event, data)
+        except Exception as e:
+            print(f"Streaming match failed: {e}")
+            yield sse('error', {'message': "Failed to match your resume."})
+            return
+        total = time.perf_counter() - started
+        stream_timings.append((first_result, total))
+        if first_result is not None:
+            metrics.observe('stream_first_result_seconds', first_result)
+        metrics.observe('stream_seconds', total)
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/results/stream/stats')
+def stream_stats():
+    def percentiles(values):
+        if not values:
+            return None
+        ms = np.array(values) * 1000
+        return {'p50': round(float(np.percentile(ms, 50)), 1), 'p95': round(float(np.percentile(ms, 95)), 1)}
+    timings = list(stream_timings)
+    return jsonify({'streams': len(timings),
+                    'time_to_first_result_ms': percentiles([first for first, _ in timings if first is not None]),
+                    'total_ms': percentiles([total for _, total in timings])})
+
+def render_result(result, stored_at, key, job_role):
+    if result['message']:
+        flash(result['message'], result['category'])
         return redirect(url_for('index'))
 
-    return render_template('results.html', matched_jobs=matched_jobs, role=job_role, username=session.get('username'))
+    response = make_response(render_template('results.html', matched_jobs=result['matched_jobs'], role=job_role,
+                                             stats=result.get('stats'), username=session.get('username')))
+    # Refresh and back-navigation revalidate and get a 304 instead of a rematch
+    response.set_etag(key)
+    response.last_modified = datetime.fromtimestamp(stored_at, timezone.utc)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
 
 if __name__ == '__main__':
     port = int(os.environ.get("PORT", 5000))
+    # With the debug reloader only the child process serves requests
+    if match_queue.WORKERS and os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        # Load once here so the forked workers share the weights
+        models.preload()
+        match_queue.start_workers(run_match_task)
     app.run(host='0.0.0.0', port=port, debug=True)
@@ -0,0 +1,277 @@
+import argparse
+import hashlib
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+import embedding_cache
+import models
+import pdf_text
+import tfidf_engine
+from resume_matcher_utils import combined_similarity, match_jobs_to_resume
+from text_utils import clean_text
+
+# Offline benchmarks for the matching hot paths. Corpora of resumes and job
+# postings are generated from skills_list.txt and job_description.txt at
+# several sizes; every run goes to isolated temporary caches and, by default,
+# a hashing encoder stands in for the sentence-transformer so nothing is
+# downloaded. Results (latency percentiles, throughput, peak memory) are
+# written as JSON; --compare reports the change against an earlier run.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SIZES = (50, 1000, 50000)
+BENCHMARKS = ('clean_text', 'extract_text_from_pdf', 'extract_skills', 'combined_similarity', 'match_jobs',
+              'match_jobs_to_resume')
+REPEAT = 20
+MAX_SECONDS = 30.0      # per benchmark and size; fewer repeats once exceeded
+REGRESSION = 1.2        # p50 ratio that --compare flags
+
+ROLES = ('Software Engineer', 'Data Scientist', 'Backend Developer', 'Data Engineer', 'DevOps Engineer',
+         'Frontend Developer', 'Machine Learning Engineer', 'QA Engineer')
+CITIES = ('Bangalore, India', 'Pune, India', 'Hyderabad, India', 'Chennai, India', 'Delhi, India',
+          'London, UK')
+FILLER = ("we are a fast growing team building products used by millions of customers across the region "
+          "you will work closely with product design and operations to ship reliable features "
+          "we value ownership clear communication and a habit of measuring before optimising").split()
+
+
+class HashingEncoder:
+    # Deterministic bag-of-words vectors, so encode cost does not depend on
+    # a downloaded model; 384 dims like all-MiniLM-L6-v2
+    def __init__(self, dim=384):
+        self.dim = dim
+
+    def encode(self, sentences, batch_size=32, convert_to_numpy=True, show_progress_bar=False, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for word in text.lower().split():
+                vectors[i, int(hashlib.md5(word.encode('utf-8')).hexdigest()[:8], 16) % self.dim] += 1.0
+        return vectors[0] if single else vectors
+
+
+# --- Corpora ---
+
+def load_vocabulary():
+    with open(os.path.join(BASE_DIR, 'skills_list.txt'), encoding='utf-8') as f:
+        skills = [line.split('|')[0].strip() for line in f if line.strip() and not line.startswith('#')]
+    with open(os.path.join(BASE_DIR, 'job_description.txt'), encoding='utf-8') as f:
+        fixture = f.read()
+    return skills, fixture
+
+
+def synthetic_jobs(n, seed=0):
+    skills, fixture = load_vocabulary()
+    fixture_words = clean_text(fixture).split()
+    rng = random.Random(seed)
+    jobs = []
+    for i in range(n):
+        picked = rng.sample(skills, k=min(len(skills), rng.randint(4, 10)))
+        words = rng.choices(FILLER + fixture_words, k=rng.randint(120, 400))
+        description = (f"We are hiring a {rng.choice(ROLES)} with experience in {', '.join(picked)}. "
+                       + " ".join(words))
+        jobs.append({
+            'id': f"bench-{i}",
+            'title': rng.choice(ROLES),
+            'description': description,
+            'location': {'display_name': rng.choice(CITIES)},
+            'company': {'display_name': f"Company {i % 97}"},
+            'redirect_url': f"https://example.com/jobs/{i}",
+            'salary_max': float(rng.randrange(300000, 3000000, 50000)),
+            'contract_type': rng.choice(('permanent', 'contract')),
+            'category': {'label': 'IT Jobs'},
+            'created': f"2026-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}T00:00:00Z",
+        })
+    return jobs
+
+
+def synthetic_resumes(n, seed=1):
+    skills, fixture = load_vocabulary()
+    rng = random.Random(seed)
+    resumes = []
+    for _ in range(n):
+        picked = rng.sample(skills, k=min(len(skills), rng.randint(6, 15)))
+        experience = " ".join(rng.choices(FILLER, k=rng.randint(200, 600)))
+        resumes.append(f"{rng.choice(ROLES)}\nSkills: {', '.join(picked)}\nExperience: {experience}")
+    return resumes
+
+
+def make_pdf(text):
+    # None when PyMuPDF is not installed
+    try:
+        import fitz
+    except ImportError:
+        return None
+    doc = fitz.open()
+    lines = text.split('\n')
+    for start in range(0, len(lines), 40):
+        page = doc.new_page()
+        page.insert_textbox(page.rect + (50, 50, -50, -50), "\n".join(lines[start:start + 40]), fontsize=9)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+# --- Measurement ---
+
+def max_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024, 1)
+
+
+def measure(fn, items=1, repeat=REPEAT, max_seconds=MAX_SECONDS):
+    # One warm-up call, then up to `repeat` timed calls; a separate traced
+    # call gives the peak Python/numpy allocation of one call
+    fn()
+    latencies = []
+    budget_started = time.perf_counter()
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - started)
+        if time.perf_counter() - budget_started > max_seconds:
+            break
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    ms = np.array(latencies) * 1000
+    return {
+        'runs': len(latencies),
+        'p50_ms': round(float(np.percentile(ms, 50)), 3),
+        'p95_ms': round(float(np.percentile(ms, 95)), 3),
+        'p99_ms': round(float(np.percentile(ms, 99)), 3),
+        'mean_ms': round(float(ms.mean()), 3),
+        'throughput_per_s': round(items * 1000 / float(ms.mean()), 1) if ms.mean() else None,
+        'peak_alloc_mb': round(peak / (1024 * 1024), 2),
+        'max_rss_mb': max_rss_mb(),
+    }
+
+
+def isolate(directory):
+    # Keep every cache the benchmarked code touches out of the repository
+    embedding_cache._cache = embedding_cache.EmbeddingCache(os.path.join(directory, 'embeddings.db'))
+    tfidf_engine.TFIDF_PATH = os.path.join(directory, 'tfidf.pkl')
+    tfidf_engine._scorer = None
+    pdf_text._cache = pdf_text.TextCache(os.path.join(directory, 'resume_text'))
+
+
+def cases(resumes, jobs_by_size, pdf, benchmarks=BENCHMARKS):
+    # (benchmark, size, items, callable or the reason it is skipped)
+    resume = resumes[0]
+    job = jobs_by_size[min(jobs_by_size)][0]['description']
+    try:
+        import app
+        from skills import get_extractor
+        get_extractor()
+        missing = None
+    except ImportError as e:
+        missing = f"missing dependency: {e}"
+
+    yield 'clean_text', None, len(resumes), lambda: [clean_text(text) for text in resumes]
+    yield ('extract_text_from_pdf', None, 1,
+           (lambda: pdf_text.extract_pdf(pdf)) if pdf else "missing dependency: PyMuPDF (fitz)")
+    yield 'extract_skills', None, 1, missing or (lambda: app.extract_skills(resume))
+    yield 'combined_similarity', None, 1, lambda: combined_similarity(resume, job)
+    for size, jobs in sorted(jobs_by_size.items()):
+        if 'match_jobs' in benchmarks:
+            if missing:
+                yield 'match_jobs', size, size, missing
+            else:
+                # Stored postings carry their vectors, as in the app
+                skills = app.extract_skills(resume)
+                job_embeds = models.encode([item['description'] for item in jobs])
+                yield 'match_jobs', size, size, lambda jobs=jobs, skills=skills, job_embeds=job_embeds: \
+                    app.match_jobs(skills, jobs, job_embeds=job_embeds)
+        yield 'match_jobs_to_resume', size, size, lambda jobs=jobs: match_jobs_to_resume(resume, jobs)
+
+
+def run(sizes=SIZES, benchmarks=BENCHMARKS, embedder='hashing', repeat=REPEAT, max_seconds=MAX_SECONDS,
+        resume_count=20):
+    if embedder == 'hashing':
+        models.register_embedder(HashingEncoder())
+    else:
+        # A model already in the local Hugging Face cache; never download
+        os.environ.setdefault('HF_HUB_OFFLINE', '1')
+    resumes = synthetic_resumes(resume_count)
+    jobs_by_size = {size: synthetic_jobs(size) for size in sizes}
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        isolate(tmp)
+        # The app fits TF-IDF on the stored corpus; do the same once here
+        largest = jobs_by_size[max(jobs_by_size)] if jobs_by_size else synthetic_jobs(50)
+        tfidf_engine.fit_scorer([clean_text(job['description']) for job in largest])
+        pdf = make_pdf(resumes[0]) if 'extract_text_from_pdf' in benchmarks else None
+        for name, size, items, target in cases(resumes, jobs_by_size, pdf, benchmarks):
+            if name not in benchmarks:
+                continue
+            row = {'benchmark': name, 'size': size}
+            if callable(target):
+                row.update(measure(target, items, repeat, max_seconds))
+            else:
+                row['skipped'] = target
+            print(json.dumps(row), file=sys.stderr)
+            results.append(row)
+    return {'meta': run_metadata(embedder, sizes), 'results': results}
+
+
+def run_metadata(embedder, sizes):
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR, capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {'commit': commit, 'python': platform.python_version(), 'platform': platform.platform(),
+            'cpus': os.cpu_count(), 'embedder': embedder, 'sizes': list(sizes),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())}
+
+
+def compare(baseline, current, threshold=REGRESSION):
+    # p50 ratio current / baseline per (benchmark, size) present in both
+    before = {(row['benchmark'], row['size']): row for row in baseline['results'] if 'p50_ms' in row}
+    rows = []
+    for row in current['results']:
+        old = before.get((row['benchmark'], row['size']))
+        if old is None or 'p50_ms' not in row or not old['p50_ms']:
+            continue
+        ratio = row['p50_ms'] / old['p50_ms']
+        rows.append({'benchmark': row['benchmark'], 'size': row['size'], 'baseline_p50_ms': old['p50_ms'],
+                     'p50_ms': row['p50_ms'], 'ratio': round(ratio, 3), 'regression': ratio > threshold})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the matching hot paths.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(SIZES), help="job corpus sizes")
+    parser.add_argument('--only', nargs='+', choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument('--embedder', choices=('hashing', 'model'), default='hashing',
+                        help="hashing: offline stand-in encoder; model: the locally cached sentence-transformer")
+    parser.add_argument('--repeat', type=int, default=REPEAT)
+    parser.add_argument('--out', default='benchmark.json')
+    parser.add_argument('--compare', help="earlier results JSON to compare p50 latencies against")
+    args = parser.parse_args()
+
+    report = run(args.sizes, args.only, args.embedder, args.repeat)
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            rows = compare(json.load(f), report)
+        for row in rows:
+            print(json.dumps(row))
+        if any(row['regression'] for row in rows):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+import math
+import os
+import pickle
+from array import array
+from collections import Counter
+
+import numpy as np
+
+from text_utils import clean_text
+from vector_index import top_k_indices
+
+# Okapi BM25 over an inverted index of cleaned job text. Postings are kept as
+# compact (row, tf) arrays so a query scores every posting list with NumPy
+# instead of walking documents one by one. Documents can be added and removed
+# as jobs arrive; removed rows are tombstoned and compacted later.
+
+
+def tokenize(text):
+    return clean_text(text or "").split()
+
+
+class BM25Index:
+    compact_ratio = 0.25
+
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings = {}        # term -> (array of rows, array of tf)
+        self._doc_len = array('f')
+        self._alive = array('b')
+        self._ids = []
+        self._rows = {}
+        self._groups = {}          # group (e.g. role) -> set of rows
+        self._total_len = 0.0
+        self.versions = {}         # doc_id -> content version it was indexed at
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, doc_id):
+        return doc_id in self._rows
+
+    def add(self, doc_id, text, groups=(), version=None):
+        if doc_id in self._rows:
+            self.remove([doc_id])
+        self.versions[doc_id] = version
+        row = len(self._ids)
+        counts = Counter(tokenize(text))
+        for term, tf in counts.items():
+            rows, tfs = self._postings.setdefault(term, (array('i'), array('f')))
+            rows.append(row)
+            tfs.append(tf)
+        length = sum(counts.values())
+        self._doc_len.append(length)
+        self._alive.append(1)
+        self._ids.append(doc_id)
+        self._rows[doc_id] = row
+        self._total_len += length
+        for group in groups:
+            self._groups.setdefault(group, set()).add(row)
+
+    def add_groups(self, doc_id, groups):
+        row = self._rows.get(doc_id)
+        if row is not None:
+            for group in groups:
+                self._groups.setdefault(group, set()).add(row)
+
+    def remove(self, doc_ids):
+        for doc_id in doc_ids:
+            row = self._rows.pop(doc_id, None)
+            if row is not None:
+                self._alive[row] = 0
+                self._total_len -= self._doc_len[row]
+                self.versions.pop(doc_id, None)
+                for rows in self._groups.values():
+                    rows.discard(row)
+        if self._ids and (len(self._ids) - len(self._rows)) / len(self._ids) > self.compact_ratio:
+            self._compact()
+
+    def _compact(self):
+        # Rebuild posting lists without the tombstoned rows
+        keep = np.flatnonzero(np.frombuffer(self._alive, dtype=np.int8))
+        remap = np.full(len(self._ids), -1, dtype=np.int64)
+        remap[keep] = np.arange(len(keep))
+        postings = {}
+        for term, (rows, tfs) in self._postings.items():
+            rows = np.frombuffer(rows, dtype=np.int32)
+            mask = remap[rows] >= 0
+            if mask.any():
+                postings[term] = (array('i', remap[rows[mask]].astype(np.int32).tobytes()),
+                                  array('f', np.frombuffer(tfs, dtype=np.float32)[mask].tobytes()))
+        self._postings = postings
+        doc_len = np.frombuffer(self._doc_len, dtype=np.float32)[keep]
+        self._doc_len = array('f', doc_len.tobytes())
+        self._alive = array('b', b'\x01' * len(keep))
+        self._ids = [self._ids[row] for row in keep]
+        self._rows = {doc_id: row for row, doc_id in enumerate(self._ids)}
+        self._groups = {group: {int(remap[row]) for row in rows if remap[row] >= 0}
+                        for group, rows in self._groups.items()}
+
+    def idf(self, df):
+        n = len(self._rows)
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def scores(self, query_text):
+        n_rows = len(self._ids)
+        scores = np.zeros(n_rows, dtype=np.float32)
+        if not self._rows:
+            return scores
+        avgdl = self._total_len / len(self._rows) or 1.0
+        doc_len = np.frombuffer(self._doc_len, dtype=np.float32)
+        alive = np.frombuffer(self._alive, dtype=np.int8).astype(bool)
+        norm = self.k1 * (1 - self.b + self.b * doc_len / avgdl)
+        for term in set(tokenize(query_text)):
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            rows = np.frombuffer(posting[0], dtype=np.int32)
+            tfs = np.frombuffer(posting[1], dtype=np.float32)
+            live = alive[rows]
+            if not live.any():
+                continue
+            rows, tfs = rows[live], tfs[live]
+            scores[rows] += self.idf(len(rows)) * tfs * (self.k1 + 1) / (tfs + norm[rows])
+        scores[~alive] = 0.0
+        return scores
+
+    def search(self, query_text, k=300, group=None):
+        scores = self.scores(query_text)
+        if group is not None:
+            rows = np.fromiter(self._groups.get(group, ()), dtype=np.int64)
+        else:
+            rows = np.flatnonzero(scores > 0)
+        if not len(rows):
+            return []
+        top = top_k_indices(scores[rows], k)
+        return [(self._ids[rows[i]], float(scores[rows[i]])) for i in top]
+
+    def save(self, path):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(self, f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load(path):
+        with open(path, 'rb') as f:
+            return pickle.load(f)
@@ -0,0 +1,166 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+
+import job_store
+import models
+import pdf_text
+from text_utils import clean_text
+from vector_index import normalize
+
+# Recruiter bulk mode: score every resume in a directory against the stored
+# job corpus. Resume files are streamed in batches to a process pool; each
+# worker extracts and encodes its batch, then scans the memory-mapped job
+# vector store block by block keeping a running top-k per resume, so memory
+# depends on the batch and block sizes only. Results are appended to a JSONL file as batches
+# finish, and a rerun skips every resume already in that file.
+RESUME_EXTENSIONS = ('.pdf', '.txt')
+BATCH_SIZE = 64        # resumes per task
+BLOCK_SIZE = 8192      # job vectors dequantized and scored per block
+TOP_K = 10
+
+
+def iter_resumes(directory, extensions=RESUME_EXTENSIONS):
+    # Sorted walk so shards and output order are stable across runs
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(extensions):
+                path = os.path.join(root, name)
+                yield os.path.relpath(path, directory), path
+
+
+def completed_resumes(out_path):
+    # Drop a half-written last line left by an interrupted run
+    done = set()
+    if not os.path.exists(out_path):
+        return done
+    with open(out_path, 'rb+') as f:
+        data = f.read()
+        end = data.rfind(b'\n') + 1
+        if end < len(data):
+            f.truncate(end)
+    for line in data[:end].splitlines():
+        done.add(json.loads(line)['resume'])
+    return done
+
+
+def batches(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def merge_top_k(best_scores, best_rows, scores, rows, k):
+    # Running per-resume top-k over (resumes, k) + (resumes, block) scores
+    scores = np.concatenate([best_scores, scores], axis=1)
+    rows = np.concatenate([best_rows, rows], axis=1)
+    if scores.shape[1] > k:
+        keep = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        scores = np.take_along_axis(scores, keep, axis=1)
+        rows = np.take_along_axis(rows, keep, axis=1)
+    return scores, rows
+
+
+def score_batch(task):
+    resumes, role, top_k, block_size, db_path = task
+    names, texts, records = [], [], []
+    for name, path in resumes:
+        try:
+            text = clean_text(pdf_text.extract_file(path))
+        except (OSError, pdf_text.ExtractionError) as e:
+            records.append({'resume': name, 'error': str(e)})
+            continue
+        names.append(name)
+        texts.append(text)
+    if not texts:
+        return records
+
+    queries = normalize(models.encode(texts))
+    store = job_store.get_vector_store(db_path)
+    allowed = job_store.role_mask(store, role, db_path) if role else None
+    best_scores = np.zeros((len(texts), 0), dtype=np.float32)
+    best_rows = np.zeros((len(texts), 0), dtype=np.int64)
+    for start, block in store.iter_blocks(block_size):
+        scores = queries @ block.T
+        if allowed is not None:
+            scores[:, ~allowed[start:start + len(block)]] = -np.inf
+        rows = np.broadcast_to(np.arange(start, start + len(block)), scores.shape)
+        best_scores, best_rows = merge_top_k(best_scores, best_rows, scores, rows, top_k)
+
+    order = np.argsort(-best_scores, axis=1)
+    top_ids = {store.ids[row] for row in best_rows.ravel().tolist()}
+    jobs = {job['id']: job for job in job_store.load_jobs(sorted(top_ids), db_path)[0]}
+    for i, name in enumerate(names):
+        matches = []
+        for j in order[i]:
+            job = jobs.get(store.ids[best_rows[i, j]])
+            if job is not None and np.isfinite(best_scores[i, j]):
+                matches.append({'id': job['id'], 'title': job['title'],
+                                'company': job['company']['display_name'],
+                                'location': job['location']['display_name'],
+                                'redirect_url': job['redirect_url'],
+                                'score': round(float(best_scores[i, j]), 4)})
+        records.append({'resume': name, 'matches': matches})
+    return records
+
+
+def run(directory, out_path, role=None, top_k=TOP_K, processes=None, batch_size=BATCH_SIZE,
+        block_size=BLOCK_SIZE, db_path=job_store.DB_PATH):
+    done = completed_resumes(out_path)
+    pending = ((name, path) for name, path in iter_resumes(directory) if name not in done)
+    tasks = ((batch, role, top_k, block_size, db_path) for batch in batches(pending, batch_size))
+    processes = processes or os.cpu_count() or 1
+    stats = {'skipped': len(done), 'matched': 0, 'failed': 0}
+    started = time.perf_counter()
+
+    with open(out_path, 'a', encoding='utf-8') as out:
+        def write(records):
+            for record in records:
+                out.write(json.dumps(record) + '\n')
+                stats['failed' if 'error' in record else 'matched'] += 1
+            out.flush()
+
+        if processes == 1:
+            for task in tasks:
+                write(score_batch(task))
+        else:
+            # Workers share the parent's model weights copy-on-write
+            models.preload(nlp=False)
+            context = multiprocessing.get_context('fork' if hasattr(os, 'fork') else 'spawn')
+            with context.Pool(processes) as pool:
+                for records in pool.imap_unordered(score_batch, tasks):
+                    write(records)
+                    print(f"{stats['matched'] + stats['failed']} resumes scored", file=sys.stderr)
+
+    stats['seconds'] = round(time.perf_counter() - started, 2)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Match a directory of resumes against the stored job corpus.")
+    parser.add_argument('resumes', help="directory of .pdf/.txt resumes (searched recursively)")
+    parser.add_argument('--out', default='bulk_matches.jsonl', help="JSONL output; rerunning resumes it")
+    parser.add_argument('--role', help="only score jobs synced for this role")
+    parser.add_argument('--top-k', type=int, default=TOP_K)
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--block-size', type=int, default=BLOCK_SIZE)
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.resumes, args.out, args.role, args.top_k, args.processes,
+                         args.batch_size, args.block_size)))
+
+
+if __name__ == '__main__':
+    main()
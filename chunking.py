@@ -0,0 +1,58 @@
+import os
+
+import numpy as np
+
+import models
+from vector_index import normalize
+
+# Chunked embedding scores for documents longer than the encoder window.
+# MiniLM stops reading at 256 word-pieces, so documents are split into
+# overlapping word windows, every chunk of the resume and of all candidate
+# jobs is encoded in one batch (each chunk goes through the embedding cache),
+# and a resume x job-chunk similarity matrix is reduced per job.
+CHUNK_WORDS = 160       # ~220 word-pieces for typical English text
+CHUNK_OVERLAP = 32
+SINGLE = 'single'       # one vector per document (truncated by the encoder)
+CHUNK_MAX = 'chunk-max'     # best chunk pair
+CHUNK_MEAN = 'chunk-mean'   # mean over resume chunks of their best job chunk
+MODES = (SINGLE, CHUNK_MAX, CHUNK_MEAN)
+SCORING_MODE = os.environ.get('SCORING_MODE', SINGLE)
+
+
+def chunk_text(text, size=CHUNK_WORDS, overlap=CHUNK_OVERLAP):
+    words = (text or "").split()
+    if len(words) <= size:
+        return [" ".join(words)]
+    step = size - overlap
+    # The last window is aligned to the end so no chunk is a short tail
+    starts = list(range(0, len(words) - size, step)) + [len(words) - size]
+    return [" ".join(words[start:start + size]) for start in starts]
+
+
+def encode_chunked(texts, size=CHUNK_WORDS, overlap=CHUNK_OVERLAP):
+    # Returns normalised chunk vectors plus the offset of each document's
+    # first chunk; chunks of one document are contiguous
+    chunks = [chunk_text(text, size, overlap) for text in texts]
+    offsets = np.cumsum([0] + [len(doc_chunks) for doc_chunks in chunks[:-1]])
+    vectors = normalize(models.encode([chunk for doc_chunks in chunks for chunk in doc_chunks]))
+    return vectors, offsets
+
+
+def chunk_scores(query_text, doc_texts, mode=CHUNK_MAX, size=CHUNK_WORDS, overlap=CHUNK_OVERLAP):
+    if mode not in (CHUNK_MAX, CHUNK_MEAN):
+        raise ValueError(f"Unknown chunked scoring mode: {mode}")
+    if not doc_texts:
+        return np.zeros(0, dtype=np.float32)
+    vectors, offsets = encode_chunked([query_text] + list(doc_texts), size, overlap)
+    sims = vectors[:offsets[1]] @ vectors[offsets[1]:].T
+    # Best job chunk for every resume chunk, per job, in one reduction
+    best = np.maximum.reduceat(sims, offsets[1:] - offsets[1], axis=1)
+    return best.max(axis=0) if mode == CHUNK_MAX else best.mean(axis=0)
+
+
+def embedding_scores(query_text, doc_texts, mode=SCORING_MODE):
+    # Cosine similarity of the query to each document under the given mode
+    if mode == SINGLE:
+        embeds = normalize(models.encode([query_text] + list(doc_texts)))
+        return embeds[1:] @ embeds[0]
+    return chunk_scores(query_text, doc_texts, mode)
@@ -0,0 +1,80 @@
+from collections import Counter
+from functools import cached_property
+
+import numpy as np
+
+import models
+from text_utils import clean_text
+
+# One processed form per resume or posting, shared by every scorer. Each
+# derived field (cleaned text, tokens, term counts, skills, embeddings) is
+# computed on first use and kept, so a resume scored against 50 postings is
+# cleaned, tagged and encoded once. build_documents prepares a whole job
+# list up front: skills through one nlp.pipe pass, vectors through one
+# batched encode.
+
+
+class ProcessedDocument:
+    def __init__(self, text):
+        self.text = text or ""
+
+    @cached_property
+    def cleaned(self):
+        return clean_text(self.text)
+
+    @cached_property
+    def tokens(self):
+        return self.cleaned.split()
+
+    @cached_property
+    def term_counts(self):
+        return Counter(self.tokens)
+
+    @cached_property
+    def skills(self):
+        from skills import get_extractor
+        return get_extractor().extract(self.text)
+
+    @cached_property
+    def embedding(self):
+        # Vector of the cleaned text, as the hybrid scorers compare them
+        return models.encode([self.cleaned])[0]
+
+    @cached_property
+    def skills_embedding(self):
+        # Vector of the skill list, as app.match_jobs compares resumes
+        return models.encode([" ".join(self.skills)])[0]
+
+    def has(self, field):
+        return field in self.__dict__
+
+    def __repr__(self):
+        return f"ProcessedDocument({self.text[:40]!r})"
+
+
+def as_document(value):
+    return value if isinstance(value, ProcessedDocument) else ProcessedDocument(value)
+
+
+def build_documents(texts, skills=False, encode=False, extractor=None):
+    docs = [as_document(text) for text in texts]
+    if skills:
+        pending = [doc for doc in docs if not doc.has('skills')]
+        if pending:
+            if extractor is None:
+                from skills import get_extractor
+                extractor = get_extractor()
+            for doc, found in zip(pending, extractor.extract_many(doc.text for doc in pending)):
+                doc.skills = found
+    if encode:
+        encode_documents(docs)
+    return docs
+
+
+def encode_documents(docs):
+    # Fills every missing embedding with one batched encode
+    pending = [doc for doc in docs if not doc.has('embedding')]
+    if pending:
+        for doc, vector in zip(pending, models.encode([doc.cleaned for doc in pending])):
+            doc.embedding = vector
+    return np.vstack([doc.embedding for doc in docs]) if docs else np.zeros((0, 0), dtype=np.float32)
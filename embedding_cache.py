@@ -0,0 +1,188 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+import metrics
+
+# Persistent embedding cache shared by every scorer. Entries are keyed by
+# model name + sha256 of the normalized text, so a posting that comes back
+# from Adzuna for another user is never re-encoded.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DB = os.environ.get('EMBEDDING_CACHE_DB', os.path.join(BASE_DIR, 'embeddings.db'))
+MAX_ENTRIES = 50000      # rows kept on disk before LRU eviction
+EVICT_TO = 0.9           # evict down to this fraction of MAX_ENTRIES
+MEMORY_ENTRIES = 4096    # hot rows kept in process memory
+ENCODE_BATCH_SIZE = 64
+
+
+def normalize_text(text, lowercase=False):
+    # Whitespace never changes the tokenization; case only folds away for
+    # uncased models, so that is left to the caller.
+    text = re.sub(r"\s+", " ", text or "").strip()
+    return text.lower() if lowercase else text
+
+
+def cache_key(model_name, text, lowercase=False):
+    digest = hashlib.sha256(normalize_text(text, lowercase).encode('utf-8')).hexdigest()
+    return f"{model_name}:{digest}"
+
+
+def is_uncased(model):
+    tokenizer = getattr(model, 'tokenizer', None)
+    return bool(getattr(tokenizer, 'do_lower_case', False))
+
+
+class EmbeddingCache:
+    def __init__(self, path=CACHE_DB, max_entries=MAX_ENTRIES, memory_entries=MEMORY_ENTRIES):
+        self.path = path
+        self.pid = os.getpid()
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            '''CREATE TABLE IF NOT EXISTS embeddings
+               (key TEXT PRIMARY KEY,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL)''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)')
+        self._conn.commit()
+        # Upper bound on the row count; only recounted when it crosses the cap
+        self._count = self._conn.execute('SELECT COUNT(*) FROM embeddings').fetchone()[0]
+
+    def _remember(self, key, vector):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get_many(self, keys):
+        found = {}
+        with self._lock:
+            missing = []
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[key] = self._memory[key]
+                else:
+                    missing.append(key)
+            if not missing:
+                return found
+
+            # SQLite caps the number of bound parameters, so look up in slices
+            loaded = []
+            for start in range(0, len(missing), 500):
+                chunk = missing[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f'SELECT key, vector FROM embeddings WHERE key IN ({placeholders})', chunk).fetchall()
+                for key, blob in rows:
+                    vector = np.frombuffer(blob, dtype=np.float32)
+                    found[key] = vector
+                    loaded.append(key)
+                    self._remember(key, vector)
+
+            # Only rows read from disk need their LRU stamp refreshed
+            if loaded:
+                now = time.time()
+                try:
+                    self._conn.executemany('UPDATE embeddings SET last_used = ? WHERE key = ?',
+                                           [(now, key) for key in loaded])
+                    self._conn.commit()
+                except sqlite3.OperationalError as e:
+                    self._conn.rollback()
+                    print(f"Embedding cache touch failed: {e}")
+        return found
+
+    def put_many(self, items):
+        now = time.time()
+        with self._lock:
+            rows = []
+            for key, vector in items:
+                vector = np.asarray(vector, dtype=np.float32)
+                self._remember(key, vector)
+                rows.append((key, vector.shape[-1], vector.tobytes(), now))
+            try:
+                self._conn.executemany('INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)', rows)
+                self._count += len(rows)
+                if self._count > self.max_entries:
+                    self._evict()
+                self._conn.commit()
+            except sqlite3.OperationalError as e:
+                # Another worker holds the write lock; the vectors are still
+                # served from memory, they just are not persisted this time.
+                self._conn.rollback()
+                print(f"Embedding cache write failed: {e}")
+
+    def _evict(self):
+        count = self._conn.execute('SELECT COUNT(*) FROM embeddings').fetchone()[0]
+        if count > self.max_entries:
+            target = int(self.max_entries * EVICT_TO)
+            self._conn.execute(
+                'DELETE FROM embeddings WHERE key IN '
+                '(SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?)', (count - target,))
+            count = target
+        self._count = count
+
+    def encode(self, model, model_name, texts, batch_size=ENCODE_BATCH_SIZE):
+        texts = list(texts)
+        lowercase = is_uncased(model)
+        keys = [cache_key(model_name, text, lowercase) for text in texts]
+        found = self.get_many(set(keys))
+
+        # Encode every distinct miss in a single batched forward pass
+        pending = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in pending:
+                pending[key] = text
+        with self._lock:
+            self.hits += len(keys) - len(pending)
+            self.misses += len(pending)
+        metrics.inc('cache_requests_total', len(keys) - len(pending), cache='embedding', result='hit')
+        metrics.inc('cache_requests_total', len(pending), cache='embedding', result='miss')
+
+        if pending:
+            metrics.observe('embedding_batch_size', len(pending))
+            vectors = model.encode(list(pending.values()), batch_size=batch_size,
+                                   convert_to_numpy=True, show_progress_bar=False)
+            new_items = [(key, np.asarray(vector, dtype=np.float32))
+                         for key, vector in zip(pending.keys(), vectors)]
+            self.put_many(new_items)
+            found.update(new_items)
+
+        if not keys:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.vstack([found[key] for key in keys])
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    # A SQLite connection must not be shared with a forked child
+    global _cache
+    if _cache is None or _cache.pid != os.getpid():
+        with _cache_lock:
+            if _cache is None or _cache.pid != os.getpid():
+                _cache = EmbeddingCache(_cache.path if _cache is not None else CACHE_DB)
+    return _cache
+
+
+def encode_texts(model, texts, model_name='all-MiniLM-L6-v2'):
+    # Routed through the shared micro-batching service unless disabled
+    import embedding_service
+    if embedding_service.ENABLED:
+        return embedding_service.get_service(model, model_name).encode(texts)
+    return get_cache().encode(model, model_name, texts)
@@ -0,0 +1,121 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from embedding_cache import get_cache
+
+# In-process micro-batching embedding service. Every request thread submits
+# its texts here instead of calling model.encode itself; one collector thread
+# owns the model, groups pending requests into batches bounded by size and
+# wait time, runs a single forward pass per batch and resolves the futures.
+ENABLED = os.environ.get('EMBED_BATCHING', '1') != '0'
+MAX_BATCH_SIZE = int(os.environ.get('EMBED_MAX_BATCH', 64))        # texts per forward pass
+MAX_WAIT_MS = float(os.environ.get('EMBED_MAX_WAIT_MS', 5))        # wait for more requests
+
+
+class EmbeddingService:
+    def __init__(self, model, model_name, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS, cache=None):
+        self.model = model
+        self.model_name = model_name
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.cache = cache
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._texts = 0
+        self._requests = 0
+        self._max_batch = 0
+        self._batch_sizes = {}      # batch size -> count
+        self._thread = threading.Thread(target=self._run, name=f'embed-{model_name}', daemon=True)
+        self._thread.start()
+
+    def submit(self, texts):
+        future = Future()
+        texts = list(texts)
+        if not texts:
+            future.set_result(np.zeros((0, 0), dtype=np.float32))
+        else:
+            self._queue.put((texts, future))
+        return future
+
+    def encode(self, texts):
+        return self.submit(texts).result()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        size = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch, size
+
+    def _run(self):
+        while True:
+            batch, size = self._collect()
+            texts = [text for item_texts, _ in batch for text in item_texts]
+            try:
+                cache = self.cache or get_cache()
+                vectors = cache.encode(self.model, self.model_name, texts, batch_size=self.max_batch_size)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            start = 0
+            for item_texts, future in batch:
+                future.set_result(vectors[start:start + len(item_texts)])
+                start += len(item_texts)
+
+            with self._stats_lock:
+                self._batches += 1
+                self._texts += size
+                self._requests += len(batch)
+                self._max_batch = max(self._max_batch, size)
+                self._batch_sizes[size] = self._batch_sizes.get(size, 0) + 1
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'model': self.model_name,
+                'queue_depth': self._queue.qsize(),
+                'requests': self._requests,
+                'batches': self._batches,
+                'texts': self._texts,
+                'avg_batch_size': round(self._texts / self._batches, 2) if self._batches else 0.0,
+                'avg_requests_per_batch': round(self._requests / self._batches, 2) if self._batches else 0.0,
+                'max_batch_size': self._max_batch,
+                'batch_sizes': dict(sorted(self._batch_sizes.items())),
+            }
+
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+def get_service(model, model_name):
+    # Keyed by pid too: the collector thread does not survive a fork
+    key = (os.getpid(), id(model), model_name)
+    with _services_lock:
+        service = _services.get(key)
+        if service is None:
+            service = _services[key] = EmbeddingService(model, model_name)
+    return service
+
+
+def all_stats():
+    with _services_lock:
+        services = [service for (pid, _, _), service in _services.items() if pid == os.getpid()]
+    return [service.stats() for service in services]
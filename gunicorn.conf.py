@@ -0,0 +1,52 @@
+import os
+import signal
+
+# Production serving for app.py: gunicorn app:app -c gunicorn.conf.py
+# The app is imported once in the master, the embedder and skill matcher
+# are loaded there, and only then are the web workers and the match queue
+# workers forked, so every process shares the model pages copy-on-write.
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+threads = int(os.environ.get('WEB_THREADS', 4))
+worker_class = 'gthread' if threads > 1 else 'sync'
+preload_app = True
+# A match runs in the queue workers, but a streamed one (STREAM_RESULTS=1)
+# runs inside the request
+timeout = int(os.environ.get('WEB_TIMEOUT', 120))
+graceful_timeout = 30
+keepalive = 5
+max_requests = int(os.environ.get('WEB_MAX_REQUESTS', 0))
+max_requests_jitter = max_requests // 10
+accesslog = os.environ.get('WEB_ACCESS_LOG')   # per-request timings already go to logs/requests.jsonl
+
+
+def when_ready(server):
+    # Runs in the master after the app is imported and before any worker forks
+    import app
+    import match_queue
+    import models
+
+    models.preload()
+    server.match_workers = []
+    for _ in range(match_queue.WORKERS):
+        # A plain fork rather than match_queue.start_workers: multiprocessing
+        # would record these as children of the master, and every web worker
+        # forked later would inherit that record and terminate them on exit
+        pid = os.fork()
+        if pid == 0:
+            for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGQUIT, signal.SIGHUP, signal.SIGCHLD):
+                signal.signal(sig, signal.SIG_DFL)
+            try:
+                match_queue.worker_loop(app.run_match_task)
+            finally:
+                os._exit(0)
+        server.match_workers.append(pid)
+    server.log.info("Started %d match queue workers", len(server.match_workers))
+
+
+def on_exit(server):
+    for pid in getattr(server, 'match_workers', []):
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
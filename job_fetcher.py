@@ -1,21 +1,159 @@
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
 import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+
+# Shared Adzuna client used by every app and the job store. Pages are fetched
+# concurrently over a pooled session, answers are cached for a short TTL and
+# identical in-flight requests are coalesced into one upstream call.
+APP_ID = os.environ.get('ADZUNA_APP_ID', 'acb861bf')
+APP_KEY = os.environ.get('ADZUNA_APP_KEY', 'aa3b402d110d32be2cf914e5dc28d0f6')
+BASE_URL = os.environ.get('ADZUNA_BASE_URL', 'https://api.adzuna.com/v1/api/jobs/in/search')
+
+RESULTS_PER_PAGE = 50
+REQUEST_TIMEOUT = (5, 20)   # connect, read seconds
+MAX_WORKERS = 4
+CACHE_TTL = 300             # seconds a (role, location, page) answer is reused
+CACHE_MAX_ENTRIES = 512
+MAX_RETRIES = 3
+BACKOFF_BASE = 1.0          # seconds, doubled on every retry
+BACKOFF_MAX = 30.0
+
+_session = None
+_session_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='adzuna')
+
+_cache = {}       # key -> (expires_at, results)
+_inflight = {}    # key -> Future shared by concurrent callers
+_lock = threading.Lock()
+
+
+def get_session():
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS * 2)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session = session
+    return _session
+
+
+def _retry_delay(response, attempt):
+    retry_after = response.headers.get('Retry-After') if response is not None else None
+    if retry_after:
+        try:
+            return min(float(retry_after), BACKOFF_MAX)
+        except ValueError:
+            pass
+    return min(BACKOFF_BASE * (2 ** attempt), BACKOFF_MAX)
 
-APP_ID = 'acb861bf'
-APP_KEY = 'aa3b402d110d32be2cf914e5dc28d0f6'
 
-def fetch_jobs_from_adzuna(role):
-    url = "https://api.adzuna.com/v1/api/jobs/in/search/1"
-    params = {
+def _request_page(page, params):
+    url = f"{BASE_URL}/{page}"
+    for attempt in range(MAX_RETRIES + 1):
+        response = None
+        try:
+            with metrics.span('adzuna'):
+                response = get_session().get(url, params=params, timeout=REQUEST_TIMEOUT)
+            retryable = response.status_code == 429 or response.status_code >= 500
+        except (requests.ConnectionError, requests.Timeout):
+            retryable = True
+            metrics.inc('upstream_requests_total', outcome='connection_error')
+            if attempt == MAX_RETRIES:
+                raise
+        if response is not None:
+            metrics.inc('upstream_requests_total', outcome='ok' if response.status_code < 400 else str(response.status_code))
+        if not retryable:
+            response.raise_for_status()
+            return response.json().get('results', [])
+        if attempt == MAX_RETRIES:
+            response.raise_for_status()
+        time.sleep(_retry_delay(response, attempt))
+
+
+def _prune_cache(now):
+    for key in [key for key, (expires, _) in _cache.items() if expires <= now]:
+        del _cache[key]
+    while len(_cache) > CACHE_MAX_ENTRIES:
+        del _cache[next(iter(_cache))]
+
+
+def fetch_page(role, page=1, location=None, results_per_page=RESULTS_PER_PAGE, max_days_old=None, params=None):
+    # params: extra Adzuna filters (salary_min, category, permanent, ...)
+    extra = dict(params or {})
+    key = (role.strip().lower(), (location or '').strip().lower(), page, results_per_page, max_days_old,
+           tuple(sorted(extra.items())))
+    with _lock:
+        cached = _cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            metrics.inc('cache_requests_total', cache='adzuna', result='hit')
+            return cached[1]
+        future = _inflight.get(key)
+        owner = future is None
+        if owner:
+            future = Future()
+            _inflight[key] = future
+
+    # Someone else is already asking Adzuna the same question
+    if not owner:
+        metrics.inc('cache_requests_total', cache='adzuna', result='coalesced')
+        return future.result()
+    metrics.inc('cache_requests_total', cache='adzuna', result='miss')
+
+    query = {
         "app_id": APP_ID,
         "app_key": APP_KEY,
         "what": role,
-        "results_per_page": 50,
+        "results_per_page": results_per_page,
         "content-type": "application/json"
     }
+    query.update(extra)
+    if location:
+        query["where"] = location
+    if max_days_old:
+        query["max_days_old"] = max_days_old
+
     try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        return response.json().get("results", [])
+        results = _request_page(page, query)
     except Exception as e:
-        print(f"Error fetching jobs: {e}")
-        return []
+        with _lock:
+            _inflight.pop(key, None)
+        future.set_exception(e)
+        raise
+
+    with _lock:
+        now = time.monotonic()
+        _cache[key] = (now + CACHE_TTL, results)
+        _prune_cache(now)
+        _inflight.pop(key, None)
+    future.set_result(results)
+    return results
+
+
+def fetch_jobs_from_adzuna(role, max_days_old=None, pages=1, location=None, results_per_page=RESULTS_PER_PAGE,
+                           params=None):
+    futures = [_executor.submit(fetch_page, role, page, location, results_per_page, max_days_old, params)
+               for page in range(1, pages + 1)]
+    jobs = []
+    seen = set()
+    for future in futures:
+        try:
+            results = future.result()
+        except Exception as e:
+            print(f"Error fetching jobs: {e}")
+            continue
+        for job in results:
+            job_id = job.get('id')
+            if job_id is not None and job_id in seen:
+                continue
+            seen.add(job_id)
+            jobs.append(job)
+    return jobs
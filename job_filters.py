@@ -0,0 +1,133 @@
+import os
+import re
+from datetime import datetime, timedelta, timezone
+
+# Cheap metadata filters that run before any encoding or scoring. Each stage
+# is a predicate over a flat posting record (location, salary_max,
+# contract_type, category_tag, created); the same filters are turned into
+# Adzuna query parameters for syncs, SQL over the indexed job columns, and
+# callables over the vector index metadata, so a posting that would be
+# dropped is never encoded, retrieved or scored.
+DEFAULT_LOCATION = os.environ.get('JOB_LOCATION', 'india')
+COUNTRY = 'india'       # the Adzuna endpoint is already scoped to this country
+CONTRACT_TYPES = ('permanent', 'contract')
+
+
+def category_tag(label):
+    # Adzuna category tags are slugs of the label ("IT Jobs" -> "it-jobs")
+    return re.sub(r"[^a-z0-9]+", "-", (label or "").lower()).strip("-") or None
+
+
+def flatten(job):
+    # Adzuna-shaped posting -> the flat record the predicates read
+    return {
+        'location': (job.get('location') or {}).get('display_name') or '',
+        'salary_max': job.get('salary_max'),
+        'contract_type': job.get('contract_type'),
+        'category_tag': category_tag((job.get('category') or {}).get('label')),
+        'created': job.get('created'),
+    }
+
+
+def _number(value):
+    try:
+        return float(value) if value not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+
+class JobFilters:
+    def __init__(self, location=DEFAULT_LOCATION, salary_min=None, contract_type=None, category=None,
+                 max_days_old=None, now=None):
+        self.location = (location or '').strip().lower() or None
+        self.salary_min = _number(salary_min)
+        self.contract_type = (contract_type or '').strip().lower() or None
+        if self.contract_type and self.contract_type not in CONTRACT_TYPES:
+            raise ValueError(f"Unknown contract type: {contract_type}")
+        self.category = category_tag(category)
+        days = _number(max_days_old)
+        self.max_days_old = int(days) if days else None
+        now = now or datetime.now(timezone.utc)
+        self.created_after = ((now - timedelta(days=self.max_days_old)).strftime('%Y-%m-%dT%H:%M:%SZ')
+                              if self.max_days_old else None)
+
+    @classmethod
+    def from_form(cls, form):
+        return cls(location=form.get('location') or DEFAULT_LOCATION, salary_min=form.get('salary_min'),
+                   contract_type=form.get('contract_type'), category=form.get('category'),
+                   max_days_old=form.get('max_days_old'))
+
+    def to_dict(self):
+        # Round-trips through from_form; also the filters' part of cache keys
+        return {'location': self.location, 'salary_min': self.salary_min, 'contract_type': self.contract_type,
+                'category': self.category, 'max_days_old': self.max_days_old}
+
+    def stages(self):
+        # (name, field, value predicate) for every active stage, cheapest first
+        stages = []
+        if self.location:
+            stages.append(('location', 'location', lambda value: self.location in (value or '').lower()))
+        if self.salary_min is not None:
+            stages.append(('salary', 'salary_max', lambda value: value is not None and value >= self.salary_min))
+        if self.contract_type:
+            stages.append(('contract_type', 'contract_type', lambda value: value == self.contract_type))
+        if self.category:
+            stages.append(('category', 'category_tag', lambda value: value == self.category))
+        if self.created_after:
+            stages.append(('recency', 'created', lambda value: (value or '') >= self.created_after))
+        return stages
+
+    def apply(self, jobs, stats=None):
+        # Indices of the jobs that pass every stage; per-stage removal counts
+        # are added to stats['filtered']
+        return self.apply_records([flatten(job) for job in jobs], stats)
+
+    def apply_records(self, records, stats=None):
+        # Same over flat records, e.g. rows of the jobs table
+        keep = list(range(len(records)))
+        for name, field, predicate in self.stages():
+            before = len(keep)
+            keep = [i for i in keep if predicate(records[i][field])]
+            if stats is not None:
+                filtered = stats.setdefault('filtered', {})
+                filtered[name] = filtered.get(name, 0) + before - len(keep)
+        return keep
+
+    def index_filters(self):
+        # Field -> callable, as vector_index.matches_filters expects
+        return {field: predicate for _, field, predicate in self.stages()}
+
+    def sql(self, table='jobs'):
+        # WHERE fragment over the indexed columns of the job store
+        clauses, params = [], []
+        if self.location:
+            clauses.append(f"instr(lower({table}.location), ?) > 0")
+            params.append(self.location)
+        if self.salary_min is not None:
+            clauses.append(f"{table}.salary_max >= ?")
+            params.append(self.salary_min)
+        if self.contract_type:
+            clauses.append(f"{table}.contract_type = ?")
+            params.append(self.contract_type)
+        if self.category:
+            clauses.append(f"{table}.category_tag = ?")
+            params.append(self.category)
+        if self.created_after:
+            clauses.append(f"{table}.created >= ?")
+            params.append(self.created_after)
+        return " AND ".join(clauses), params
+
+    def adzuna_params(self):
+        # The subset Adzuna's search API can apply upstream
+        params = {}
+        if self.location and self.location != COUNTRY:
+            params['where'] = self.location
+        if self.salary_min is not None:
+            params['salary_min'] = int(self.salary_min)
+        if self.contract_type:
+            params[self.contract_type] = 1
+        if self.category:
+            params['category'] = self.category
+        if self.max_days_old:
+            params['max_days_old'] = self.max_days_old
+        return params
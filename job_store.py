@@ -0,0 +1,532 @@
+import argparse
+import hashlib
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+import numpy as np
+
+import models
+import resume_profiles
+import skills
+from embedding_cache import encode_texts
+from job_fetcher import fetch_jobs_from_adzuna
+from job_filters import category_tag
+from text_utils import clean_text
+from tfidf_engine import fit_scorer, get_scorer
+from bm25_index import BM25Index
+from vector_index import create_index, BruteForceIndex
+from vector_store import VectorStore, write_store
+
+# Local job store kept next to the user table in users.db. Postings are
+# upserted by Adzuna id and carry their embedding and top TF-IDF terms, so
+# matching reads candidates and vectors locally instead of calling Adzuna.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.environ.get('USERS_DB', os.path.join(BASE_DIR, 'users.db'))
+MODEL_NAME = models.MODEL_NAME
+SYNC_INTERVAL = 60 * 60   # seconds before a role is synced again
+TFIDF_TERMS = 20
+SYNC_PAGES = 5            # Adzuna pages (50 postings each) fetched per sync
+INDEX_BACKEND = os.environ.get('JOB_INDEX_BACKEND', 'ivf')   # 'ivf' or 'exact'
+INDEX_NLIST = 256
+INDEX_NPROBE = 8
+VECTOR_DTYPE = os.environ.get('JOB_VECTOR_DTYPE', 'float16')   # 'float32', 'float16' or 'int8'
+INDEX_FIELDS = ('salary_max', 'contract_type', 'category_tag', 'created')   # filter fields in index metadata
+
+_indexes = {}   # index/BM25 path -> (mtime, object) for this process
+_index_lock = threading.Lock()
+
+
+def connect(path=DB_PATH):
+    conn = sqlite3.connect(path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode=WAL')
+    init_store(conn)
+    return conn
+
+
+def init_store(conn):
+    conn.executescript(
+        '''CREATE TABLE IF NOT EXISTS jobs
+           (id TEXT PRIMARY KEY,
+            title TEXT,
+            company TEXT,
+            description TEXT NOT NULL,
+            location TEXT,
+            redirect_url TEXT,
+            salary_min REAL,
+            salary_max REAL,
+            contract_type TEXT,
+            category TEXT,
+            category_tag TEXT,
+            created TEXT,
+            content_hash TEXT NOT NULL,
+            embedding BLOB,
+            tfidf_terms TEXT,
+            skills TEXT,
+            skills_version TEXT,
+            fetched_at REAL NOT NULL);
+           CREATE INDEX IF NOT EXISTS idx_jobs_content_hash ON jobs (content_hash);
+           CREATE TABLE IF NOT EXISTS job_roles
+           (job_id TEXT NOT NULL,
+            role TEXT NOT NULL,
+            PRIMARY KEY (role, job_id));
+           CREATE TABLE IF NOT EXISTS job_syncs
+           (role TEXT PRIMARY KEY,
+            last_synced REAL NOT NULL);''')
+    # Columns added after the table was first created
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(jobs)')}
+    for column in ('skills', 'skills_version', 'category_tag'):
+        if column not in columns:
+            conn.execute(f'ALTER TABLE jobs ADD COLUMN {column} TEXT')
+    if 'category_tag' not in columns:
+        rows = conn.execute('SELECT id, category FROM jobs WHERE category IS NOT NULL').fetchall()
+        conn.executemany('UPDATE jobs SET category_tag = ? WHERE id = ?',
+                         [(category_tag(row['category']), row['id']) for row in rows])
+    # Columns the pre-scoring filter stage queries
+    conn.executescript(
+        '''CREATE INDEX IF NOT EXISTS idx_jobs_salary_max ON jobs (salary_max);
+           CREATE INDEX IF NOT EXISTS idx_jobs_contract_type ON jobs (contract_type);
+           CREATE INDEX IF NOT EXISTS idx_jobs_category_tag ON jobs (category_tag);
+           CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs (created);''')
+    conn.commit()
+
+
+def normalize_role(role):
+    return re.sub(r"\s+", " ", role or "").strip().lower()
+
+
+def content_hash(job):
+    text = " ".join([job.get('title') or '', job.get('company', {}).get('display_name') or '',
+                     job.get('description') or ''])
+    return hashlib.sha256(re.sub(r"\s+", " ", text).strip().lower().encode('utf-8')).hexdigest()
+
+
+def upsert_jobs(conn, jobs, role):
+    role = normalize_role(role)
+    now = time.time()
+    new_ids = []
+    linked_ids = []
+    for job in jobs:
+        job_id = str(job.get('id') or '')
+        if not job_id or not job.get('description'):
+            continue
+        digest = content_hash(job)
+        row = (job.get('title'), job.get('company', {}).get('display_name'), job['description'],
+               job.get('location', {}).get('display_name'), job.get('redirect_url'),
+               job.get('salary_min'), job.get('salary_max'), job.get('contract_type'),
+               job.get('category', {}).get('label'), category_tag(job.get('category', {}).get('label')),
+               job.get('created'))
+
+        existing = conn.execute('SELECT content_hash FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        if existing is None:
+            # Re-listed postings come back under a new id with identical content
+            duplicate = conn.execute('SELECT id FROM jobs WHERE content_hash = ?', (digest,)).fetchone()
+            if duplicate is not None:
+                job_id = duplicate['id']
+            else:
+                conn.execute('INSERT INTO jobs (title, company, description, location, redirect_url, '
+                             'salary_min, salary_max, contract_type, category, category_tag, created, id, '
+                             'content_hash, fetched_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                             row + (job_id, digest, now))
+                new_ids.append(job_id)
+        else:
+            # Keep the stored vectors unless the posting text actually changed
+            reset = existing['content_hash'] != digest
+            conn.execute('UPDATE jobs SET title = ?, company = ?, description = ?, location = ?, '
+                         'redirect_url = ?, salary_min = ?, salary_max = ?, contract_type = ?, category = ?, '
+                         'category_tag = ?, created = ?, content_hash = ?, fetched_at = ?'
+                         + (', embedding = NULL, tfidf_terms = NULL, skills = NULL' if reset else '') + ' WHERE id = ?',
+                         row + (digest, now, job_id))
+        conn.execute('INSERT OR IGNORE INTO job_roles (job_id, role) VALUES (?, ?)', (job_id, role))
+        linked_ids.append(job_id)
+    conn.commit()
+    return new_ids, linked_ids
+
+
+def top_terms(scorer, texts):
+    matrix = scorer.transform(texts)
+    names = scorer.vectorizer.get_feature_names_out()
+    terms = []
+    for i in range(matrix.shape[0]):
+        row = matrix.getrow(i)
+        order = np.argsort(row.data)[::-1][:TFIDF_TERMS]
+        terms.append({names[row.indices[j]]: round(float(row.data[j]), 4) for j in order})
+    return terms
+
+
+def encode_missing(conn, model=None, model_name=MODEL_NAME):
+    rows = conn.execute('SELECT id, description FROM jobs WHERE embedding IS NULL').fetchall()
+    if not rows:
+        return 0
+    if model is None:
+        model = models.get_embedder(model_name)
+    descriptions = [row['description'] for row in rows]
+    vectors = encode_texts(model, descriptions, models.cache_name(model_name))
+    cleaned = [clean_text(desc) for desc in descriptions]
+    terms = top_terms(get_scorer(cleaned), cleaned)
+    conn.executemany('UPDATE jobs SET embedding = ?, tfidf_terms = ? WHERE id = ?',
+                     [(np.asarray(vector, dtype=np.float32).tobytes(), json.dumps(term), row['id'])
+                      for row, vector, term in zip(rows, vectors, terms)])
+    conn.commit()
+    return len(rows)
+
+
+def extract_missing_skills(conn, extractor=None):
+    # Postings tagged with an older taxonomy are re-extracted as well
+    extractor = extractor or skills.get_extractor()
+    rows = conn.execute('SELECT id, title, description FROM jobs '
+                        'WHERE skills IS NULL OR skills_version IS NOT ?', (extractor.version,)).fetchall()
+    if not rows:
+        return 0
+    found = extractor.extract_many(f"{row['title'] or ''}\n{row['description']}" for row in rows)
+    conn.executemany('UPDATE jobs SET skills = ?, skills_version = ? WHERE id = ?',
+                     [(json.dumps(job_skills), extractor.version, row['id'])
+                      for row, job_skills in zip(rows, found)])
+    conn.commit()
+    return len(rows)
+
+
+def refit_tfidf(conn):
+    rows = conn.execute('SELECT id, description FROM jobs').fetchall()
+    cleaned = [clean_text(row['description']) for row in rows]
+    if not cleaned:
+        return 0
+    terms = top_terms(fit_scorer(cleaned), cleaned)
+    conn.executemany('UPDATE jobs SET tfidf_terms = ? WHERE id = ?',
+                     [(json.dumps(term), row['id']) for row, term in zip(rows, terms)])
+    conn.commit()
+    return len(rows)
+
+
+def last_synced(conn, role):
+    row = conn.execute('SELECT last_synced FROM job_syncs WHERE role = ?', (normalize_role(role),)).fetchone()
+    return row['last_synced'] if row else None
+
+
+def corpus_version(role, path=DB_PATH):
+    # Changes whenever a sync or delete touches the role's postings
+    with closing(connect(path)) as conn:
+        row = conn.execute('SELECT COUNT(*) AS n, MAX(jobs.fetched_at) AS fetched FROM jobs '
+                           'JOIN job_roles ON job_roles.job_id = jobs.id WHERE job_roles.role = ?',
+                           (normalize_role(role),)).fetchone()
+        synced = last_synced(conn, role)
+    return f"{synced or 0}:{row['n']}:{row['fetched'] or 0}"
+
+
+def is_fresh(role, max_age=SYNC_INTERVAL, path=DB_PATH):
+    with closing(connect(path)) as conn:
+        last = last_synced(conn, role)
+    return last is not None and time.time() - last <= max_age
+
+
+def index_path(path=DB_PATH):
+    return os.path.splitext(path)[0] + '.jobs_index.npz'
+
+
+def _index_rows(conn, ids=None):
+    query = ('SELECT jobs.id, jobs.embedding, jobs.location, jobs.salary_max, jobs.contract_type, '
+             'jobs.category_tag, jobs.created, GROUP_CONCAT(job_roles.role, char(31)) AS roles '
+             'FROM jobs LEFT JOIN job_roles ON job_roles.job_id = jobs.id WHERE jobs.embedding IS NOT NULL')
+    params = []
+    if ids is not None:
+        query += f" AND jobs.id IN ({','.join('?' * len(ids))})"
+        params = list(ids)
+    rows = conn.execute(query + ' GROUP BY jobs.id', params).fetchall()
+    # Flat records, so job_filters predicates run inside the index search
+    metadata = [{'roles': (row['roles'] or '').split(chr(31)), 'location': row['location'] or '',
+                 **{field: row[field] for field in INDEX_FIELDS}} for row in rows]
+    vectors = [np.frombuffer(row['embedding'], dtype=np.float32) for row in rows]
+    return [row['id'] for row in rows], vectors, metadata
+
+
+def rebuild_index(conn, path=DB_PATH):
+    ids, vectors, metadata = _index_rows(conn)
+    dim = len(vectors[0]) if vectors else 384
+    index = create_index(dim, INDEX_BACKEND, nlist=INDEX_NLIST, nprobe=INDEX_NPROBE)
+    if ids:
+        index.add(ids, np.vstack(vectors), metadata)
+    _save_index(index, path)
+    return index
+
+
+def _save_index(index, path):
+    _save_artifact(index, index_path(path))
+
+
+def _save_artifact(obj, target):
+    obj.save(target)
+    with _index_lock:
+        _indexes[target] = (os.path.getmtime(target), obj)
+
+
+def _load_artifact(target, loader, builder):
+    # Reloads when another process (e.g. a sync) has rewritten the file
+    with _index_lock:
+        cached = _indexes.get(target)
+    if os.path.exists(target):
+        mtime = os.path.getmtime(target)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        obj = loader(target)
+        with _index_lock:
+            _indexes[target] = (mtime, obj)
+        return obj
+    return builder()
+
+
+def get_index(path=DB_PATH):
+    def build():
+        with closing(connect(path)) as conn:
+            return rebuild_index(conn, path)
+    index = _load_artifact(index_path(path), BruteForceIndex.load, build)
+    # Indexes saved before the filter fields existed are rebuilt once
+    sample = next(iter(index.metadata.values()), None)
+    if sample is not None and not all(field in sample for field in INDEX_FIELDS):
+        index = build()
+    return index
+
+
+def update_index(conn, ids, path=DB_PATH):
+    if not ids:
+        return
+    index = get_index(path)
+    for start in range(0, len(ids), 500):
+        chunk_ids, vectors, metadata = _index_rows(conn, ids[start:start + 500])
+        if chunk_ids:
+            index.add(chunk_ids, np.vstack(vectors), metadata)
+    _save_index(index, path)
+
+
+def bm25_path(path=DB_PATH):
+    return os.path.splitext(path)[0] + '.bm25.pkl'
+
+
+def _bm25_rows(conn, ids=None):
+    query = ('SELECT jobs.id, jobs.title, jobs.description, jobs.content_hash, '
+             'GROUP_CONCAT(job_roles.role, char(31)) AS roles '
+             'FROM jobs LEFT JOIN job_roles ON job_roles.job_id = jobs.id')
+    params = []
+    if ids is not None:
+        query += f" WHERE jobs.id IN ({','.join('?' * len(ids))})"
+        params = list(ids)
+    return conn.execute(query + ' GROUP BY jobs.id', params).fetchall()
+
+
+def _bm25_add(bm25, row):
+    roles = (row['roles'] or '').split(chr(31))
+    if bm25.versions.get(row['id']) == row['content_hash']:
+        bm25.add_groups(row['id'], roles)
+    else:
+        bm25.add(row['id'], f"{row['title'] or ''} {row['description']}", roles, version=row['content_hash'])
+
+
+def rebuild_bm25(conn, path=DB_PATH):
+    bm25 = BM25Index()
+    for row in _bm25_rows(conn):
+        _bm25_add(bm25, row)
+    _save_artifact(bm25, bm25_path(path))
+    return bm25
+
+
+def get_bm25(path=DB_PATH):
+    def build():
+        with closing(connect(path)) as conn:
+            return rebuild_bm25(conn, path)
+    return _load_artifact(bm25_path(path), BM25Index.load, build)
+
+
+def update_bm25(conn, ids, path=DB_PATH):
+    if not ids:
+        return
+    bm25 = get_bm25(path)
+    for start in range(0, len(ids), 500):
+        for row in _bm25_rows(conn, ids[start:start + 500]):
+            _bm25_add(bm25, row)
+    _save_artifact(bm25, bm25_path(path))
+
+
+def delete_jobs(ids, path=DB_PATH):
+    ids = list(ids)
+    with closing(connect(path)) as conn:
+        placeholders = ','.join('?' * len(ids))
+        conn.execute(f'DELETE FROM job_roles WHERE job_id IN ({placeholders})', ids)
+        conn.execute(f'DELETE FROM jobs WHERE id IN ({placeholders})', ids)
+        conn.commit()
+    index = get_index(path)
+    index.remove(ids)
+    _save_index(index, path)
+    bm25 = get_bm25(path)
+    bm25.remove(ids)
+    _save_artifact(bm25, bm25_path(path))
+    with closing(connect(path)) as conn:
+        rebuild_vector_store(conn, path)
+
+
+def sync(role, model=None, fetch=fetch_jobs_from_adzuna, pages=SYNC_PAGES, path=DB_PATH, filters=None):
+    # With filters, only matching postings are fetched (Adzuna applies them
+    # upstream) and the role's sync time is left alone, since the fetch did
+    # not cover the whole role
+    role = normalize_role(role)
+    started = time.time()
+    with closing(connect(path)) as conn:
+        last = last_synced(conn, role)
+        # Only ask Adzuna for postings newer than the previous sync
+        max_days_old = math.ceil((started - last) / 86400) + 1 if last else None
+        params = filters.adzuna_params() if filters else {}
+        # The tighter of the incremental window and the recency filter
+        windows = [days for days in (max_days_old, params.pop('max_days_old', None)) if days]
+        max_days_old = min(windows) if windows else None
+        if params:
+            jobs = fetch(role, max_days_old=max_days_old, pages=pages, params=params)
+        else:
+            jobs = fetch(role, max_days_old=max_days_old, pages=pages)
+        new_ids, linked_ids = upsert_jobs(conn, jobs, role)
+        encoded = encode_missing(conn, model)
+        tagged = extract_missing_skills(conn)
+        # New vectors and new role links both need to reach the index
+        update_index(conn, linked_ids, path)
+        update_bm25(conn, linked_ids, path)
+        if new_ids or encoded:
+            rebuild_vector_store(conn, path)
+        # Saved resume profiles only need scoring against the new postings
+        resume_profiles.rematch(conn, new_ids)
+        # An empty incremental fetch still counts; an empty first fetch is
+        # most likely an upstream error, so the role is retried next time
+        if filters is None and (jobs or last is not None):
+            conn.execute('INSERT OR REPLACE INTO job_syncs (role, last_synced) VALUES (?, ?)', (role, started))
+            conn.commit()
+    return {'role': role, 'fetched': len(jobs), 'new': len(new_ids), 'encoded': encoded, 'skills': tagged}
+
+
+def ensure_fresh(role, model=None, max_age=SYNC_INTERVAL, path=DB_PATH):
+    if not is_fresh(role, max_age, path):
+        return sync(role, model, path=path)
+    return None
+
+
+def to_job(row):
+    return {
+        'id': row['id'],
+        'title': row['title'],
+        'company': {'display_name': row['company']},
+        'description': row['description'],
+        'location': {'display_name': row['location'] or ''},
+        'redirect_url': row['redirect_url'] or '#',
+        'salary_min': row['salary_min'],
+        'salary_max': row['salary_max'],
+        'contract_type': row['contract_type'],
+        'category': {'label': row['category']},
+        'created': row['created'],
+        'tfidf_terms': json.loads(row['tfidf_terms']) if row['tfidf_terms'] else {},
+        'skills': json.loads(row['skills']) if row['skills'] else [],
+    }
+
+
+def load_candidates(role, limit=None, path=DB_PATH, filters=None):
+    query = ('SELECT jobs.* FROM jobs JOIN job_roles ON job_roles.job_id = jobs.id '
+             'WHERE job_roles.role = ? AND jobs.embedding IS NOT NULL')
+    params = [normalize_role(role)]
+    clause, filter_params = filters.sql() if filters else ('', [])
+    if clause:
+        query += ' AND ' + clause
+        params += filter_params
+    query += ' ORDER BY jobs.created DESC'
+    if limit:
+        query += ' LIMIT ?'
+        params.append(limit)
+    with closing(connect(path)) as conn:
+        rows = conn.execute(query, params).fetchall()
+    if not rows:
+        return [], np.zeros((0, 0), dtype=np.float32)
+    vectors = np.vstack([np.frombuffer(row['embedding'], dtype=np.float32) for row in rows])
+    return [to_job(row) for row in rows], vectors
+
+
+def vector_store_path(path=DB_PATH):
+    return os.path.splitext(path)[0] + '.vectors'
+
+
+def rebuild_vector_store(conn, path=DB_PATH, dtype=None):
+    rows = conn.execute('SELECT id, embedding FROM jobs WHERE embedding IS NOT NULL ORDER BY rowid').fetchall()
+    vectors = np.vstack([np.frombuffer(row['embedding'], dtype=np.float32) for row in rows]) if rows \
+        else np.zeros((0, 384), dtype=np.float32)
+    store = write_store(vector_store_path(path), [row['id'] for row in rows], vectors, dtype or VECTOR_DTYPE)
+    with _index_lock:
+        target = os.path.join(store.directory, 'meta.json')
+        _indexes[target] = (os.path.getmtime(target), store)
+    return store
+
+
+def get_vector_store(path=DB_PATH):
+    # Memory-mapped, so every process shares the same pages
+    def build():
+        with closing(connect(path)) as conn:
+            return rebuild_vector_store(conn, path)
+    return _load_artifact(os.path.join(vector_store_path(path), 'meta.json'),
+                          lambda target: VectorStore(os.path.dirname(target)), build)
+
+
+def role_mask(store, role, path=DB_PATH):
+    with closing(connect(path)) as conn:
+        ids = {row[0] for row in conn.execute('SELECT job_id FROM job_roles WHERE role = ?', (normalize_role(role),))}
+    return np.fromiter((item_id in ids for item_id in store.ids), dtype=bool, count=len(store))
+
+
+def search_candidates(query_vec, role, k=200, path=DB_PATH, filters=None):
+    index_filters = {'roles': normalize_role(role), **(filters.index_filters() if filters else {})}
+    hits = get_index(path).search(query_vec, k, filters=index_filters)
+    return load_jobs([item_id for item_id, _ in hits], path)
+
+
+def lexical_candidates(query_text, role, k=300, path=DB_PATH):
+    hits = get_bm25(path).search(query_text, k, group=normalize_role(role))
+    return load_jobs([item_id for item_id, _ in hits], path)
+
+
+def load_jobs(ids, path=DB_PATH):
+    # Jobs and their stored vectors, in the order of ids
+    if not ids:
+        return [], np.zeros((0, 0), dtype=np.float32)
+    with closing(connect(path)) as conn:
+        rows = conn.execute(f"SELECT * FROM jobs WHERE id IN ({','.join('?' * len(ids))})", ids).fetchall()
+    by_id = {row['id']: row for row in rows}
+    rows = [by_id[item_id] for item_id in ids if item_id in by_id and by_id[item_id]['embedding'] is not None]
+    if not rows:
+        return [], np.zeros((0, 0), dtype=np.float32)
+    vectors = np.vstack([np.frombuffer(row['embedding'], dtype=np.float32) for row in rows])
+    return [to_job(row) for row in rows], vectors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync Adzuna postings into the local job store.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    sync_parser = subparsers.add_parser('sync', help="fetch and encode postings not seen yet")
+    sync_parser.add_argument('roles', nargs='+')
+    sync_parser.add_argument('--pages', type=int, default=SYNC_PAGES)
+    subparsers.add_parser('refit', help="refit TF-IDF on every stored posting")
+    subparsers.add_parser('reindex', help="rebuild the vector and BM25 indexes from stored jobs")
+    subparsers.add_parser('skills', help="tag postings not yet extracted with the current skills_list.txt")
+    args = parser.parse_args()
+
+    if args.command == 'sync':
+        for role in args.roles:
+            print(json.dumps(sync(role, pages=args.pages)))
+    elif args.command == 'skills':
+        with closing(connect()) as conn:
+            print(json.dumps({'tagged': extract_missing_skills(conn)}))
+    elif args.command == 'reindex':
+        with closing(connect()) as conn:
+            print(json.dumps({'indexed': len(rebuild_index(conn)), 'bm25': len(rebuild_bm25(conn))}))
+    else:
+        with closing(connect()) as conn:
+            print(json.dumps({'refitted': refit_tfidf(conn)}))
+
+
+if __name__ == '__main__':
+    main()
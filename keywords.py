@@ -0,0 +1,87 @@
+import os
+
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer
+
+import models
+from vector_index import normalize
+
+# Keyword-level similarity, the batched form of resume_matcher_test.main.
+# Keywords are picked KeyBERT-style: every 1-2 gram of a document is a
+# candidate, ranked by cosine to the document embedding. Candidate phrases
+# of all documents are encoded in one call (and cached per phrase by the
+# embedding cache); one resume is then scored against N jobs with a single
+# padded, masked (N, keywords, dim) tensor product.
+TOP_N = 20
+NGRAM_RANGE = (1, 2)
+KEYWORD_WEIGHT = float(os.environ.get('KEYWORD_WEIGHT', 0.0))   # share of the hybrid score
+
+
+def extract_keywords_many(texts, top_n=TOP_N, ngram_range=NGRAM_RANGE):
+    texts = [text or "" for text in texts]
+    if not texts:
+        return []
+    vectorizer = CountVectorizer(ngram_range=ngram_range, stop_words='english')
+    try:
+        counts = vectorizer.fit_transform(texts).tocsr()
+    except ValueError:
+        # Nothing but stop words in every document
+        return [[] for _ in texts]
+    phrases = vectorizer.get_feature_names_out()
+
+    # Only phrases that are some document's candidate need a vector
+    used = np.unique(counts.indices)
+    embeds = normalize(models.encode(list(texts) + phrases[used].tolist()))
+    doc_embeds, phrase_embeds = embeds[:len(texts)], embeds[len(texts):]
+    position = np.full(len(phrases), -1, dtype=np.int64)
+    position[used] = np.arange(len(used))
+
+    keywords = []
+    for i in range(len(texts)):
+        candidates = counts.indices[counts.indptr[i]:counts.indptr[i + 1]]
+        if not len(candidates):
+            keywords.append([])
+            continue
+        scores = phrase_embeds[position[candidates]] @ doc_embeds[i]
+        top = np.argsort(-scores)[:top_n]
+        keywords.append([(str(phrases[candidates[j]]), round(float(scores[j]), 4)) for j in top])
+    return keywords
+
+
+def stack_keywords(keyword_lists):
+    # (N, K, dim) phrase vectors padded to the longest list, plus the mask
+    phrases = sorted({phrase for keywords in keyword_lists for phrase, _ in keywords})
+    if not phrases:
+        return np.zeros((len(keyword_lists), 0, 0), dtype=np.float32), np.zeros((len(keyword_lists), 0), dtype=bool)
+    width = max(len(keywords) for keywords in keyword_lists)
+    vectors = normalize(models.encode(phrases))
+    row = {phrase: i for i, phrase in enumerate(phrases)}
+    stacked = np.zeros((len(keyword_lists), width, vectors.shape[1]), dtype=np.float32)
+    mask = np.zeros((len(keyword_lists), width), dtype=bool)
+    for n, keywords in enumerate(keyword_lists):
+        if keywords:
+            stacked[n, :len(keywords)] = vectors[[row[phrase] for phrase, _ in keywords]]
+            mask[n, :len(keywords)] = True
+    return stacked, mask
+
+
+def keyword_similarity(resume_keywords, job_keywords):
+    # For each job: mean over resume keywords of their best job keyword
+    scores = np.zeros(len(job_keywords), dtype=np.float32)
+    if not resume_keywords or not job_keywords:
+        return scores
+    stacked, mask = stack_keywords([resume_keywords] + list(job_keywords))
+    if not mask[1:].any():
+        return scores
+    resume_vecs = stacked[0, mask[0]]
+    sims = np.einsum('rd,nkd->nrk', resume_vecs, stacked[1:])
+    sims = np.where(mask[1:, None, :], sims, -np.inf)
+    best = sims.max(axis=2)
+    has_keywords = mask[1:].any(axis=1)
+    scores[has_keywords] = best[has_keywords].mean(axis=1)
+    return scores
+
+
+def keyword_scores(resume_text, job_texts, top_n=TOP_N):
+    keywords = extract_keywords_many([resume_text] + list(job_texts), top_n)
+    return keyword_similarity(keywords[0], keywords[1:])
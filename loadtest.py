@@ -0,0 +1,334 @@
+import argparse
+import itertools
+import json
+import os
+import re
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+from benchmark import ROLES, make_pdf, synthetic_resumes
+
+# Load generator for app.py. Each virtual user registers, logs in, uploads a
+# resume and waits for its results (polling /status, or reading the stream
+# when STREAM_RESULTS=1), so every request type of the real flow is in the
+# mix. With --launch the harness starts the Adzuna stand-in and one gunicorn
+# per (workers, threads) combination on throwaway databases and caches, and
+# samples the memory of every server process while the load runs.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STEPS = ('register', 'login', 'upload', 'results')
+USERS = 8              # concurrent virtual users
+FLOWS = 32             # flows per configuration
+RESULT_TIMEOUT = 120   # seconds a flow waits for its results
+POLL_INTERVAL = 0.25
+STARTUP_TIMEOUT = 180  # seconds for gunicorn to load the models and answer
+MEMORY_INTERVAL = 0.5
+
+
+# --- One user flow ---
+
+def run_flow(base_url, resume, role, name, timeout=RESULT_TIMEOUT):
+    # [(step, seconds, ok)] for one register/login/upload/results pass
+    timings = []
+    with requests.Session() as s:
+        def step(step_name, fn):
+            started = time.perf_counter()
+            try:
+                ok = fn()
+            except requests.RequestException:
+                ok = False
+            timings.append((step_name, time.perf_counter() - started, ok))
+            return ok
+
+        email = f"{name}@load.test"
+        if not step('register', lambda: s.post(f"{base_url}/register", timeout=timeout, data={
+                'username': name, 'email': email, 'password': 'load-test', 'country': 'India',
+                'agreeTerms': 'on'}).ok):
+            return timings
+        if not step('login', lambda: s.post(f"{base_url}/login", timeout=timeout, data={
+                'email': email, 'password': 'load-test'}).url.endswith('/index')):
+            return timings
+        if not step('upload', lambda: s.post(f"{base_url}/index", timeout=timeout, allow_redirects=False,
+                                             data={'job_role': role},
+                                             files={'resume': ('resume.pdf', resume, 'application/pdf')})
+                    .status_code == 302):
+            return timings
+        step('results', lambda: wait_for_results(s, base_url, timeout))
+    return timings
+
+
+def wait_for_results(s, base_url, timeout):
+    deadline = time.monotonic() + timeout
+    page = s.get(f"{base_url}/results", timeout=timeout)
+    if 'EventSource' in page.text:
+        with s.get(f"{base_url}/results/stream", stream=True, timeout=timeout) as stream:
+            for line in stream.iter_lines(decode_unicode=True):
+                if line in ('event: done', 'event: error'):
+                    return line == 'event: done'
+        return False
+    status = re.search(r'/status/([0-9a-f-]+)', page.text)
+    if status is None:
+        return page.ok
+    while time.monotonic() < deadline:
+        task = s.get(f"{base_url}/status/{status.group(1)}", timeout=timeout).json()
+        if task['status'] in ('done', 'failed'):
+            return task['status'] == 'done' and s.get(f"{base_url}/results", timeout=timeout).ok
+        time.sleep(POLL_INTERVAL)
+    return False
+
+
+def run_load(base_url, resumes, users=USERS, flows=FLOWS, timeout=RESULT_TIMEOUT):
+    run_id = uuid.uuid4().hex[:8]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as pool:
+        results = list(pool.map(
+            lambda i: run_flow(base_url, resumes[i % len(resumes)], ROLES[i % len(ROLES)], f"load-{run_id}-{i}",
+                               timeout),
+            range(flows)))
+    return summarize(results, time.perf_counter() - started)
+
+
+def percentiles(seconds):
+    if not seconds:
+        return None
+    ms = np.array(seconds) * 1000
+    return {'p50_ms': round(float(np.percentile(ms, 50)), 1), 'p95_ms': round(float(np.percentile(ms, 95)), 1),
+            'p99_ms': round(float(np.percentile(ms, 99)), 1), 'max_ms': round(float(ms.max()), 1)}
+
+
+def summarize(flows, elapsed):
+    samples = list(itertools.chain.from_iterable(flows))
+    completed = [flow for flow in flows if len(flow) == len(STEPS) and all(ok for _, _, ok in flow)]
+    steps = {}
+    for name in STEPS:
+        timed = [(seconds, ok) for step, seconds, ok in samples if step == name]
+        if timed:
+            steps[name] = dict(percentiles([seconds for seconds, _ in timed]), count=len(timed),
+                               errors=sum(1 for _, ok in timed if not ok))
+    return {
+        'flows': len(flows),
+        'completed': len(completed),
+        'elapsed_s': round(elapsed, 2),
+        'flows_per_s': round(len(completed) / elapsed, 2) if elapsed else None,
+        'steps_per_s': round(len(samples) / elapsed, 2) if elapsed else None,
+        'flow': percentiles([sum(seconds for _, seconds, _ in flow) for flow in completed]),
+        'steps': steps,
+    }
+
+
+# --- Server process memory ---
+
+def process_tree(root_pid):
+    # root_pid and all its descendants, from /proc (Linux only)
+    parents = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', encoding='utf-8') as f:
+                # The command name may hold spaces; fields after it are fixed
+                parents[int(entry)] = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+    tree = [root_pid]
+    for pid in tree:
+        tree.extend(child for child, parent in parents.items() if parent == pid)
+    return tree
+
+
+def process_memory(pid):
+    # RSS and PSS in MB; PSS splits copy-on-write pages between the sharers
+    memory = {}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup', encoding='utf-8') as f:
+            for line in f:
+                field, _, value = line.partition(':')
+                if field in ('Rss', 'Pss'):
+                    memory[field.lower() + '_mb'] = round(int(value.split()[0]) / 1024, 1)
+    except OSError:
+        try:
+            with open(f'/proc/{pid}/status', encoding='utf-8') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        memory['rss_mb'] = round(int(line.split()[1]) / 1024, 1)
+        except OSError:
+            return None
+    return memory or None
+
+
+class MemorySampler:
+    # Peak RSS/PSS per process of a server's tree while the load runs
+    def __init__(self, root_pid, interval=MEMORY_INTERVAL):
+        self.root_pid = root_pid
+        self.interval = interval
+        self.peaks = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.sample()
+            self._stop.wait(self.interval)
+
+    def sample(self):
+        for pid in process_tree(self.root_pid):
+            memory = process_memory(pid)
+            if memory is None:
+                continue
+            peak = self.peaks.setdefault(pid, {})
+            for field, value in memory.items():
+                peak[field] = max(peak.get(field, 0.0), value)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def report(self):
+        processes = [dict(pid=pid, role='master' if pid == self.root_pid else 'worker', **peak)
+                     for pid, peak in sorted(self.peaks.items())]
+        return {'processes': processes,
+                'total_rss_mb': round(sum(p.get('rss_mb', 0) for p in processes), 1),
+                'total_pss_mb': round(sum(p.get('pss_mb', 0) for p in processes), 1)}
+
+
+# --- Launching servers ---
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_up(url, process, timeout=STARTUP_TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{url} exited with status {process.returncode} during startup")
+        try:
+            if requests.get(url, timeout=2).ok:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"{url} did not answer within {timeout}s")
+
+
+def stop(process):
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def start_stub(args):
+    port = free_port()
+    command = [sys.executable, os.path.join(BASE_DIR, 'adzuna_stub.py'), '--port', str(port),
+               '--latency-ms', str(args.stub_latency_ms), '--jitter-ms', str(args.stub_jitter_ms),
+               '--error-rate', str(args.stub_error_rate), '--rate-limit-rate', str(args.stub_rate_limit_rate)]
+    if args.stub_replay:
+        command += ['--replay', args.stub_replay]
+    process = subprocess.Popen(command, cwd=BASE_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    wait_until_up(f"http://127.0.0.1:{port}/stats", process)
+    return process, f"http://127.0.0.1:{port}/v1/api/jobs/in/search"
+
+
+def server_env(tmp, port, workers, threads, match_workers, adzuna_url):
+    # Every database, cache and log of the server goes to tmp
+    return dict(os.environ, PORT=str(port), WEB_CONCURRENCY=str(workers), WEB_THREADS=str(threads),
+               MATCH_WORKERS=str(match_workers), ADZUNA_BASE_URL=adzuna_url,
+               USERS_DB=os.path.join(tmp, 'users.db'), EMBEDDING_CACHE_DB=os.path.join(tmp, 'embeddings.db'),
+               TFIDF_MODEL_PATH=os.path.join(tmp, 'tfidf.pkl'), RESULT_CACHE_DIR=os.path.join(tmp, 'results'),
+               RESUME_TEXT_CACHE=os.path.join(tmp, 'resume_text'), REQUEST_LOG=os.path.join(tmp, 'requests.jsonl'),
+               METRICS_DIR=os.path.join(tmp, 'metrics'))
+
+
+def run_configuration(args, resumes, adzuna_url, workers, threads):
+    port = free_port()
+    with tempfile.TemporaryDirectory() as tmp:
+        env = server_env(tmp, port, workers, threads, args.match_workers, adzuna_url)
+        process = subprocess.Popen([sys.executable, '-m', 'gunicorn', 'app:app', '-c', 'gunicorn.conf.py'],
+                                   cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL,
+                                   stderr=None if args.verbose else subprocess.DEVNULL)
+        try:
+            base_url = f"http://127.0.0.1:{port}"
+            wait_until_up(f"{base_url}/login", process)
+            with MemorySampler(process.pid) as sampler:
+                report = run_load(base_url, resumes, args.users, args.flows, args.timeout)
+            report['memory'] = sampler.report()
+        finally:
+            stop(process)
+    return dict({'workers': workers, 'threads': threads, 'match_workers': args.match_workers,
+                 'users': args.users}, **report)
+
+
+def load_resumes(paths, count):
+    if paths:
+        resumes = []
+        for path in paths:
+            with open(path, 'rb') as f:
+                resumes.append(f.read())
+        return resumes
+    resumes = [make_pdf(text) for text in synthetic_resumes(count)]
+    if not all(resumes):
+        sys.exit("Generating resume PDFs needs PyMuPDF (fitz); pass --resume FILE.pdf instead.")
+    return resumes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent register/login/upload/results load test.")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--url', help="drive an already running app")
+    target.add_argument('--launch', action='store_true',
+                        help="start the Adzuna stand-in and gunicorn for every --workers/--threads combination")
+    parser.add_argument('--users', type=int, default=USERS, help="concurrent virtual users")
+    parser.add_argument('--flows', type=int, default=FLOWS, help="flows per configuration")
+    parser.add_argument('--resume', nargs='+', help="resume PDFs to upload (default: generated)")
+    parser.add_argument('--distinct-resumes', type=int, default=8,
+                        help="generated resumes; fewer means more result cache hits")
+    parser.add_argument('--timeout', type=float, default=RESULT_TIMEOUT)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 4])
+    parser.add_argument('--match-workers', type=int, default=2)
+    parser.add_argument('--stub-latency-ms', type=float, default=150.0)
+    parser.add_argument('--stub-jitter-ms', type=float, default=50.0)
+    parser.add_argument('--stub-error-rate', type=float, default=0.0)
+    parser.add_argument('--stub-rate-limit-rate', type=float, default=0.0)
+    parser.add_argument('--stub-replay', help="directory of recorded Adzuna responses for the stand-in")
+    parser.add_argument('--out', default='loadtest.json')
+    parser.add_argument('--verbose', action='store_true', help="show the server's log")
+    args = parser.parse_args()
+
+    resumes = load_resumes(args.resume, args.distinct_resumes)
+    reports = []
+    if args.url:
+        reports.append(run_load(args.url.rstrip('/'), resumes, args.users, args.flows, args.timeout))
+        print(json.dumps(reports[-1]))
+    else:
+        stub, adzuna_url = start_stub(args)
+        try:
+            for workers, threads in itertools.product(args.workers, args.threads):
+                reports.append(run_configuration(args, resumes, adzuna_url, workers, threads))
+                print(json.dumps(reports[-1]))
+        finally:
+            stop(stub)
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(reports, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+import argparse
+import importlib
+import json
+import multiprocessing
+import os
+import sqlite3
+import time
+import traceback
+import uuid
+from contextlib import closing
+
+# SQLite-backed task queue for match requests. Routes enqueue and return at
+# once; a pool of worker processes claims queued tasks, runs the handler and
+# stores its JSON result for the status/result endpoints. No outside
+# services are needed - the queue lives in users.db next to the job store.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.environ.get('USERS_DB', os.path.join(BASE_DIR, 'users.db'))
+WORKERS = int(os.environ.get('MATCH_WORKERS', 2))
+POLL_INTERVAL = 0.5    # seconds an idle worker waits before polling again
+TASK_TIMEOUT = 300     # running tasks older than this are handed out again
+MAX_ATTEMPTS = 2
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+def connect(path=DB_PATH):
+    conn = sqlite3.connect(path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute(
+        '''CREATE TABLE IF NOT EXISTS match_tasks
+           (id TEXT PRIMARY KEY,
+            payload TEXT NOT NULL,
+            status TEXT NOT NULL,
+            result TEXT,
+            error TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            created REAL NOT NULL,
+            updated REAL NOT NULL)''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_match_tasks_status ON match_tasks (status, created)')
+    return conn
+
+
+def enqueue(payload, path=DB_PATH):
+    task_id = uuid.uuid4().hex
+    now = time.time()
+    with closing(connect(path)) as conn:
+        conn.execute('INSERT INTO match_tasks (id, payload, status, created, updated) VALUES (?, ?, ?, ?, ?)',
+                     (task_id, json.dumps(payload), QUEUED, now, now))
+        conn.commit()
+    return task_id
+
+
+def get_task(task_id, path=DB_PATH):
+    with closing(connect(path)) as conn:
+        row = conn.execute('SELECT * FROM match_tasks WHERE id = ?', (task_id,)).fetchone()
+    if row is None:
+        return None
+    return {
+        'id': row['id'],
+        'status': row['status'],
+        'payload': json.loads(row['payload']),
+        'result': json.loads(row['result']) if row['result'] else None,
+        'error': row['error'],
+        'created': row['created'],
+        'updated': row['updated'],
+    }
+
+
+def queue_depth(path=DB_PATH):
+    with closing(connect(path)) as conn:
+        rows = conn.execute('SELECT status, COUNT(*) AS n FROM match_tasks GROUP BY status').fetchall()
+    return {row['status']: row['n'] for row in rows}
+
+
+def claim(path=DB_PATH):
+    # One UPDATE ... RETURNING so two workers can never claim the same task
+    now = time.time()
+    with closing(connect(path)) as conn:
+        conn.execute('UPDATE match_tasks SET status = ?, error = ?, updated = ? '
+                     'WHERE status = ? AND updated < ? AND attempts >= ?',
+                     (FAILED, 'Matching timed out.', now, RUNNING, now - TASK_TIMEOUT, MAX_ATTEMPTS))
+        row = conn.execute(
+            '''UPDATE match_tasks SET status = ?, attempts = attempts + 1, updated = ?
+               WHERE id = (SELECT id FROM match_tasks
+                           WHERE status = ? OR (status = ? AND updated < ? AND attempts < ?)
+                           ORDER BY created LIMIT 1)
+               RETURNING id, payload''',
+            (RUNNING, now, QUEUED, RUNNING, now - TASK_TIMEOUT, MAX_ATTEMPTS)).fetchone()
+        conn.commit()
+    if row is None:
+        return None
+    return row['id'], json.loads(row['payload'])
+
+
+def finish(task_id, result=None, error=None, path=DB_PATH):
+    with closing(connect(path)) as conn:
+        conn.execute('UPDATE match_tasks SET status = ?, result = ?, error = ?, updated = ? WHERE id = ?',
+                     (FAILED if error else DONE, json.dumps(result) if result is not None else None,
+                      error, time.time(), task_id))
+        conn.commit()
+
+
+def run_one(handler, path=DB_PATH):
+    claimed = claim(path)
+    if claimed is None:
+        return False
+    task_id, payload = claimed
+    try:
+        finish(task_id, result=handler(payload), path=path)
+    except Exception as e:
+        traceback.print_exc()
+        finish(task_id, error=str(e) or e.__class__.__name__, path=path)
+    return True
+
+
+def resolve_handler(handler):
+    if callable(handler):
+        return handler
+    module_name, _, attr = handler.partition(':')
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def worker_loop(handler, path=DB_PATH, stop_event=None):
+    handler = resolve_handler(handler)
+    while stop_event is None or not stop_event.is_set():
+        if not run_one(handler, path):
+            time.sleep(POLL_INTERVAL)
+
+
+def start_workers(handler, processes=WORKERS, path=DB_PATH):
+    # Forked workers inherit the already loaded models copy-on-write
+    context = multiprocessing.get_context('fork' if hasattr(os, 'fork') else 'spawn')
+    workers = []
+    for i in range(processes):
+        worker = context.Process(target=worker_loop, args=(handler, path), name=f'match-worker-{i}', daemon=True)
+        worker.start()
+        workers.append(worker)
+    return workers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run match queue workers.")
+    parser.add_argument('--handler', default='app:run_match_task')
+    parser.add_argument('--processes', type=int, default=WORKERS)
+    args = parser.parse_args()
+
+    handler = resolve_handler(args.handler)
+    workers = start_workers(handler, args.processes)
+    for worker in workers:
+        worker.join()
+
+
+if __name__ == '__main__':
+    main()
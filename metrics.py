@@ -0,0 +1,310 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+# Hot-path instrumentation. span() times a pipeline stage into a latency
+# histogram and into the record of the request (or queue task) running on
+# this thread; inc() and observe() feed counters and histograms. Each
+# finished record is appended as one JSON line to REQUEST_LOG. Every process
+# periodically writes a snapshot of its metrics to METRICS_DIR, and /metrics
+# renders the sum of all snapshots in the Prometheus text format, so match
+# workers and preforked web workers are included.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+REQUEST_LOG = os.environ.get('REQUEST_LOG', os.path.join(BASE_DIR, 'logs', 'requests.jsonl'))
+METRICS_DIR = os.environ.get('METRICS_DIR', os.path.join(BASE_DIR, '.cache', 'metrics'))
+FLUSH_INTERVAL = 1.0      # seconds between snapshot writes per process
+# Sampling profiler: off unless PROFILE_SLOW_MS is set; records slower than
+# that get their sampled stacks written as collapsed flame-graph input
+PROFILE_SLOW_MS = float(os.environ.get('PROFILE_SLOW_MS', 0))
+PROFILE_INTERVAL = float(os.environ.get('PROFILE_INTERVAL_MS', 5)) / 1000
+PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(BASE_DIR, 'logs', 'profiles'))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+METRICS = {
+    'http_request_seconds': ('histogram', "Request latency by endpoint"),
+    'task_seconds': ('histogram', "Queue task latency by task"),
+    'stage_seconds': ('histogram', "Time spent in each pipeline stage"),
+    'stream_first_result_seconds': ('histogram', "Time to the first streamed match"),
+    'stream_seconds': ('histogram', "Duration of streamed matches"),
+    'embedding_batch_size': ('histogram', "Texts per encoder forward pass"),
+    'cache_requests_total': ('counter', "Cache lookups by cache and result"),
+    'jobs_scored_total': ('counter', "Postings scored by match_jobs"),
+    'upstream_requests_total': ('counter', "Adzuna page requests by outcome"),
+}
+
+
+def _buckets(name):
+    return SIZE_BUCKETS if name == 'embedding_batch_size' else LATENCY_BUCKETS
+
+
+def _labels(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}      # (name, labels) -> value
+        self.histograms = {}    # (name, labels) -> [bucket counts..., sum, count]
+
+    def inc(self, name, value=1, **labels):
+        key = (name, _labels(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, _labels(labels))
+        buckets = _buckets(name)
+        with self._lock:
+            state = self.histograms.get(key)
+            if state is None:
+                state = self.histograms[key] = [0] * (len(buckets) + 2)
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {'counters': [[name, dict(labels), value] for (name, labels), value in self.counters.items()],
+                    'histograms': [[name, dict(labels), list(state)]
+                                   for (name, labels), state in self.histograms.items()]}
+
+    def merge(self, snapshot):
+        with self._lock:
+            for name, labels, value in snapshot['counters']:
+                key = (name, _labels(labels))
+                self.counters[key] = self.counters.get(key, 0) + value
+            for name, labels, state in snapshot['histograms']:
+                key = (name, _labels(labels))
+                current = self.histograms.setdefault(key, [0] * len(state))
+                self.histograms[key] = [a + b for a, b in zip(current, state)]
+
+    def render(self):
+        # Prometheus text exposition format 0.0.4
+        lines = []
+        with self._lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(self.histograms.items())
+        by_name = {}
+        for (name, labels), value in counters:
+            by_name.setdefault(name, []).append((labels, value))
+        for (name, labels), state in histograms:
+            by_name.setdefault(name, []).append((labels, state))
+        for name in sorted(by_name):
+            kind, help_text = METRICS.get(name, ('untyped', name))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in by_name[name]:
+                if kind != 'histogram':
+                    lines.append(f"{name}{_format(labels)} {value}")
+                    continue
+                for bound, count in zip(_buckets(name), value):
+                    lines.append(f"{name}_bucket{_format(labels + (('le', repr(float(bound))),))} {count}")
+                lines.append(f"{name}_bucket{_format(labels + (('le', '+Inf'),))} {value[-1]}")
+                lines.append(f"{name}_sum{_format(labels)} {value[-2]}")
+                lines.append(f"{name}_count{_format(labels)} {value[-1]}")
+        return "\n".join(lines) + "\n"
+
+
+def _format(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in labels)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + "}"
+
+
+_registry = Registry()
+_local = threading.local()
+_state = {'pid': os.getpid(), 'started': time.time_ns(), 'flushed': 0.0}
+_active = {}       # thread id -> record being sampled
+_sampler = {'pid': None}
+_sampler_lock = threading.Lock()
+
+
+def inc(name, value=1, **labels):
+    _registry.inc(name, value, **labels)
+    record = getattr(_local, 'record', None)
+    if record is not None:
+        key = ".".join([name] + [str(value) for _, value in _labels(labels)])
+        record['counts'][key] = record['counts'].get(key, 0) + value
+
+
+def observe(name, value, **labels):
+    _registry.observe(name, value, **labels)
+
+
+@contextmanager
+def span(stage):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        _registry.observe('stage_seconds', elapsed, stage=stage)
+        record = getattr(_local, 'record', None)
+        if record is not None:
+            record['spans'][stage] = round(record['spans'].get(stage, 0.0) + elapsed * 1000, 3)
+
+
+# --- Per-request records ---
+
+def begin(kind, name):
+    record = {'kind': kind, 'name': name, 'started': time.perf_counter(), 'spans': {}, 'counts': {},
+              'samples': Counter() if PROFILE_SLOW_MS else None}
+    _local.record = record
+    if PROFILE_SLOW_MS:
+        _start_sampler()
+        _active[threading.get_ident()] = record
+    return record
+
+
+def active():
+    return getattr(_local, 'record', None)
+
+
+def finish(**fields):
+    # Closes this thread's record, logs it and returns it (None if none open)
+    record = getattr(_local, 'record', None)
+    if record is None:
+        return None
+    _local.record = None
+    _active.pop(threading.get_ident(), None)
+    seconds = time.perf_counter() - record['started']
+    if record['kind'] == 'http':
+        _registry.observe('http_request_seconds', seconds, endpoint=record['name'])
+    else:
+        _registry.observe('task_seconds', seconds, task=record['name'])
+    entry = {'ts': round(time.time(), 3), 'pid': os.getpid(), 'kind': record['kind'], 'name': record['name'],
+             'duration_ms': round(seconds * 1000, 3), 'spans': record['spans'], 'counts': record['counts'],
+             **fields}
+    samples = record['samples']
+    if samples and seconds * 1000 >= PROFILE_SLOW_MS:
+        entry['profile'] = _dump_profile(record, samples)
+    _append_log(entry)
+    flush()
+    return entry
+
+
+@contextmanager
+def record(kind, name, **fields):
+    begin(kind, name)
+    try:
+        yield
+    except Exception as e:
+        finish(error=e.__class__.__name__, **fields)
+        raise
+    else:
+        finish(**fields)
+
+
+def _append_log(entry):
+    if not REQUEST_LOG or REQUEST_LOG.lower() == 'off':
+        return
+    try:
+        os.makedirs(os.path.dirname(REQUEST_LOG), exist_ok=True)
+        # One write per line in append mode, so processes do not interleave
+        with open(REQUEST_LOG, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + "\n")
+    except OSError as e:
+        print(f"Request log write failed: {e}")
+
+
+# --- Cross-process snapshots ---
+
+def _after_fork():
+    # A forked child starts its own series instead of re-reporting the parent's
+    global _registry
+    _registry = Registry()
+    _state.update(pid=os.getpid(), started=time.time_ns(), flushed=0.0)
+    _active.clear()
+    _local.record = None
+
+
+os.register_at_fork(after_in_child=_after_fork)
+
+
+def _snapshot_path():
+    return os.path.join(METRICS_DIR, f"{_state['pid']}-{_state['started']}.json")
+
+
+def flush(force=False):
+    path = _snapshot_path()
+    now = time.monotonic()
+    if not force and now - _state['flushed'] < FLUSH_INTERVAL:
+        return
+    _state['flushed'] = now
+    try:
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(_registry.snapshot(), f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Metrics snapshot write failed: {e}")
+
+
+def render():
+    # This process's live metrics plus every other process's last snapshot
+    own = os.path.basename(_snapshot_path())
+    total = Registry()
+    total.merge(_registry.snapshot())
+    if os.path.isdir(METRICS_DIR):
+        for name in os.listdir(METRICS_DIR):
+            if not name.endswith('.json') or name == own:
+                continue
+            try:
+                with open(os.path.join(METRICS_DIR, name), encoding='utf-8') as f:
+                    total.merge(json.load(f))
+            except (OSError, ValueError):
+                continue
+    return total.render()
+
+
+# --- Sampling profiler ---
+
+def _start_sampler():
+    with _sampler_lock:
+        if _sampler['pid'] == os.getpid():
+            return
+        _sampler['pid'] = os.getpid()
+    threading.Thread(target=_sample_loop, name='metrics-profiler', daemon=True).start()
+
+
+def _sample_loop():
+    while True:
+        time.sleep(PROFILE_INTERVAL)
+        if not _active:
+            continue
+        frames = sys._current_frames()
+        for thread_id, record in list(_active.items()):
+            frame = frames.get(thread_id)
+            if frame is None or record['samples'] is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            record['samples'][";".join(reversed(stack))] += 1
+
+
+def _dump_profile(record, samples):
+    # Collapsed stacks ("a;b;c count"), the input of flamegraph.pl / speedscope
+    name = "".join(c if c.isalnum() else '_' for c in record['name'])[:60]
+    path = os.path.join(PROFILE_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{name}.folded")
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in samples.most_common():
+                f.write(f"{stack} {count}\n")
+    except OSError as e:
+        print(f"Profile write failed: {e}")
+        return None
+    return path
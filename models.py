@@ -0,0 +1,139 @@
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import threading
+
+# One registry for every model the apps use. Nothing is loaded at import time:
+# each model is built on first use, or up front by preload() in a server that
+# is about to fork workers, so the children share the weights copy-on-write
+# instead of each loading their own copy.
+MODEL_NAME = os.environ.get('EMBEDDING_MODEL', 'all-MiniLM-L6-v2')
+# 'torch' (SentenceTransformer), 'onnx' or 'onnx-int8' (onnxruntime)
+EMBEDDING_BACKEND = os.environ.get('EMBEDDING_BACKEND', 'torch')
+SPACY_MODEL = os.environ.get('SPACY_MODEL', 'en_core_web_sm')
+# Noun chunks only need the tagger and the parser
+SPACY_EXCLUDE = ('ner', 'lemmatizer')
+
+_models = {}
+_lock = threading.Lock()
+
+
+def _get(key, loader):
+    model = _models.get(key)
+    if model is None:
+        with _lock:
+            model = _models.get(key)
+            if model is None:
+                model = _models[key] = loader()
+    return model
+
+
+def get_embedder(name=MODEL_NAME, backend=None):
+    backend = backend or EMBEDDING_BACKEND
+
+    def load():
+        if backend in ('onnx', 'onnx-int8'):
+            from onnx_backend import OnnxEncoder
+            return OnnxEncoder.load(name, quantized=backend == 'onnx-int8')
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(name)
+    return _get(('embedder', name, backend), load)
+
+
+def register_embedder(model, name=MODEL_NAME, backend=None):
+    # Serve an already built encoder (e.g. an offline stand-in) under a name
+    with _lock:
+        _models[('embedder', name, backend or EMBEDDING_BACKEND)] = model
+
+
+def cache_name(name=MODEL_NAME, backend=None):
+    # Embedding cache namespace: quantized vectors are not mixed with torch ones
+    backend = backend or EMBEDDING_BACKEND
+    return name if backend == 'torch' else f"{name}@{backend}"
+
+
+def get_nlp(name=SPACY_MODEL, exclude=SPACY_EXCLUDE):
+    def load():
+        import spacy
+        return spacy.load(name, exclude=list(exclude))
+    return _get(('spacy', name, tuple(exclude)), load)
+
+
+def get_blank_nlp(lang='en'):
+    # Tokenizer only; enough for the phrase matchers in skills.py
+    def load():
+        import spacy
+        return spacy.blank(lang)
+    return _get(('spacy', f'blank:{lang}'), load)
+
+
+def encode(texts, name=MODEL_NAME):
+    from embedding_cache import encode_texts
+    return encode_texts(get_embedder(name), texts, cache_name(name))
+
+
+def loaded():
+    return [key[:2] for key in _models]
+
+
+def preload(embedder=True, nlp=True):
+    # Call in the parent before forking. gc.freeze() moves everything loaded
+    # so far out of the collector's reach, so later collections in the
+    # children do not touch (and copy) the pages holding the model objects.
+    if embedder:
+        get_embedder()
+    if nlp:
+        import skills
+        skills.get_extractor()
+    gc.collect()
+    gc.freeze()
+
+
+# --- Cold start / memory report ---
+
+PROBE = '''
+import json, resource, sys, time
+started = time.perf_counter()
+__import__(sys.argv[1])
+imported = time.perf_counter() - started
+if sys.argv[2] == '1':
+    import models
+    models.preload()
+print(json.dumps({"import_s": round(imported, 3),
+                  "total_s": round(time.perf_counter() - started, 3),
+                  "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)}))
+'''
+
+ENTRY_POINTS = ('app', 'resume_matcher', 'resume_utils', 'match_queue', 'job_store')
+
+
+def startup_report(modules=ENTRY_POINTS, preload_models=(False, True)):
+    # Each entry point is imported in a fresh interpreter so nothing is warm
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    rows = []
+    for module in modules:
+        for with_models in preload_models:
+            proc = subprocess.run([sys.executable, '-c', PROBE, module, '1' if with_models else '0'],
+                                  cwd=base_dir, capture_output=True, text=True)
+            row = {'entry_point': module, 'preload': with_models}
+            if proc.returncode == 0:
+                row.update(json.loads(proc.stdout.strip().splitlines()[-1]))
+            else:
+                row['error'] = (proc.stderr.strip().splitlines() or ['failed'])[-1]
+            rows.append(row)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start time and peak RSS per entry point.")
+    parser.add_argument('modules', nargs='*', default=list(ENTRY_POINTS))
+    args = parser.parse_args()
+    for row in startup_report(args.modules):
+        print(json.dumps(row))
+
+
+if __name__ == '__main__':
+    main()
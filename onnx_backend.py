@@ -0,0 +1,168 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+# ONNX Runtime inference for the sentence-transformer. The transformer is
+# exported once to ONNX (optionally with dynamic int8 weight quantization) and
+# run by onnxruntime with threads sized to the number of worker processes.
+# Inputs are sorted by token length and batched in buckets, so each batch is
+# padded only to its own longest text. Mean pooling and L2 normalisation
+# reproduce the all-MiniLM-L6-v2 SentenceTransformer head.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ONNX_DIR = os.environ.get('ONNX_MODEL_DIR', os.path.join(BASE_DIR, 'onnx'))
+MAX_SEQ_LENGTH = 256
+BATCH_SIZE = 32
+
+
+def model_dir(model_name, root=None):
+    return os.path.join(root or ONNX_DIR, model_name.replace('/', '__'))
+
+
+def export(model_name, out_dir=None, quantize=True):
+    # One-off: needs torch, transformers and onnxruntime's quantization tools
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoModel, AutoTokenizer
+
+    out_dir = out_dir or model_dir(model_name)
+    os.makedirs(out_dir, exist_ok=True)
+    hub_name = model_name if '/' in model_name else f"sentence-transformers/{model_name}"
+    tokenizer = AutoTokenizer.from_pretrained(hub_name)
+    model = AutoModel.from_pretrained(hub_name).eval()
+    tokenizer.save_pretrained(out_dir)
+
+    sample = tokenizer(["export sample"], return_tensors='pt')
+    names = list(sample.keys())
+    axes = {name: {0: 'batch', 1: 'tokens'} for name in names}
+    axes['last_hidden_state'] = {0: 'batch', 1: 'tokens'}
+    fp32_path = os.path.join(out_dir, 'model.onnx')
+    with torch.no_grad():
+        torch.onnx.export(model, tuple(sample[name] for name in names), fp32_path, input_names=names,
+                          output_names=['last_hidden_state'], dynamic_axes=axes, opset_version=14)
+    if quantize:
+        quantize_dynamic(fp32_path, os.path.join(out_dir, 'model.int8.onnx'), weight_type=QuantType.QInt8)
+    return out_dir
+
+
+def thread_count(workers=None):
+    # Split the cores between worker processes instead of oversubscribing
+    workers = workers or int(os.environ.get('WEB_CONCURRENCY', 0)) + int(os.environ.get('MATCH_WORKERS', 2))
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+
+def length_buckets(lengths, batch_size=BATCH_SIZE):
+    # Batches of indices with similar lengths, longest first
+    order = np.argsort(-np.asarray(lengths), kind='stable')
+    return [order[start:start + batch_size] for start in range(0, len(order), batch_size)]
+
+
+def mean_pool(hidden, attention_mask):
+    mask = attention_mask[..., None].astype(np.float32)
+    summed = (hidden * mask).sum(axis=1)
+    pooled = summed / np.clip(mask.sum(axis=1), 1e-9, None)
+    return pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+
+
+class OnnxEncoder:
+    def __init__(self, session, tokenizer, max_seq_length=MAX_SEQ_LENGTH):
+        self.session = session
+        self.tokenizer = tokenizer
+        self.max_seq_length = max_seq_length
+        self.input_names = [item.name for item in session.get_inputs()]
+        self.padded_tokens = 0
+        self.real_tokens = 0
+
+    @classmethod
+    def load(cls, model_name, quantized=True, threads=None, root=None):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        directory = model_dir(model_name, root)
+        filename = 'model.int8.onnx' if quantized else 'model.onnx'
+        if not os.path.exists(os.path.join(directory, filename)):
+            export(model_name, directory, quantize=quantized)
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads or thread_count()
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        session = ort.InferenceSession(os.path.join(directory, filename), options,
+                                       providers=['CPUExecutionProvider'])
+        return cls(session, AutoTokenizer.from_pretrained(directory))
+
+    def encode(self, sentences, batch_size=BATCH_SIZE, convert_to_numpy=True, show_progress_bar=False, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        lengths = [len(ids) for ids in self.tokenizer(texts, truncation=True,
+                                                      max_length=self.max_seq_length)['input_ids']]
+        out = None
+        for bucket in length_buckets(lengths, batch_size):
+            batch = self.tokenizer([texts[i] for i in bucket], padding=True, truncation=True,
+                                   max_length=self.max_seq_length, return_tensors='np')
+            feeds = {name: np.asarray(batch[name], dtype=np.int64) for name in self.input_names if name in batch}
+            hidden = self.session.run(None, feeds)[0]
+            vectors = mean_pool(hidden, feeds['attention_mask'])
+            if out is None:
+                out = np.zeros((len(texts), vectors.shape[1]), dtype=np.float32)
+            out[bucket] = vectors
+            self.padded_tokens += feeds['attention_mask'].size
+            self.real_tokens += int(feeds['attention_mask'].sum())
+        return out[0] if single else out
+
+
+# --- Parity and latency report ---
+
+def compare(reference, candidate, queries, documents, k=10):
+    # Cosine agreement of two encoders on the same texts, plus top-k overlap
+    started = time.perf_counter()
+    ref_q, ref_d = reference.encode(queries), reference.encode(documents)
+    ref_ms = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    cand_q, cand_d = candidate.encode(queries), candidate.encode(documents)
+    cand_ms = (time.perf_counter() - started) * 1000
+
+    def unit(vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    ref_scores = unit(ref_q) @ unit(ref_d).T
+    cand_scores = unit(cand_q) @ unit(cand_d).T
+    k = min(k, len(documents))
+    ref_top = np.argsort(-ref_scores, axis=1)[:, :k]
+    cand_top = np.argsort(-cand_scores, axis=1)[:, :k]
+    return {
+        'max_abs_error': float(np.abs(ref_scores - cand_scores).max()),
+        'vector_cosine_min': float(np.min(np.sum(unit(ref_d) * unit(cand_d), axis=1))),
+        f'top{k}_overlap': float(np.mean([len(set(a) & set(b)) / k for a, b in zip(ref_top, cand_top)])),
+        f'top{k}_exact': float(np.mean([list(a) == list(b) for a, b in zip(ref_top, cand_top)])),
+        'reference_ms': round(ref_ms, 1),
+        'candidate_ms': round(cand_ms, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the ONNX model and compare it with PyTorch.")
+    parser.add_argument('--model', default='all-MiniLM-L6-v2')
+    parser.add_argument('--export-only', action='store_true')
+    parser.add_argument('--documents', default=os.path.join(BASE_DIR, 'job_description.txt'))
+    args = parser.parse_args()
+
+    export(args.model)
+    if args.export_only:
+        return
+    from sentence_transformers import SentenceTransformer
+    with open(args.documents, encoding='utf-8') as f:
+        paragraphs = [line.strip() for line in f.read().split('\n') if line.strip()]
+    reference = SentenceTransformer(args.model)
+    for quantized in (False, True):
+        result = compare(reference, OnnxEncoder.load(args.model, quantized), paragraphs[:10], paragraphs)
+        print(json.dumps({'backend': 'onnx-int8' if quantized else 'onnx', **result}))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+import hashlib
+import math
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import metrics
+
+# Resume text extraction straight from the uploaded bytes. PyMuPDF opens the
+# document from memory, pages are joined once instead of concatenated, long
+# documents are split into page ranges extracted in a process pool, and the
+# text is cached by the sha256 of the file so a re-upload never re-parses.
+# The cache directory is bounded: files unused for TEXT_TTL seconds go, then
+# the least recently used until the total is under TEXT_MAX_BYTES.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.environ.get('RESUME_TEXT_CACHE', os.path.join(BASE_DIR, '.cache', 'resume_text'))
+MAX_BYTES = int(os.environ.get('RESUME_MAX_BYTES', 5 * 1024 * 1024))
+MAX_PAGES = int(os.environ.get('RESUME_MAX_PAGES', 30))
+PARALLEL_MIN_PAGES = 8     # below this the pool costs more than it saves
+POOL_WORKERS = min(4, os.cpu_count() or 1)
+MEMORY_ENTRIES = 256
+TEXT_TTL = int(os.environ.get('RESUME_TEXT_TTL', 7 * 24 * 3600))
+TEXT_MAX_BYTES = int(os.environ.get('RESUME_TEXT_MAX_MB', 256)) * 1024 * 1024
+
+
+class ExtractionError(ValueError):
+    pass
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def is_pdf(data):
+    return data[:5] == b'%PDF-'
+
+
+def _open(data):
+    import fitz  # PyMuPDF
+    try:
+        return fitz.open(stream=data, filetype='pdf')
+    except Exception as e:
+        raise ExtractionError(f"Could not read the PDF: {e}") from e
+
+
+def _extract_pages(data, start, stop):
+    # Runs in a pool worker; each worker opens its own copy of the document
+    with _open(data) as doc:
+        return [doc[i].get_text() for i in range(start, stop)]
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    global _pool, _pool_pid
+    with _pool_lock:
+        # A pool inherited through fork belongs to the parent
+        if _pool is None or _pool_pid != os.getpid():
+            context = multiprocessing.get_context('fork' if hasattr(os, 'fork') else 'spawn')
+            _pool = ProcessPoolExecutor(max_workers=POOL_WORKERS, mp_context=context)
+            _pool_pid = os.getpid()
+    return _pool
+
+
+def _page_ranges(page_count, parts):
+    size = math.ceil(page_count / parts)
+    return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+
+def extract_pdf(data, parallel=True):
+    with _open(data) as doc:
+        page_count = doc.page_count
+        if page_count > MAX_PAGES:
+            raise ExtractionError(f"The resume has {page_count} pages; the limit is {MAX_PAGES}.")
+        if not parallel or page_count < PARALLEL_MIN_PAGES or POOL_WORKERS < 2 \
+                or multiprocessing.current_process().daemon:
+            return "".join(page.get_text() for page in doc)
+
+    ranges = _page_ranges(page_count, min(POOL_WORKERS, page_count // (PARALLEL_MIN_PAGES // 2)))
+    pool = _get_pool()
+    futures = [pool.submit(_extract_pages, data, start, stop) for start, stop in ranges]
+    return "".join(text for future in futures for text in future.result())
+
+
+class TextCache:
+    # Small in-process LRU in front of one text file per content hash
+    def __init__(self, directory=CACHE_DIR, memory_entries=MEMORY_ENTRIES, ttl=TEXT_TTL, max_bytes=TEXT_MAX_BYTES):
+        self.directory = directory
+        self.memory_entries = memory_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, digest):
+        return os.path.join(self.directory, digest[:2], f"{digest}.txt")
+
+    def get(self, digest):
+        with self._lock:
+            if digest in self._memory:
+                self._memory.move_to_end(digest)
+                return self._memory[digest]
+        path = self._path(digest)
+        try:
+            with open(path, encoding='utf-8') as f:
+                text = f.read()
+            # The mtime is the last use; sweep() evicts by it
+            os.utime(path)
+        except OSError:
+            return None
+        self._remember(digest, text)
+        return text
+
+    def put(self, digest, text):
+        self._remember(digest, text)
+        path = self._path(digest)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Resume text cache write failed: {e}")
+
+    def _remember(self, digest, text):
+        with self._lock:
+            self._memory[digest] = text
+            self._memory.move_to_end(digest)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def sweep(self, now=None):
+        # Remove files unused for ttl seconds, then the least recently used
+        # until the rest fit in max_bytes; returns how many went
+        now = time.time() if now is None else now
+        if not os.path.isdir(self.directory):
+            return 0
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        removed = 0
+        for mtime, size, path in files:
+            if now - mtime <= self.ttl and total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+
+_cache = None
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        _cache = TextCache()
+    return _cache
+
+
+def extract_text(data, filename=None, digest=None):
+    # PDFs are parsed; anything else is treated as plain text. digest, if
+    # the caller already has it, is the content_hash of data
+    if not data:
+        raise ExtractionError("The uploaded file is empty.")
+    if len(data) > MAX_BYTES:
+        raise ExtractionError(f"The resume is larger than {MAX_BYTES // (1024 * 1024)} MB.")
+    digest = digest or content_hash(data)
+    cache = get_cache()
+    text = cache.get(digest)
+    metrics.inc('cache_requests_total', cache='resume_text', result='miss' if text is None else 'hit')
+    if text is None:
+        if is_pdf(data) or (filename or '').lower().endswith('.pdf'):
+            text = extract_pdf(data)
+        else:
+            text = data.decode('utf-8', errors='ignore')
+        cache.put(digest, text)
+    return text
+
+
+def extract_file(path):
+    with open(path, 'rb') as f:
+        return extract_text(f.read(), path)
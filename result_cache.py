@@ -0,0 +1,138 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import metrics
+
+# Finished match results, keyed by everything that decides them: the resume
+# content hash, the normalised role, the scoring version (model, backend,
+# scoring mode, skills list) and the version of the role's job corpus. A
+# bounded in-process LRU sits in front of one JSON file per key; entries of
+# either tier expire after RESULT_TTL seconds. The time an entry was stored
+# doubles as its Last-Modified and the key as its ETag.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.environ.get('RESULT_CACHE_DIR', os.path.join(BASE_DIR, '.cache', 'results'))
+RESULT_TTL = int(os.environ.get('RESULT_TTL', 6 * 60 * 60))
+MEMORY_ENTRIES = 512
+SWEEP_EVERY = 100      # puts between sweeps of expired files
+
+
+def make_key(resume_hash, role, scoring_version, corpus_version):
+    parts = [resume_hash, role, scoring_version, corpus_version]
+    return hashlib.sha256(json.dumps(parts).encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, directory=CACHE_DIR, memory_entries=MEMORY_ENTRIES, ttl=RESULT_TTL):
+        self.directory = directory
+        self.memory_entries = memory_entries
+        self.ttl = ttl
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._puts = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key, now=None):
+        # (result, stored_at) or None
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and now - entry[1] > self.ttl:
+                del self._memory[key]
+                entry = None
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                metrics.inc('cache_requests_total', cache='result', result='hit')
+                return entry
+        entry = self._read(key, now)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                metrics.inc('cache_requests_total', cache='result', result='miss')
+                return None
+            self.hits += 1
+        metrics.inc('cache_requests_total', cache='result', result='hit')
+        self._remember(key, entry)
+        return entry
+
+    def _read(self, key, now):
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            stored_at = os.path.getmtime(path)
+            if now - stored_at > self.ttl:
+                os.remove(path)
+                return None
+            with open(path, encoding='utf-8') as f:
+                return json.load(f), stored_at
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key, result, now=None):
+        now = time.time() if now is None else now
+        entry = (result, now)
+        self._remember(key, entry)
+        if self.directory is None:
+            return entry
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(result, f)
+            os.utime(tmp_path, (now, now))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Result cache write failed: {e}")
+        self._puts += 1
+        if self._puts % SWEEP_EVERY == 0:
+            self.sweep(now)
+        return entry
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def sweep(self, now=None):
+        # Remove expired files; returns how many went
+        now = time.time() if now is None else now
+        removed = 0
+        if self.directory is None or not os.path.isdir(self.directory):
+            return removed
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    if now - os.path.getmtime(path) > self.ttl:
+                        os.remove(path)
+                        removed += 1
+                except OSError:
+                    pass
+        return removed
+
+    def stats(self):
+        with self._lock:
+            return {'memory_entries': len(self._memory), 'hits': self.hits, 'misses': self.misses}
+
+
+_cache = None
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        # RESULT_CACHE_DIR=off keeps results in memory only
+        _cache = ResultCache(None if CACHE_DIR.lower() in ('', 'off', 'none') else CACHE_DIR)
+    return _cache
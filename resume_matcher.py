@@ -1,96 +1,18 @@
-import os
-import re
-import spacy
-import requests
 from flask import Flask, render_template, request, redirect, url_for, session, flash
 from functools import wraps
-from sentence_transformers import SentenceTransformer, util
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+import pdf_text
+import upload_store
+from resume_matcher_utils import cached_two_stage_match
 
 app = Flask(__name__)
 app.secret_key = "your_secret_key_here"
-
-UPLOAD_FOLDER = os.path.join(os.getcwd(), 'uploads')
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+upload_store.configure(app)
 
 # Dummy user data
 users = {
     "SINDHOORAKH": {"email": "test@example.com", "password": "YourPassword123!"}
 }
 
-# NLP setup
-nlp = spacy.load("en_core_web_sm")
-model = SentenceTransformer("all-MiniLM-L6-v2")
-
-# --- Helper functions ---
-
-def clean_text(text):
-    text = re.sub(r"([a-z])([A-Z])", r"\1 \2", text)
-    text = re.sub(r"[^a-zA-Z0-9\s]", " ", text)
-    text = re.sub(r"\s+", " ", text).strip()
-    return text.lower()
-
-def combined_similarity(text1, text2):
-    text1 = clean_text(text1)
-    text2 = clean_text(text2)
-
-    tfidf = TfidfVectorizer().fit([text1, text2])
-    tfidf_sim = cosine_similarity(tfidf.transform([text1]), tfidf.transform([text2]))[0][0]
-
-    emb1 = model.encode(text1, convert_to_tensor=True)
-    emb2 = model.encode(text2, convert_to_tensor=True)
-    emb_sim = util.cos_sim(emb1, emb2).item()
-
-    return 0.5 * tfidf_sim + 0.5 * emb_sim
-
-def match_jobs_to_resume(resume_text, job_listings, threshold=0.3):
-    resume_text_cleaned = clean_text(resume_text)
-    matched_jobs = []
-
-    for job in job_listings:
-        job_desc = job.get("description", "")
-        job_location = job.get("location", {}).get("display_name", "")
-
-        if not job_desc:
-            continue
-
-        sim = combined_similarity(resume_text_cleaned, job_desc)
-        if sim >= threshold and "india" in job_location.lower():
-            matched_jobs.append({
-                "title": job.get("title", "No title"),
-                "location": job_location,
-                "description": job_desc[:300] + "...",
-                "redirect_url": job.get("redirect_url", "#"),
-                "similarity": round(sim * 100, 2)
-            })
-
-    matched_jobs.sort(key=lambda x: x["similarity"], reverse=True)
-    return matched_jobs
-
-
-# Adzuna API credentials
-APP_ID = 'acb861bf'
-APP_KEY = 'aa3b402d110d32be2cf914e5dc28d0f6'
-
-def fetch_jobs_from_adzuna(role):
-    url = "https://api.adzuna.com/v1/api/jobs/in/search/1"
-    params = {
-        "app_id": APP_ID,
-        "app_key": APP_KEY,
-        "what": role,
-        "results_per_page": 50,  # increased to 50 for more jobs
-        "content-type": "application/json"
-    }
-    try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        return response.json().get("results", [])
-    except Exception as e:
-        print(f"Error fetching jobs: {e}")
-        return []
-
 # --- Login required decorator ---
 def login_required(f):
     @wraps(f)
@@ -165,17 +87,14 @@ def index():
             flash("Please upload a resume file.", "danger")
             return redirect(request.url)
 
-        filename = file.filename
-        save_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(save_path)
-
-        # Read resume text (assuming PDF text extraction or simple read for demo)
-        # For production, extract text properly from PDF or DOCX
-        with open(save_path, "rb") as f:
-            resume_text = f.read().decode(errors='ignore')  # simplistic reading, replace with real extraction
+        try:
+            resume_hash, resume_text = upload_store.receive(file)
+        except pdf_text.ExtractionError as e:
+            flash(f"Failed to extract text from resume: {e}", "danger")
+            return redirect(request.url)
 
-        jobs = fetch_jobs_from_adzuna(job_role)
-        matched_jobs = match_jobs_to_resume(resume_text, jobs, threshold=0.25)
+        matched_jobs, timings = cached_two_stage_match(resume_hash, resume_text, job_role, threshold=0.25)
+        print(f"Two-stage match for '{job_role}': {timings}")
 
         return render_template('results.html',
                                matched_jobs=matched_jobs,
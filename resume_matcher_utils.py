@@ -1,28 +1,109 @@
-import re
-import spacy
-from sentence_transformers import SentenceTransformer, util
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-
-nlp = spacy.load("en_core_web_sm")
-model = SentenceTransformer('all-MiniLM-L6-v2')
-
-def clean_text(text):
-    text = re.sub(r'([a-z])([A-Z])', r'\1 \2', text)
-    text = re.sub(r'[^a-zA-Z0-9\s]', ' ', text)
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text.lower()
-
-def combined_similarity(text1, text2):
-    text1 = clean_text(text1)
-    text2 = clean_text(text2)
-
-    vectorizer = TfidfVectorizer().fit([text1, text2])
-    tfidf_matrix = vectorizer.transform([text1, text2])
-    tfidf_sim = cosine_similarity(tfidf_matrix[0], tfidf_matrix[1])[0][0]
-
-    emb1 = model.encode(text1, convert_to_tensor=True)
-    emb2 = model.encode(text2, convert_to_tensor=True)
-    emb_sim = util.cos_sim(emb1, emb2).item()
-
-    return 0.5 * tfidf_sim + 0.5 * emb_sim
+import os
+import time
+
+import job_store
+import models
+import result_cache
+from documents import as_document, build_documents, encode_documents
+from job_filters import JobFilters
+from chunking import SINGLE, SCORING_MODE, embedding_scores
+from keywords import KEYWORD_WEIGHT, keyword_scores
+from tfidf_engine import get_scorer, pair_similarity
+from vector_index import normalize
+
+# Two-stage retrieval: BM25 picks FIRST_STAGE_K candidates for the role,
+# only those are reranked with the hybrid TF-IDF + embedding score
+FIRST_STAGE_K = int(os.environ.get('FIRST_STAGE_K', 300))
+
+def combined_similarity(text1, text2, mode=SCORING_MODE):
+    # Texts or ProcessedDocuments; a document reused across calls is only
+    # cleaned and encoded once
+    doc1, doc2 = as_document(text1), as_document(text2)
+
+    tfidf_sim = pair_similarity(doc1.cleaned, doc2.cleaned)
+
+    return 0.5 * tfidf_sim + 0.5 * float(embedding_similarities(doc1, [doc2], mode)[0])
+
+def embedding_similarities(resume, jobs, mode=SCORING_MODE):
+    if mode == SINGLE:
+        job_embeds = encode_documents([resume] + list(jobs))[1:]
+        return normalize(job_embeds) @ normalize(resume.embedding[None, :])[0]
+    return embedding_scores(resume.cleaned, [job.cleaned for job in jobs], mode)
+
+def hybrid_scores(resume, jobs, mode=SCORING_MODE, keyword_weight=KEYWORD_WEIGHT):
+    # Texts or ProcessedDocuments; scores one resume against every job at once
+    resume = as_document(resume)
+    jobs = [as_document(job) for job in jobs]
+    job_texts = [job.cleaned for job in jobs]
+    tfidf_sims = get_scorer(job_texts).score(resume.cleaned, job_texts)
+    emb_sims = embedding_similarities(resume, jobs, mode)
+    scores = 0.5 * tfidf_sims + 0.5 * emb_sims
+    if keyword_weight:
+        scores = (1 - keyword_weight) * scores + keyword_weight * keyword_scores(resume.cleaned, job_texts)
+    return scores
+
+def match_jobs_to_resume(resume_text, job_listings, threshold=0.3, mode=SCORING_MODE, filters=None, stats=None):
+    resume = as_document(resume_text)
+    matched_jobs = []
+
+    job_listings = [job for job in job_listings if job.get("description")]
+    # Metadata filters before any cleaning, encoding or scoring
+    keep = (filters or JobFilters()).apply(job_listings, stats)
+    job_listings = [job_listings[i] for i in keep]
+    if not job_listings:
+        return matched_jobs
+
+    jobs = build_documents(job["description"] for job in job_listings)
+    sims = hybrid_scores(resume, jobs, mode)
+
+    for job, sim in zip(job_listings, sims.tolist()):
+        job_desc = job["description"]
+        job_location = job.get("location", {}).get("display_name", "")
+
+        if sim >= threshold:
+            matched_jobs.append({
+                "title": job.get("title", "No title"),
+                "location": job_location,
+                "description": job_desc[:300] + "...",
+                "redirect_url": job.get("redirect_url", "#"),
+                "similarity": round(sim * 100, 2)
+            })
+
+    matched_jobs.sort(key=lambda x: x["similarity"], reverse=True)
+    return matched_jobs
+
+def two_stage_match(resume_text, role, threshold=0.3, first_stage_k=FIRST_STAGE_K, top_k=None,
+                    mode=SCORING_MODE, filters=None):
+    timings = {}
+    started = time.perf_counter()
+    job_store.ensure_fresh(role)
+    timings['sync_ms'] = round((time.perf_counter() - started) * 1000, 2)
+
+    resume = as_document(resume_text)
+    started = time.perf_counter()
+    jobs, _ = job_store.lexical_candidates(resume.text, role, k=first_stage_k)
+    timings['bm25_ms'] = round((time.perf_counter() - started) * 1000, 2)
+    timings['candidates'] = len(jobs)
+
+    started = time.perf_counter()
+    stats = {}
+    matched_jobs = match_jobs_to_resume(resume, jobs, threshold=threshold, mode=mode, filters=filters,
+                                        stats=stats)[:top_k]
+    timings['filtered'] = stats.get('filtered', {})
+    timings['rerank_ms'] = round((time.perf_counter() - started) * 1000, 2)
+    return matched_jobs, timings
+
+def cached_two_stage_match(resume_hash, resume_text, role, threshold=0.3, mode=SCORING_MODE):
+    # two_stage_match keyed like app.py's result cache: the same resume (by
+    # content hash) and role against an unchanged corpus is only a lookup
+    job_store.ensure_fresh(role)
+    version = ":".join(['two-stage', models.cache_name(models.MODEL_NAME), mode, str(FIRST_STAGE_K),
+                        str(KEYWORD_WEIGHT), str(threshold)])
+    key = result_cache.make_key(resume_hash, job_store.normalize_role(role), version, job_store.corpus_version(role))
+    cache = result_cache.get_cache()
+    cached = cache.get(key)
+    if cached is not None:
+        return cached[0]['matched_jobs'], {'cached': True}
+    matched_jobs, timings = two_stage_match(resume_text, role, threshold=threshold, mode=mode)
+    cache.put(key, {'matched_jobs': matched_jobs})
+    return matched_jobs, timings
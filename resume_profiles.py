@@ -0,0 +1,150 @@
+import heapq
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+
+import numpy as np
+
+from job_filters import JobFilters
+from vector_index import normalize
+
+# Saved resume profiles and their running top-k job lists, kept in users.db.
+# Each user's latest match leaves a profile (role, filters, skills and the
+# skills vector match_jobs scored with). When a sync adds postings, only the
+# new rows are scored: one (profiles x new jobs) matrix product per sync,
+# then each profile's stored top-k is merged through a bounded heap. Entries
+# that enter a list this way are "new" until the user has seen them.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.environ.get('USERS_DB', os.path.join(BASE_DIR, 'users.db'))
+TOP_K = 20
+THRESHOLD = 30.0     # same cut-off as app.match_jobs, in percent
+
+
+def connect(path=DB_PATH):
+    conn = sqlite3.connect(path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode=WAL')
+    init_profiles(conn)
+    return conn
+
+
+def init_profiles(conn):
+    conn.executescript(
+        '''CREATE TABLE IF NOT EXISTS resume_profiles
+           (user_email TEXT PRIMARY KEY,
+            resume_hash TEXT NOT NULL,
+            role TEXT NOT NULL,
+            filters TEXT NOT NULL,
+            skills TEXT NOT NULL,
+            embedding BLOB NOT NULL,
+            updated REAL NOT NULL);
+           CREATE INDEX IF NOT EXISTS idx_resume_profiles_role ON resume_profiles (role);
+           CREATE TABLE IF NOT EXISTS profile_matches
+           (user_email TEXT NOT NULL,
+            job_id TEXT NOT NULL,
+            score REAL NOT NULL,
+            seen INTEGER NOT NULL DEFAULT 0,
+            added REAL NOT NULL,
+            PRIMARY KEY (user_email, job_id));''')
+    conn.commit()
+
+
+def save_profile(user_email, resume_hash, role, filters, skills, embedding, matches=(), path=DB_PATH):
+    # Replaces the user's profile; matches are (job_id, score) the user has
+    # just been shown, so they seed the list as already seen
+    now = time.time()
+    vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+    top = heapq.nlargest(TOP_K, ((score, job_id) for job_id, score in matches if job_id is not None))
+    with closing(connect(path)) as conn:
+        conn.execute('INSERT OR REPLACE INTO resume_profiles (user_email, resume_hash, role, filters, skills, '
+                     'embedding, updated) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                     (user_email, resume_hash, role, json.dumps(filters), json.dumps(list(skills)),
+                      vector.tobytes(), now))
+        conn.execute('DELETE FROM profile_matches WHERE user_email = ?', (user_email,))
+        conn.executemany('INSERT INTO profile_matches (user_email, job_id, score, seen, added) '
+                         'VALUES (?, ?, ?, 1, ?)', [(user_email, job_id, score, now) for score, job_id in top])
+        conn.commit()
+
+
+def _flat(row):
+    return {field: row[field] for field in ('location', 'salary_max', 'contract_type', 'category_tag', 'created')}
+
+
+def rematch(conn, job_ids, top_k=TOP_K, threshold=THRESHOLD):
+    # Scores new postings against every saved profile of the roles they
+    # belong to; returns {user_email: number of new matches}
+    job_ids = list(job_ids)
+    if not job_ids:
+        return {}
+    init_profiles(conn)
+    placeholders = ','.join('?' * len(job_ids))
+    rows = conn.execute(f'SELECT * FROM jobs WHERE embedding IS NOT NULL AND id IN ({placeholders})',
+                        job_ids).fetchall()
+    if not rows:
+        return {}
+    links = conn.execute(f'SELECT job_id, role FROM job_roles WHERE job_id IN ({placeholders})', job_ids).fetchall()
+    roles = {}
+    for link in links:
+        roles.setdefault(link['role'], set()).add(link['job_id'])
+    profiles = conn.execute(f"SELECT * FROM resume_profiles WHERE role IN ({','.join('?' * len(roles))})",
+                            list(roles)).fetchall()
+    if not profiles:
+        return {}
+
+    job_vectors = normalize(np.vstack([np.frombuffer(row['embedding'], dtype=np.float32) for row in rows]))
+    profile_vectors = normalize(np.vstack([np.frombuffer(p['embedding'], dtype=np.float32) for p in profiles]))
+    # Every profile against every new posting in one product
+    scores = (profile_vectors @ job_vectors.T) * 100
+    records = [_flat(row) for row in rows]
+    ids = [row['id'] for row in rows]
+
+    now = time.time()
+    added = {}
+    for i, profile in enumerate(profiles):
+        in_role = roles[profile['role']]
+        passing = set(JobFilters(**json.loads(profile['filters'])).apply_records(records))
+        candidates = [(float(scores[i, j]), ids[j]) for j in range(len(ids))
+                      if j in passing and ids[j] in in_role and scores[i, j] >= threshold]
+        if not candidates:
+            continue
+        email = profile['user_email']
+        current = conn.execute('SELECT job_id, score FROM profile_matches WHERE user_email = ?', (email,)).fetchall()
+        heap = [(row['score'], row['job_id']) for row in current]
+        heapq.heapify(heap)
+        known = {job_id for _, job_id in heap}
+        for entry in candidates:
+            if entry[1] in known:
+                continue
+            if len(heap) < top_k:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+        kept = {job_id for _, job_id in heap}
+        dropped = known - kept
+        entered = [(score, job_id) for score, job_id in heap if job_id not in known]
+        if dropped:
+            conn.executemany('DELETE FROM profile_matches WHERE user_email = ? AND job_id = ?',
+                             [(email, job_id) for job_id in dropped])
+        conn.executemany('INSERT INTO profile_matches (user_email, job_id, score, seen, added) VALUES (?, ?, ?, 0, ?)',
+                         [(email, job_id, score, now) for score, job_id in entered])
+        if entered:
+            added[email] = len(entered)
+    conn.commit()
+    return added
+
+
+def new_matches(user_email, path=DB_PATH, mark_seen=True):
+    # Unseen matches, best first, as job rows plus score
+    with closing(connect(path)) as conn:
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'jobs'").fetchone() is None:
+            return []
+        rows = conn.execute('SELECT jobs.*, profile_matches.score AS score FROM profile_matches '
+                            'JOIN jobs ON jobs.id = profile_matches.job_id '
+                            'WHERE profile_matches.user_email = ? AND profile_matches.seen = 0 '
+                            'ORDER BY profile_matches.score DESC', (user_email,)).fetchall()
+        if mark_seen and rows:
+            conn.execute('UPDATE profile_matches SET seen = 1 WHERE user_email = ? AND seen = 0', (user_email,))
+            conn.commit()
+    return rows
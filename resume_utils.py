@@ -1,15 +1,11 @@
 from flask import Flask, render_template, request, redirect, url_for, session, flash
-from werkzeug.utils import secure_filename
-import os
-from job_fetcher import fetch_jobs_from_adzuna
-from resume_matcher import match_jobs_to_resume
+import pdf_text
+import upload_store
+from resume_matcher_utils import cached_two_stage_match
 
 app = Flask(__name__)
 app.secret_key = 'your_secret_key_here'
-
-UPLOAD_FOLDER = 'uploads'
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+upload_store.configure(app)
 
 # In-memory user storage
 users = {}
@@ -48,20 +44,18 @@ def index():
         if not resume or not role:
             error = "Please upload resume and enter a job role."
         else:
-            filename = secure_filename(resume.filename)
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            resume.save(filepath)
-
-            with open(filepath, 'rb') as f:
-                resume_text = f.read().decode('utf-8', errors='ignore')
-
-            jobs = fetch_jobs_from_adzuna(role)
-            matched_jobs = match_jobs_to_resume(resume_text, jobs)
-
-            return render_template('results.html',
-                                   matched_jobs=matched_jobs,
-                                   role=role,
-                                   username=session['username'])
+            try:
+                resume_hash, resume_text = upload_store.receive(resume)
+            except pdf_text.ExtractionError as e:
+                error = str(e)
+            else:
+                matched_jobs, timings = cached_two_stage_match(resume_hash, resume_text, role)
+                print(f"Two-stage match for '{role}': {timings}")
+
+                return render_template('results.html',
+                                       matched_jobs=matched_jobs,
+                                       role=role,
+                                       username=session['username'])
 
     return render_template('index.html', username=session['username'], error=error)
 
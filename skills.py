@@ -0,0 +1,88 @@
+import hashlib
+import os
+import threading
+
+import models
+
+# Gazetteer skill extraction. Every canonical skill and alias from
+# skills_list.txt is compiled into spaCy PhraseMatchers that only need the
+# tokenizer, so no tagger or parser runs. Skills are numbered in file order,
+# which lets a document's skills be held as an int bitset and the overlap
+# between a resume and a posting be a single AND.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SKILLS_PATH = os.environ.get('SKILLS_PATH', os.path.join(BASE_DIR, 'skills_list.txt'))
+EXACT_CASE_MAX_LEN = 2    # aliases this short (R, Go) only match as written
+PIPE_BATCH_SIZE = 64
+
+
+def load_taxonomy(path=None):
+    taxonomy = {}
+    with open(path or SKILLS_PATH, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            names = [name.strip() for name in line.split('|') if name.strip()]
+            aliases = taxonomy.setdefault(names[0], [])
+            aliases.extend(name for name in names if name not in aliases)
+    return taxonomy
+
+
+class SkillExtractor:
+    def __init__(self, taxonomy=None, nlp=None):
+        from spacy.matcher import PhraseMatcher
+
+        self.taxonomy = taxonomy if taxonomy is not None else load_taxonomy()
+        self.skills = list(self.taxonomy)
+        self.bits = {skill: i for i, skill in enumerate(self.skills)}
+        self.version = hashlib.sha256(repr(sorted(self.taxonomy.items())).encode('utf-8')).hexdigest()[:16]
+        self.nlp = nlp if nlp is not None else models.get_blank_nlp()
+
+        self._folded = PhraseMatcher(self.nlp.vocab, attr='LOWER')
+        self._exact = PhraseMatcher(self.nlp.vocab, attr='ORTH')
+        for skill, aliases in self.taxonomy.items():
+            folded = [alias for alias in aliases if len(alias) > EXACT_CASE_MAX_LEN]
+            exact = [alias for alias in aliases if len(alias) <= EXACT_CASE_MAX_LEN]
+            if folded:
+                self._folded.add(skill, [self.nlp.make_doc(alias) for alias in folded])
+            if exact:
+                self._exact.add(skill, [self.nlp.make_doc(alias) for alias in exact])
+
+    def _skills_in(self, doc):
+        found = set()
+        for matcher in (self._folded, self._exact):
+            for match_id, _, _ in matcher(doc):
+                found.add(self.nlp.vocab.strings[match_id])
+        return sorted(found, key=self.bits.__getitem__)
+
+    def extract(self, text):
+        return self._skills_in(self.nlp.make_doc(text or ""))
+
+    def extract_many(self, texts, batch_size=PIPE_BATCH_SIZE, n_process=1):
+        # The blank pipeline has no components, so nlp.pipe only tokenizes
+        docs = self.nlp.pipe((text or "" for text in texts), batch_size=batch_size, n_process=n_process)
+        return [self._skills_in(doc) for doc in docs]
+
+    def mask(self, skills):
+        bits = 0
+        for skill in skills:
+            bit = self.bits.get(skill)
+            if bit is not None:
+                bits |= 1 << bit
+        return bits
+
+    def names(self, mask):
+        return [skill for i, skill in enumerate(self.skills) if mask >> i & 1]
+
+
+_extractor = None
+_extractor_lock = threading.Lock()
+
+
+def get_extractor():
+    global _extractor
+    if _extractor is None:
+        with _extractor_lock:
+            if _extractor is None:
+                _extractor = SkillExtractor()
+    return _extractor
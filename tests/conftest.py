@@ -0,0 +1,112 @@
+import hashlib
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class StubTokenizer:
+    def __init__(self, do_lower_case):
+        self.do_lower_case = do_lower_case
+
+
+class StubModel:
+    # Deterministic bag-of-words "encoder" that records every encode call
+    def __init__(self, dim=32, do_lower_case=True):
+        self.dim = dim
+        self.tokenizer = StubTokenizer(do_lower_case)
+        self.calls = []
+
+    def embed(self, text):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        words = text.lower().split() if self.tokenizer.do_lower_case else text.split()
+        for word in words:
+            slot = int(hashlib.md5(word.encode('utf-8')).hexdigest(), 16) % self.dim
+            vector[slot] += 1.0
+        return vector
+
+    def encode(self, sentences, batch_size=32, convert_to_numpy=True, convert_to_tensor=False,
+               show_progress_bar=False, **kwargs):
+        single = isinstance(sentences, str)
+        batch = [sentences] if single else list(sentences)
+        self.calls.append(batch)
+        vectors = np.vstack([self.embed(text) for text in batch]) if batch else np.zeros((0, self.dim))
+        return vectors[0] if single else vectors
+
+
+class StubSkillExtractor:
+    # Whole-word gazetteer lookup standing in for the spaCy PhraseMatcher
+    def __init__(self, taxonomy):
+        self.taxonomy = taxonomy
+        self.skills = list(taxonomy)
+        self.bits = {skill: i for i, skill in enumerate(self.skills)}
+        self.version = 'stub'
+        self.batches = []
+
+    def extract(self, text):
+        padded = f" {' '.join((text or '').lower().split())} "
+        return [skill for skill, aliases in self.taxonomy.items()
+                if any(f" {alias.lower()} " in padded for alias in aliases)]
+
+    def extract_many(self, texts, **kwargs):
+        texts = list(texts)
+        self.batches.append(texts)
+        return [self.extract(text) for text in texts]
+
+    def mask(self, skills):
+        return sum(1 << self.bits[skill] for skill in set(skills) if skill in self.bits)
+
+    def names(self, mask):
+        return [skill for i, skill in enumerate(self.skills) if mask >> i & 1]
+
+
+@pytest.fixture
+def stub_model():
+    return StubModel()
+
+
+@pytest.fixture
+def stub_extractor(monkeypatch):
+    import skills
+    extractor = StubSkillExtractor(skills.load_taxonomy())
+    monkeypatch.setattr(skills, '_extractor', extractor)
+    return extractor
+
+
+@pytest.fixture(autouse=True)
+def isolated_metrics(tmp_path, monkeypatch):
+    # Every request and task writes a log record and a metrics snapshot
+    import metrics
+    monkeypatch.setattr(metrics, '_registry', metrics.Registry())
+    monkeypatch.setattr(metrics, 'REQUEST_LOG', str(tmp_path / 'logs' / 'requests.jsonl'))
+    monkeypatch.setattr(metrics, 'METRICS_DIR', str(tmp_path / 'metrics'))
+    monkeypatch.setattr(metrics, 'PROFILE_DIR', str(tmp_path / 'profiles'))
+    return metrics
+
+
+@pytest.fixture
+def isolated_caches(tmp_path, monkeypatch):
+    # Point the process-wide embedding cache and TF-IDF model at tmp_path
+    import embedding_cache
+    import tfidf_engine
+    monkeypatch.setattr(embedding_cache, '_cache', embedding_cache.EmbeddingCache(path=str(tmp_path / 'emb.db')))
+    monkeypatch.setattr(tfidf_engine, '_scorer', None)
+    monkeypatch.setattr(tfidf_engine, 'TFIDF_PATH', str(tmp_path / 'tfidf.pkl'))
+    return tmp_path
+
+
+def make_job(job_id, description, title='Engineer', location='Bangalore, India', **extra):
+    job = {
+        'id': job_id,
+        'title': title,
+        'description': description,
+        'location': {'display_name': location},
+        'company': {'display_name': 'Acme'},
+        'redirect_url': f'https://example.com/{job_id}',
+        'created': '2026-01-01T00:00:00Z',
+    }
+    job.update(extra)
+    return job
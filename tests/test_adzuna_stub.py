@@ -0,0 +1,54 @@
+import json
+import threading
+
+import pytest
+from werkzeug.serving import make_server
+
+import adzuna_stub
+import job_fetcher
+
+
+@pytest.fixture
+def stub_url(monkeypatch):
+    # A live stand-in, so job_fetcher talks to it over HTTP like to Adzuna
+    servers = []
+
+    def start(**options):
+        server = make_server('127.0.0.1', 0, adzuna_stub.create_app(**options), threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        url = f"http://127.0.0.1:{server.server_port}/v1/api/jobs/in/search"
+        monkeypatch.setattr(job_fetcher, 'BASE_URL', url)
+        monkeypatch.setattr(job_fetcher, '_cache', {})
+        monkeypatch.setattr(job_fetcher, 'BACKOFF_BASE', 0.0)
+        return server.app
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+def test_generated_pages_are_stable_and_end(stub_url):
+    stub_url(pages=2)
+    jobs = job_fetcher.fetch_jobs_from_adzuna('Data Engineer', pages=3, results_per_page=5)
+    assert len(jobs) == 10
+    assert jobs[0]['id'] == 'stub-data-engineer-1-0' and jobs[0]['title'] == 'Data Engineer'
+    job_fetcher._cache.clear()
+    assert [job['id'] for job in job_fetcher.fetch_jobs_from_adzuna('Data Engineer', pages=2,
+                                                                     results_per_page=5)] == [job['id'] for job in jobs]
+
+
+def test_replays_recorded_responses(stub_url, tmp_path):
+    recorded = [{'id': str(i), 'title': 'Python Developer' if i % 2 else 'Chef', 'description': 'x'}
+                for i in range(6)]
+    (tmp_path / 'page1.json').write_text(json.dumps({'results': recorded}))
+    stub_url(replay=str(tmp_path))
+    jobs = job_fetcher.fetch_page('python developer', results_per_page=2)
+    assert [job['id'] for job in jobs] == ['1', '3']
+    assert [job['id'] for job in job_fetcher.fetch_page('python developer', page=2, results_per_page=2)] == ['5']
+
+
+def test_injected_errors_are_retried_by_the_client(stub_url, monkeypatch):
+    monkeypatch.setattr(job_fetcher, 'MAX_RETRIES', 1)
+    app = stub_url(error_rate=1.0)
+    assert job_fetcher.fetch_jobs_from_adzuna('Data Engineer') == []
+    assert app.config['STUB_STATS'] == {'requests': 2, 'errors': 2, 'rate_limited': 0}
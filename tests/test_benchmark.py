@@ -0,0 +1,40 @@
+import benchmark
+
+
+def test_small_run_reports_every_benchmark(monkeypatch):
+    import embedding_cache
+    import models
+    import pdf_text
+    import tfidf_engine
+    # run() swaps these for temporary ones; monkeypatch puts them back
+    monkeypatch.setattr(models, '_models', {})
+    monkeypatch.setattr(embedding_cache, '_cache', None)
+    monkeypatch.setattr(pdf_text, '_cache', None)
+    monkeypatch.setattr(tfidf_engine, '_scorer', None)
+    monkeypatch.setattr(tfidf_engine, 'TFIDF_PATH', tfidf_engine.TFIDF_PATH)
+
+    report = benchmark.run(sizes=(5, 20), repeat=2, resume_count=3)
+    rows = {(row['benchmark'], row['size']): row for row in report['results']}
+    assert set(rows) == {('clean_text', None), ('extract_text_from_pdf', None), ('extract_skills', None),
+                         ('combined_similarity', None), ('match_jobs', 5), ('match_jobs', 20),
+                         ('match_jobs_to_resume', 5), ('match_jobs_to_resume', 20)}
+    for row in rows.values():
+        # Benchmarks needing an uninstalled package say so instead of failing
+        assert 'skipped' in row or row['p50_ms'] <= row['p99_ms']
+    assert rows[('match_jobs_to_resume', 20)]['runs'] == 2
+    assert report['meta']['embedder'] == 'hashing'
+
+
+def test_compare_flags_regressions():
+    baseline = {'results': [{'benchmark': 'clean_text', 'size': None, 'p50_ms': 10.0},
+                            {'benchmark': 'match_jobs', 'size': 50, 'p50_ms': 10.0}]}
+    current = {'results': [{'benchmark': 'clean_text', 'size': None, 'p50_ms': 11.0},
+                           {'benchmark': 'match_jobs', 'size': 50, 'p50_ms': 15.0},
+                           {'benchmark': 'match_jobs', 'size': 1000, 'p50_ms': 99.0}]}
+    rows = benchmark.compare(baseline, current)
+    assert [(row['benchmark'], row['regression']) for row in rows] == [('clean_text', False), ('match_jobs', True)]
+
+
+def test_synthetic_corpora_are_deterministic():
+    assert benchmark.synthetic_jobs(3) == benchmark.synthetic_jobs(3)
+    assert len(benchmark.synthetic_resumes(4)) == 4
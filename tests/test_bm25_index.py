@@ -0,0 +1,67 @@
+import math
+
+from bm25_index import BM25Index
+from text_utils import clean_text
+
+DOCS = {
+    'a': 'Python developer with Django and SQL',
+    'b': 'Java backend engineer, Spring Boot',
+    'c': 'Data scientist: Python, machine learning, SQL, statistics',
+    'd': 'Frontend engineer React JavaScript',
+}
+
+
+def build():
+    index = BM25Index()
+    for doc_id, text in DOCS.items():
+        index.add(doc_id, text, groups=['python' if 'Python' in text else 'other'])
+    return index
+
+
+def reference_score(index, query, doc_text):
+    docs = [clean_text(text).split() for text in DOCS.values()]
+    avgdl = sum(len(doc) for doc in docs) / len(docs)
+    doc = clean_text(doc_text).split()
+    score = 0.0
+    for term in set(query.split()):
+        df = sum(term in d for d in docs)
+        tf = doc.count(term)
+        if df and tf:
+            idf = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+            score += idf * tf * (index.k1 + 1) / (tf + index.k1 * (1 - index.b + index.b * len(doc) / avgdl))
+    return score
+
+
+def test_scores_match_reference_bm25():
+    index = build()
+    hits = dict(index.search('python sql', k=10))
+    assert set(hits) == {'a', 'c'}
+    for doc_id in hits:
+        assert math.isclose(hits[doc_id], reference_score(index, 'python sql', DOCS[doc_id]), rel_tol=1e-5)
+
+
+def test_group_restricts_candidates():
+    index = build()
+    assert [doc_id for doc_id, _ in index.search('engineer', k=10, group='python')] != []
+    assert {doc_id for doc_id, _ in index.search('engineer', k=10, group='other')} == {'b', 'd'}
+
+
+def test_incremental_add_remove_and_compaction():
+    index = build()
+    index.add('e', 'Python Flask engineer', groups=['python'])
+    assert index.search('flask', k=1)[0][0] == 'e'
+
+    index.remove(['a', 'c'])
+    assert len(index) == 3
+    assert {doc_id for doc_id, _ in index.search('python', k=10)} == {'e'}
+    assert index.search('python', k=10, group='python')[0][0] == 'e'
+
+    index.add('a', DOCS['a'], groups=['python'])
+    assert index.search('django', k=1)[0][0] == 'a'
+
+
+def test_save_and_load(tmp_path):
+    index = build()
+    path = str(tmp_path / 'bm25.pkl')
+    index.save(path)
+    assert BM25Index.load(path).search('python sql', k=5) == index.search('python sql', k=5)
@@ -0,0 +1,91 @@
+import json
+
+import numpy as np
+import pytest
+
+import bulk_match
+import job_store
+import models
+import pdf_text
+from conftest import make_job
+
+
+@pytest.fixture
+def corpus(isolated_caches, stub_model, stub_extractor, monkeypatch):
+    monkeypatch.setattr(models, 'get_embedder', lambda *args, **kwargs: stub_model)
+    monkeypatch.setattr(pdf_text, '_cache', pdf_text.TextCache(str(isolated_caches / 'texts')))
+    monkeypatch.setattr(job_store, 'VECTOR_DTYPE', 'float32')
+    path = str(isolated_caches / 'users.db')
+    jobs = [make_job(str(i), desc, title=f'Job {i}') for i, desc in enumerate([
+        'python django developer', 'java spring engineer', 'registered nurse icu',
+        'python data engineer spark', 'react frontend developer', 'sql data analyst python',
+    ])]
+    job_store.sync('any', stub_model, fetch=lambda role, **kwargs: jobs, path=path)
+    job_store.sync('nursing', stub_model, fetch=lambda role, **kwargs: jobs[2:3], path=path)
+
+    resumes = isolated_caches / 'resumes'
+    (resumes / 'team').mkdir(parents=True)
+    (resumes / 'alice.txt').write_text('python developer with django and sql')
+    (resumes / 'bob.txt').write_text('nurse with icu experience')
+    (resumes / 'team' / 'carol.txt').write_text('frontend react developer')
+    (resumes / 'notes.md').write_text('ignored')
+    return path, resumes
+
+
+def read(out):
+    return {record['resume']: record for record in map(json.loads, out.read_text().splitlines())}
+
+
+def test_blocked_top_k_matches_full_matrix(corpus, stub_model, tmp_path):
+    path, resumes = corpus
+    out = tmp_path / 'out.jsonl'
+    stats = bulk_match.run(str(resumes), str(out), top_k=2, processes=1, batch_size=2, block_size=4, db_path=path)
+    assert stats['matched'] == 3 and stats['failed'] == 0
+
+    records = read(out)
+    assert set(records) == {'alice.txt', 'bob.txt', 'team/carol.txt'}
+    store = job_store.get_vector_store(path)
+    ids, vectors = store.ids, store.vectors_for(store.ids)
+    for name, record in records.items():
+        query = stub_model.encode([bulk_match.clean_text((resumes / name).read_text())])
+        scores = (bulk_match.normalize(vectors) @ bulk_match.normalize(query)[0])
+        expected = [ids[i] for i in np.argsort(-scores)[:2]]
+        assert [match['id'] for match in record['matches']] == expected
+
+
+def test_role_restricts_the_corpus(corpus, tmp_path):
+    path, resumes = corpus
+    out = tmp_path / 'out.jsonl'
+    bulk_match.run(str(resumes), str(out), role='Nursing', top_k=3, processes=1, db_path=path)
+
+    for record in read(out).values():
+        assert [match['id'] for match in record['matches']] == ['2']
+
+
+def test_rerun_skips_finished_resumes_and_repairs_partial_line(corpus, tmp_path):
+    path, resumes = corpus
+    out = tmp_path / 'out.jsonl'
+    out.write_text(json.dumps({'resume': 'alice.txt', 'matches': []}) + '\n{"resume": "bo')
+
+    stats = bulk_match.run(str(resumes), str(out), processes=1, db_path=path)
+
+    assert stats['skipped'] == 1 and stats['matched'] == 2
+    records = read(out)
+    assert records['alice.txt']['matches'] == []
+    assert records['bob.txt']['matches']
+
+
+def test_process_pool_gives_same_results(corpus, tmp_path):
+    path, resumes = corpus
+    serial, pooled = tmp_path / 'serial.jsonl', tmp_path / 'pooled.jsonl'
+    bulk_match.run(str(resumes), str(serial), processes=1, batch_size=1, db_path=path)
+    bulk_match.run(str(resumes), str(pooled), processes=2, batch_size=1, db_path=path)
+    assert read(serial) == read(pooled)
+
+
+def test_merge_top_k_keeps_best_scores():
+    scores = np.array([[0.1, 0.9], [0.5, 0.4]], dtype=np.float32)
+    rows = np.array([[0, 1], [0, 1]])
+    best, best_rows = bulk_match.merge_top_k(scores[:, :0], rows[:, :0], scores, rows, 1)
+    assert best.ravel().tolist() == pytest.approx([0.9, 0.5])
+    assert best_rows.ravel().tolist() == [1, 0]
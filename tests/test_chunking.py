@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+import chunking
+import models
+from vector_index import normalize
+
+
+@pytest.fixture
+def registry_model(stub_model, isolated_caches, monkeypatch):
+    monkeypatch.setattr(models, 'get_embedder', lambda *args, **kwargs: stub_model)
+    return stub_model
+
+
+def test_chunks_overlap_and_cover_the_text():
+    words = [f"w{i}" for i in range(50)]
+    chunks = chunking.chunk_text(" ".join(words), size=20, overlap=5)
+
+    assert all(len(chunk.split()) == 20 for chunk in chunks)
+    assert chunks[0].split()[0] == 'w0' and chunks[-1].split()[-1] == 'w49'
+    assert chunks[1].split()[:5] == chunks[0].split()[-5:]
+    assert chunking.chunk_text("short text", size=20) == ["short text"]
+
+
+def test_chunk_scores_match_a_per_chunk_loop(registry_model):
+    query = " ".join(["python sql"] * 30)
+    docs = [" ".join(["nursing care"] * 40) + " python sql", "python developer", "java " * 70]
+
+    for mode in (chunking.CHUNK_MAX, chunking.CHUNK_MEAN):
+        scores = chunking.chunk_scores(query, docs, mode, size=16, overlap=4)
+        query_vecs = normalize(registry_model.encode(chunking.chunk_text(query, 16, 4)))
+        expected = []
+        for doc in docs:
+            doc_vecs = normalize(registry_model.encode(chunking.chunk_text(doc, 16, 4)))
+            best = (query_vecs @ doc_vecs.T).max(axis=1)
+            expected.append(best.max() if mode == chunking.CHUNK_MAX else best.mean())
+        assert np.allclose(scores, expected, atol=1e-5)
+
+
+def test_chunking_finds_text_past_the_encoder_window(registry_model):
+    # The matching skill only appears at the end of a long posting
+    long_doc = " ".join(["filler"] * 400) + " kubernetes terraform"
+    single = chunking.embedding_scores("kubernetes terraform", [long_doc], chunking.SINGLE)
+    chunked = chunking.embedding_scores("kubernetes terraform", [long_doc], chunking.CHUNK_MAX)
+    assert chunked[0] > single[0]
+
+
+def test_all_chunks_are_encoded_in_one_call(registry_model):
+    registry_model.calls.clear()
+    chunking.chunk_scores("a " * 300, ["b " * 300, "c " * 10], chunking.CHUNK_MEAN)
+    assert len(registry_model.calls) == 1
+
+    with pytest.raises(ValueError):
+        chunking.chunk_scores("a", ["b"], 'bogus')
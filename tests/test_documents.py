@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+import documents
+import models
+from chunking import SINGLE, embedding_scores
+from documents import ProcessedDocument, build_documents
+from text_utils import clean_text
+
+
+@pytest.fixture
+def registry_model(stub_model, isolated_caches, monkeypatch):
+    monkeypatch.setattr(models, 'get_embedder', lambda *args, **kwargs: stub_model)
+    return stub_model
+
+
+def test_fields_are_computed_once(monkeypatch):
+    calls = []
+    monkeypatch.setattr(documents, 'clean_text', lambda text: calls.append(text) or clean_text(text))
+    doc = ProcessedDocument("Senior PythonDeveloper, SQL & SQL!")
+    assert doc.cleaned == "senior python developer sql sql"
+    assert doc.tokens[:2] == ["senior", "python"]
+    assert doc.term_counts['sql'] == 2
+    assert len(calls) == 1
+
+
+def test_batch_builder_tags_and_encodes_in_one_pass(registry_model, stub_extractor):
+    texts = ["python and sql pipelines", "docker on aws", "registered nurse"]
+    docs = build_documents(texts, skills=True, encode=True)
+    assert len(stub_extractor.batches) == 1 and len(registry_model.calls) == 1
+    assert docs[0].skills == stub_extractor.extract(texts[0])
+    assert np.allclose(docs[1].embedding, registry_model.embed(docs[1].cleaned))
+
+    # Documents already prepared are not tagged or encoded again
+    build_documents(docs + ["kubernetes operator"], skills=True, encode=True)
+    assert stub_extractor.batches[-1] == ["kubernetes operator"]
+    assert registry_model.calls[-1] == ["kubernetes operator"]
+
+
+def test_scorers_take_documents_and_texts_alike(registry_model, monkeypatch):
+    import resume_matcher_utils
+    resume = "Python developer building SQL pipelines"
+    jobs = ["Python SQL developer", "Registered nurse, ICU", "Data engineer: SQL, Airflow"]
+    from_texts = resume_matcher_utils.hybrid_scores(clean_text(resume), [clean_text(job) for job in jobs])
+    docs = build_documents(jobs)
+    from_docs = resume_matcher_utils.hybrid_scores(ProcessedDocument(resume), docs)
+    assert np.allclose(from_texts, from_docs, atol=1e-6)
+    assert np.allclose(
+        resume_matcher_utils.embedding_similarities(ProcessedDocument(resume), docs, SINGLE),
+        embedding_scores(clean_text(resume), [clean_text(job) for job in jobs], SINGLE), atol=1e-6)
+
+    # A resume document compared with many postings is encoded once
+    encoded = []
+    encode = models.encode
+    monkeypatch.setattr(models, 'encode', lambda texts, *args: encoded.extend(texts) or encode(texts, *args))
+    resume_doc = ProcessedDocument(resume)
+    for job in build_documents(jobs):
+        resume_matcher_utils.combined_similarity(resume_doc, job, mode=SINGLE)
+    assert encoded.count(resume_doc.cleaned) == 1 and len(encoded) == 1 + len(jobs)
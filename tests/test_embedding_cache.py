@@ -0,0 +1,103 @@
+import importlib
+import sys
+
+import numpy as np
+import pytest
+
+from conftest import StubModel
+from embedding_cache import EmbeddingCache, cache_key
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return EmbeddingCache(path=str(tmp_path / 'embeddings.db'), max_entries=100, memory_entries=10)
+
+
+def test_misses_are_encoded_in_one_batch(cache, stub_model):
+    vectors = cache.encode(stub_model, 'stub', ['python developer', 'java developer', 'sql analyst'])
+    assert vectors.shape == (3, stub_model.dim)
+    assert len(stub_model.calls) == 1
+    assert len(stub_model.calls[0]) == 3
+
+
+def test_repeated_and_whitespace_variant_texts_hit_cache(cache, stub_model):
+    cache.encode(stub_model, 'stub', ['Python  developer'])
+    vectors = cache.encode(stub_model, 'stub', ['Python developer', ' python\ndeveloper ', 'Python developer'])
+    assert len(stub_model.calls) == 1
+    assert cache.hits == 3
+    assert np.allclose(vectors[0], vectors[1])
+
+
+def test_duplicates_in_one_call_are_encoded_once(cache, stub_model):
+    cache.encode(stub_model, 'stub', ['data science', 'data science', 'data  science'])
+    assert stub_model.calls == [['data science']]
+
+
+def test_case_is_kept_for_cased_models():
+    assert cache_key('m', 'Apple') != cache_key('m', 'apple')
+    assert cache_key('m', 'Apple', lowercase=True) == cache_key('m', 'apple', lowercase=True)
+
+
+def test_cased_model_does_not_share_entries(cache):
+    model = StubModel(do_lower_case=False)
+    cache.encode(model, 'cased', ['Apple'])
+    cache.encode(model, 'cased', ['apple'])
+    assert len(model.calls) == 2
+
+
+def test_persisted_entries_survive_reopen(tmp_path, stub_model):
+    path = str(tmp_path / 'embeddings.db')
+    EmbeddingCache(path=path).encode(stub_model, 'stub', ['kubernetes'])
+    EmbeddingCache(path=path).encode(stub_model, 'stub', ['kubernetes'])
+    assert len(stub_model.calls) == 1
+
+
+def test_lru_eviction_respects_max_entries(tmp_path, stub_model):
+    cache = EmbeddingCache(path=str(tmp_path / 'embeddings.db'), max_entries=5, memory_entries=1)
+    for i in range(5):
+        cache.encode(stub_model, 'stub', [f'skill {i}'])
+    # Touch the oldest entry so it becomes most recently used
+    cache._memory.clear()
+    cache.encode(stub_model, 'stub', ['skill 0'])
+    cache.encode(stub_model, 'stub', ['skill 5', 'skill 6'])
+
+    count = cache._conn.execute('SELECT COUNT(*) FROM embeddings').fetchone()[0]
+    assert count <= 5
+    keys = {row[0] for row in cache._conn.execute('SELECT key FROM embeddings')}
+    assert cache_key('stub', 'skill 0', True) in keys
+    assert cache_key('stub', 'skill 1', True) not in keys
+
+
+def test_match_jobs_matches_per_job_loop(tmp_path, monkeypatch, stub_extractor):
+    import embedding_cache
+    import models
+    from vector_index import normalize
+    stub = StubModel()
+    monkeypatch.setattr(models, 'get_embedder', lambda *args, **kwargs: stub)
+    monkeypatch.setattr(embedding_cache, '_cache', EmbeddingCache(path=str(tmp_path / 'e.db')))
+    sys.modules.pop('app', None)
+    app = importlib.import_module('app')
+
+    skills = ['python', 'machine learning', 'sql']
+    jobs = [
+        {'title': f'Job {i}', 'description': desc, 'location': {'display_name': 'Bangalore, India'}}
+        for i, desc in enumerate([
+            'python sql machine learning engineer',
+            'java spring backend',
+            'python data analyst sql',
+            'machine learning research python',
+        ])
+    ]
+
+    resume_embed = stub.encode(" ".join(skills))
+    expected = []
+    for job in jobs:
+        similarity = float(normalize(resume_embed)[0] @ normalize(stub.encode(job['description']))[0]) * 100
+        if similarity >= 30.0:
+            expected.append((job['title'], round(similarity, 2)))
+    expected.sort(key=lambda x: x[1], reverse=True)
+
+    stub.calls.clear()
+    matched = app.match_jobs(skills, jobs)
+    assert [(job['title'], job['similarity']) for job in matched] == expected
+    assert len(stub.calls) == 2
@@ -0,0 +1,85 @@
+import threading
+import time
+
+import numpy as np
+
+import embedding_cache
+import embedding_service
+from embedding_service import EmbeddingService
+
+
+class SlowModel:
+    def __init__(self, stub_model, delay=0.02):
+        self.stub = stub_model
+        self.tokenizer = stub_model.tokenizer
+        self.delay = delay
+        self.batches = []
+
+    def encode(self, texts, **kwargs):
+        self.batches.append(list(texts))
+        time.sleep(self.delay)
+        return self.stub.encode(texts, **kwargs)
+
+
+def test_concurrent_requests_share_batches(stub_model, isolated_caches):
+    model = SlowModel(stub_model)
+    service = EmbeddingService(model, 'stub', max_batch_size=64, max_wait_ms=20)
+    texts = [f"python developer number {i}" for i in range(16)]
+    results = {}
+
+    def request(i):
+        results[i] = service.encode([texts[i]])
+
+    threads = [threading.Thread(target=request, args=(i,)) for i in range(len(texts))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(model.batches) < len(texts)
+    for i, text in enumerate(texts):
+        assert results[i].shape == (1, stub_model.dim)
+        assert np.allclose(results[i][0], stub_model.encode([text])[0])
+
+    stats = service.stats()
+    assert stats['requests'] == len(texts)
+    assert stats['texts'] == len(texts)
+    assert stats['batches'] == len(model.batches)
+    assert stats['avg_requests_per_batch'] > 1
+    assert stats['queue_depth'] == 0
+
+
+def test_batch_size_is_bounded(stub_model, isolated_caches):
+    service = EmbeddingService(stub_model, 'stub', max_batch_size=4, max_wait_ms=50)
+    futures = [service.submit([f"skill {i}"]) for i in range(10)]
+    rows = [future.result()[0] for future in futures]
+
+    assert len(rows) == 10
+    assert service.stats()['max_batch_size'] <= 4
+
+
+def test_errors_reach_every_caller(isolated_caches):
+    class Broken:
+        def encode(self, texts, **kwargs):
+            raise RuntimeError("model unavailable")
+
+    service = EmbeddingService(Broken(), 'broken', max_wait_ms=1)
+    future = service.submit(["anything"])
+    try:
+        future.result(timeout=5)
+    except RuntimeError as e:
+        assert "unavailable" in str(e)
+    else:
+        raise AssertionError("expected the encode error")
+    # The collector survives and keeps serving
+    assert service.submit([]).result().shape == (0, 0)
+
+
+def test_encode_texts_uses_shared_service(stub_model, isolated_caches, monkeypatch):
+    monkeypatch.setattr(embedding_service, 'ENABLED', True)
+    vectors = embedding_cache.encode_texts(stub_model, ["java", "sql"], model_name='stub')
+
+    assert vectors.shape == (2, stub_model.dim)
+    service = embedding_service.get_service(stub_model, 'stub')
+    assert service is embedding_service.get_service(stub_model, 'stub')
+    assert service.stats()['texts'] >= 2
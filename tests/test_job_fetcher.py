@@ -0,0 +1,99 @@
+import threading
+import time
+
+import pytest
+
+import job_fetcher
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, results=None, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self._results = results or []
+
+    def json(self):
+        return {'results': self._results}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise job_fetcher.requests.HTTPError(f"{self.status_code} error")
+
+
+class FakeSession:
+    def __init__(self, responses=None, delay=0.0):
+        self.responses = responses
+        self.delay = delay
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def get(self, url, params=None, timeout=None):
+        assert timeout is not None
+        with self.lock:
+            self.calls.append((url, dict(params)))
+        if self.delay:
+            time.sleep(self.delay)
+        if self.responses:
+            return self.responses.pop(0)
+        page = int(url.rsplit('/', 1)[-1])
+        return FakeResponse(results=[{'id': f'{page}-{i}', 'description': 'x'} for i in range(2)])
+
+
+@pytest.fixture
+def session(monkeypatch):
+    fake = FakeSession()
+    monkeypatch.setattr(job_fetcher, '_session', fake)
+    monkeypatch.setattr(job_fetcher, '_cache', {})
+    monkeypatch.setattr(job_fetcher, '_inflight', {})
+    monkeypatch.setattr(job_fetcher.time, 'sleep', lambda seconds: None)
+    return fake
+
+
+def test_fetches_pages_and_caches(session):
+    jobs = job_fetcher.fetch_jobs_from_adzuna('Data Scientist', pages=3, location='Bangalore')
+    assert [job['id'] for job in jobs] == ['1-0', '1-1', '2-0', '2-1', '3-0', '3-1']
+    assert sorted(url for url, _ in session.calls) == [f"{job_fetcher.BASE_URL}/{page}" for page in (1, 2, 3)]
+    assert session.calls[0][1]['where'] == 'Bangalore'
+
+    job_fetcher.fetch_jobs_from_adzuna('data scientist ', pages=2, location='bangalore')
+    assert len(session.calls) == 3
+
+
+def test_identical_inflight_requests_are_coalesced(monkeypatch):
+    fake = FakeSession()
+    fake.delay = 0.2
+    monkeypatch.setattr(job_fetcher, '_session', fake)
+    monkeypatch.setattr(job_fetcher, '_cache', {})
+    monkeypatch.setattr(job_fetcher, '_inflight', {})
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(job_fetcher.fetch_page('python', 1)))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(fake.calls) == 1
+    assert len(results) == 5 and all(result == results[0] for result in results)
+
+
+def test_backs_off_when_rate_limited(session, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(job_fetcher.time, 'sleep', sleeps.append)
+    session.responses = [FakeResponse(429, headers={'Retry-After': '2'}), FakeResponse(503),
+                         FakeResponse(results=[{'id': 'a'}])]
+    assert job_fetcher.fetch_page('java', 1) == [{'id': 'a'}]
+    assert sleeps == [2.0, job_fetcher.BACKOFF_BASE * 2]
+
+
+def test_errors_return_partial_results(session):
+    session.responses = [FakeResponse(404)]
+    assert job_fetcher.fetch_jobs_from_adzuna('go', pages=1) == []
+
+
+def test_filter_params_are_sent_upstream_and_keyed(session):
+    job_fetcher.fetch_jobs_from_adzuna('python', params={'salary_min': 500000, 'permanent': 1})
+    assert session.calls[0][1]['salary_min'] == 500000 and session.calls[0][1]['permanent'] == 1
+
+    job_fetcher.fetch_jobs_from_adzuna('python')
+    assert len(session.calls) == 2
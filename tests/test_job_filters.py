@@ -0,0 +1,91 @@
+from datetime import datetime, timezone
+
+import pytest
+
+import job_store
+from conftest import make_job
+from job_filters import JobFilters, category_tag
+
+NOW = datetime(2026, 3, 1, tzinfo=timezone.utc)
+
+
+def jobs():
+    return [
+        make_job('1', 'python developer posting 1', location='Pune, India', salary_max=900000.0, contract_type='permanent',
+                 category={'label': 'IT Jobs'}, created='2026-02-27T10:00:00Z'),
+        make_job('2', 'python developer posting 2', location='London, UK', salary_max=900000.0, contract_type='permanent',
+                 category={'label': 'IT Jobs'}, created='2026-02-27T10:00:00Z'),
+        make_job('3', 'python developer posting 3', location='Delhi, India', salary_max=300000.0, contract_type='permanent',
+                 category={'label': 'IT Jobs'}, created='2026-02-27T10:00:00Z'),
+        make_job('4', 'python developer posting 4', location='Delhi, India', salary_max=800000.0, contract_type='contract',
+                 category={'label': 'IT Jobs'}, created='2026-02-27T10:00:00Z'),
+        make_job('5', 'python developer posting 5', location='Delhi, India', salary_max=800000.0, contract_type='permanent',
+                 category={'label': 'Sales Jobs'}, created='2026-02-27T10:00:00Z'),
+        make_job('6', 'python developer posting 6', location='Delhi, India', salary_max=800000.0, contract_type='permanent',
+                 category={'label': 'IT Jobs'}, created='2025-12-01T10:00:00Z'),
+    ]
+
+
+FILTERS = dict(salary_min=500000, contract_type='permanent', category='IT Jobs', max_days_old=14, now=NOW)
+
+
+def test_each_stage_removes_its_postings_and_is_counted():
+    stats = {}
+    keep = JobFilters(**FILTERS).apply(jobs(), stats)
+    assert keep == [0]
+    assert stats['filtered'] == {'location': 1, 'salary': 1, 'contract_type': 1, 'category': 1, 'recency': 1}
+
+
+def test_default_filter_keeps_only_the_home_country():
+    assert JobFilters().apply(jobs()) == [0, 2, 3, 4, 5]
+    assert JobFilters(location=None).apply(jobs()) == list(range(6))
+    with pytest.raises(ValueError):
+        JobFilters(contract_type='gig')
+
+
+def test_adzuna_params():
+    assert JobFilters().adzuna_params() == {}
+    assert JobFilters(location='Bangalore', **FILTERS).adzuna_params() == {
+        'where': 'bangalore', 'salary_min': 500000, 'permanent': 1, 'category': 'it-jobs', 'max_days_old': 14}
+    assert category_tag('Accounting & Finance Jobs') == 'accounting-finance-jobs'
+
+
+def test_store_queries_apply_filters_before_scoring(isolated_caches, stub_model, stub_extractor):
+    path = str(isolated_caches / 'users.db')
+    job_store.sync('python', stub_model, fetch=lambda role, **kwargs: jobs(), path=path)
+    filters = JobFilters(**FILTERS)
+
+    loaded, vectors = job_store.load_candidates('python', path=path, filters=filters)
+    assert [job['id'] for job in loaded] == ['1'] and len(vectors) == 1
+    found, _ = job_store.search_candidates(stub_model.encode(['python developer'])[0], 'python', k=5,
+                                           path=path, filters=filters)
+    assert [job['id'] for job in found] == ['1']
+
+
+def test_filtered_sync_sends_params_and_keeps_role_schedule(isolated_caches, stub_model, stub_extractor):
+    path = str(isolated_caches / 'users.db')
+    seen = []
+
+    def fetch(role, max_days_old=None, pages=1, params=None):
+        seen.append((max_days_old, params))
+        return jobs()[:1]
+
+    job_store.sync('python', stub_model, fetch=fetch, path=path, filters=JobFilters(**FILTERS))
+    assert seen == [(14, {'salary_min': 500000, 'permanent': 1, 'category': 'it-jobs'})]
+    assert not job_store.is_fresh('python', path=path)
+
+
+def test_match_jobs_never_scores_filtered_postings(isolated_caches, monkeypatch, stub_extractor):
+    import app
+    import models
+    from conftest import StubModel
+    stub = StubModel()
+    monkeypatch.setattr(models, 'get_embedder', lambda *args, **kwargs: stub)
+    stats = {}
+
+    matched = app.match_jobs(['python'], jobs(), similarity_threshold=0, filters=JobFilters(**FILTERS),
+                             stats=stats)
+    assert [job['location'] for job in matched] == ['Pune, India']
+    encoded = {text for batch in stub.calls for text in batch}
+    assert not {job['description'] for job in jobs()[1:]} & encoded
+    assert stats['filtered']['threshold'] == 0
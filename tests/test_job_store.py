@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+import job_store
+from conftest import make_job
+
+pytestmark = pytest.mark.usefixtures('stub_extractor')
+
+
+def test_sync_upserts_dedupes_and_only_encodes_new(isolated_caches, stub_model):
+    path = str(isolated_caches / 'users.db')
+    batches = [
+        [make_job('1', 'python django developer'), make_job('2', 'java spring engineer'),
+         make_job('3', 'java spring engineer')],
+        [make_job('1', 'python django developer'), make_job('4', 'react frontend engineer')],
+    ]
+    seen_max_days = []
+
+    def fetch(role, max_days_old=None, pages=1):
+        seen_max_days.append(max_days_old)
+        return batches.pop(0)
+
+    first = job_store.sync('Python Developer', stub_model, fetch=fetch, path=path)
+    assert first == {'role': 'python developer', 'fetched': 3, 'new': 2, 'encoded': 2, 'skills': 2}
+
+    second = job_store.sync('python  developer', stub_model, fetch=fetch, path=path)
+    assert second['new'] == 1 and second['encoded'] == 1
+    assert seen_max_days[0] is None and seen_max_days[1] == 2
+
+    jobs, vectors = job_store.load_candidates('python developer', path=path)
+    assert sorted(job['id'] for job in jobs) == ['1', '2', '4']
+    assert vectors.shape == (3, stub_model.dim)
+    assert vectors.dtype == np.float32
+    assert all(job['tfidf_terms'] for job in jobs)
+
+
+def test_changed_posting_is_reencoded(isolated_caches, stub_model):
+    path = str(isolated_caches / 'users.db')
+    with job_store.closing(job_store.connect(path)) as conn:
+        job_store.upsert_jobs(conn, [make_job('1', 'python developer')], 'dev')
+        assert job_store.encode_missing(conn, stub_model) == 1
+        job_store.upsert_jobs(conn, [make_job('1', 'python developer')], 'dev')
+        assert job_store.encode_missing(conn, stub_model) == 0
+        job_store.upsert_jobs(conn, [make_job('1', 'senior python developer')], 'dev')
+        assert job_store.encode_missing(conn, stub_model) == 1
+
+
+def test_load_candidates_empty_role(isolated_caches):
+    jobs, vectors = job_store.load_candidates('nobody', path=str(isolated_caches / 'users.db'))
+    assert jobs == [] and vectors.shape == (0, 0)
+
+
+def test_search_candidates_uses_index_with_role_filter(isolated_caches, stub_model):
+    path = str(isolated_caches / 'users.db')
+    python_jobs = [make_job('p1', 'python django developer'), make_job('p2', 'python flask api')]
+    java_jobs = [make_job('j1', 'java spring developer'), make_job('p1', 'python django developer')]
+
+    job_store.sync('python', stub_model, fetch=lambda role, **kwargs: python_jobs, path=path)
+    job_store.sync('java', stub_model, fetch=lambda role, **kwargs: java_jobs, path=path)
+
+    query = stub_model.encode('python django developer')
+    jobs, vectors = job_store.search_candidates(query, 'python', k=5, path=path)
+    assert [job['id'] for job in jobs] == ['p1', 'p2']
+    assert vectors.shape == (2, stub_model.dim)
+
+    jobs, _ = job_store.search_candidates(query, 'java', k=5, path=path)
+    assert [job['id'] for job in jobs] == ['p1', 'j1']
+
+    job_store.delete_jobs(['p1'], path=path)
+    jobs, _ = job_store.search_candidates(query, 'java', k=5, path=path)
+    assert [job['id'] for job in jobs] == ['j1']
+
+
+def test_lexical_candidates_follow_sync(isolated_caches, stub_model):
+    path = str(isolated_caches / 'users.db')
+    jobs = [make_job('p1', 'python django developer'), make_job('p2', 'react frontend'),
+            make_job('p3', 'python data pipelines')]
+    job_store.sync('python', stub_model, fetch=lambda role, **kwargs: jobs, path=path)
+
+    found, vectors = job_store.lexical_candidates('senior python django', 'python', k=2, path=path)
+    assert [job['id'] for job in found] == ['p1', 'p3']
+    assert vectors.shape == (2, stub_model.dim)
+    assert job_store.lexical_candidates('python', 'java', k=2, path=path)[0] == []
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+import keywords
+import models
+from vector_index import normalize
+
+
+@pytest.fixture
+def registry_model(stub_model, isolated_caches, monkeypatch):
+    monkeypatch.setattr(models, 'get_embedder', lambda *args, **kwargs: stub_model)
+    return stub_model
+
+
+def test_keywords_come_from_each_document(registry_model):
+    texts = ["python developer building data pipelines", "registered nurse in intensive care", "the and of"]
+    found = keywords.extract_keywords_many(texts, top_n=5)
+
+    assert len(found) == 3
+    assert found[2] == []
+    for text, doc_keywords in zip(texts, found):
+        assert all(set(phrase.split()) <= set(text.split()) for phrase, _ in doc_keywords)
+    assert len(found[0]) == 5
+    scores = [score for _, score in found[0]]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_stacked_scores_match_pairwise_loop(registry_model):
+    resume = [("python", 0.9), ("sql", 0.8), ("data pipelines", 0.7)]
+    jobs = [
+        [("python", 0.9)],
+        [("nursing", 0.9), ("patient care", 0.8), ("icu", 0.7), ("shifts", 0.6)],
+        [],
+        [("sql", 0.8), ("python developer", 0.5)],
+    ]
+    scores = keywords.keyword_similarity(resume, jobs)
+
+    resume_vecs = normalize(registry_model.encode([phrase for phrase, _ in resume]))
+    for job, score in zip(jobs, scores):
+        if not job:
+            assert score == 0
+            continue
+        job_vecs = normalize(registry_model.encode([phrase for phrase, _ in job]))
+        assert np.isclose(score, (resume_vecs @ job_vecs.T).max(axis=1).mean(), atol=1e-5)
+
+
+def test_keyword_signal_joins_hybrid_score(registry_model, monkeypatch):
+    import resume_matcher_utils
+    jobs = ["python sql developer", "registered nurse"]
+    base = resume_matcher_utils.hybrid_scores("python developer", jobs)
+    blended = resume_matcher_utils.hybrid_scores("python developer", jobs, keyword_weight=0.5)
+
+    expected = 0.5 * base + 0.5 * keywords.keyword_scores("python developer", jobs)
+    assert np.allclose(blended, expected, atol=1e-5)
@@ -0,0 +1,57 @@
+import os
+import threading
+from functools import partial
+
+import pytest
+from werkzeug.serving import make_server
+
+import loadtest
+
+
+def test_summary_counts_only_complete_flows():
+    ok_flow = [('register', 0.01, True), ('login', 0.02, True), ('upload', 0.1, True), ('results', 1.0, True)]
+    failed_flow = [('register', 0.01, True), ('login', 0.5, False)]
+    report = loadtest.summarize([ok_flow, ok_flow, failed_flow], elapsed=2.0)
+    assert report['completed'] == 2 and report['flows_per_s'] == 1.0
+    assert report['steps']['login']['count'] == 3 and report['steps']['login']['errors'] == 1
+    assert report['flow']['p50_ms'] == pytest.approx(1130.0)
+    assert 'results' in report['steps'] and report['steps']['results']['count'] == 2
+
+
+@pytest.mark.skipif(not os.path.exists('/proc/self/stat'), reason="needs /proc")
+def test_memory_sampler_sees_the_process_tree():
+    sampler = loadtest.MemorySampler(os.getpid())
+    sampler.sample()
+    report = sampler.report()
+    assert report['processes'][0]['role'] == 'master'
+    assert report['total_rss_mb'] > 0
+
+
+def test_flows_run_end_to_end(isolated_caches, tmp_path, monkeypatch, stub_extractor):
+    import app as app_module
+    import match_queue
+    import pdf_text
+    import resume_profiles
+    import user_store
+
+    db = str(tmp_path / 'users.db')
+    for module, names in ((user_store, ('add_user', 'authenticate')),
+                          (match_queue, ('enqueue', 'get_task', 'run_one')),
+                          (resume_profiles, ('save_profile', 'new_matches'))):
+        for name in names:
+            monkeypatch.setattr(module, name, partial(getattr(module, name), path=db))
+    monkeypatch.setattr(match_queue, 'WORKERS', 0)
+    monkeypatch.setattr(pdf_text, 'extract_text', lambda data, filename=None, digest=None: data.decode())
+    monkeypatch.setattr(app_module.job_store, 'is_fresh', lambda role: False)
+    monkeypatch.setattr(app_module, 'run_match_task', lambda payload: {
+        'matched_jobs': [], 'message': "No jobs found for this role and filters.", 'category': 'warning'})
+
+    server = make_server('127.0.0.1', 0, app_module.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        report = loadtest.run_load(f"http://127.0.0.1:{server.server_port}", [b"python developer"], users=2,
+                                   flows=3)
+    finally:
+        server.shutdown()
+    assert report['completed'] == 3
+    assert set(report['steps']) == set(loadtest.STEPS)
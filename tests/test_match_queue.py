@@ -0,0 +1,86 @@
+import threading
+
+import pytest
+
+import match_queue
+
+
+@pytest.fixture
+def db(tmp_path):
+    return str(tmp_path / 'users.db')
+
+
+def test_enqueue_claim_and_finish(db):
+    task_id = match_queue.enqueue({'job_role': 'python'}, path=db)
+    assert match_queue.get_task(task_id, path=db)['status'] == match_queue.QUEUED
+
+    assert match_queue.run_one(lambda payload: {'role': payload['job_role']}, path=db)
+    task = match_queue.get_task(task_id, path=db)
+    assert task['status'] == match_queue.DONE
+    assert task['result'] == {'role': 'python'}
+    assert not match_queue.run_one(lambda payload: None, path=db)
+
+
+def test_handler_errors_mark_task_failed(db):
+    task_id = match_queue.enqueue({}, path=db)
+
+    def handler(payload):
+        raise ValueError("bad resume")
+
+    match_queue.run_one(handler, path=db)
+    task = match_queue.get_task(task_id, path=db)
+    assert task['status'] == match_queue.FAILED
+    assert task['error'] == "bad resume"
+
+
+def test_concurrent_claims_hand_out_each_task_once(db):
+    ids = {match_queue.enqueue({'n': i}, path=db) for i in range(20)}
+    claimed = []
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            task = match_queue.claim(path=db)
+            if task is None:
+                return
+            with lock:
+                claimed.append(task[0])
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(claimed) == sorted(ids)
+
+
+def test_stale_running_tasks_are_retried_then_failed(db, monkeypatch):
+    task_id = match_queue.enqueue({}, path=db)
+    assert match_queue.claim(path=db)[0] == task_id
+    assert match_queue.claim(path=db) is None
+
+    clock = [match_queue.time.time() + match_queue.TASK_TIMEOUT + 1]
+    monkeypatch.setattr(match_queue.time, 'time', lambda: clock[0])
+    assert match_queue.claim(path=db)[0] == task_id
+
+    clock[0] += match_queue.TASK_TIMEOUT + 1
+    assert match_queue.claim(path=db) is None
+    assert match_queue.get_task(task_id, path=db)['status'] == match_queue.FAILED
+
+
+def test_worker_process_runs_tasks(db):
+    task_id = match_queue.enqueue({'x': 2}, path=db)
+    workers = match_queue.start_workers('tests.test_match_queue:double', processes=1, path=db)
+    try:
+        for _ in range(100):
+            if match_queue.get_task(task_id, path=db)['status'] == match_queue.DONE:
+                break
+            match_queue.time.sleep(0.05)
+        assert match_queue.get_task(task_id, path=db)['result'] == {'x': 4}
+    finally:
+        for worker in workers:
+            worker.terminate()
+
+
+def double(payload):
+    return {'x': payload['x'] * 2}
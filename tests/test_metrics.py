@@ -0,0 +1,90 @@
+import json
+import time
+
+import metrics
+
+
+def read_log():
+    with open(metrics.REQUEST_LOG, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = metrics.Registry()
+    for value in (0.003, 0.02, 0.02, 40.0):
+        registry.observe('stage_seconds', value, stage='score')
+    registry.inc('jobs_scored_total', 5)
+    text = registry.render()
+
+    assert '# TYPE stage_seconds histogram' in text
+    assert 'stage_seconds_bucket{stage="score",le="0.005"} 1' in text
+    assert 'stage_seconds_bucket{stage="score",le="0.025"} 3' in text
+    assert 'stage_seconds_bucket{stage="score",le="30.0"} 3' in text
+    assert 'stage_seconds_bucket{stage="score",le="+Inf"} 4' in text
+    assert 'stage_seconds_count{stage="score"} 4' in text
+    assert '# TYPE jobs_scored_total counter' in text
+    assert 'jobs_scored_total 5' in text
+
+
+def test_record_collects_spans_and_counts_into_one_log_line():
+    with metrics.record('task', 'match', role='python developer'):
+        with metrics.span('encode'):
+            pass
+        with metrics.span('encode'):
+            pass
+        metrics.inc('cache_requests_total', cache='result', result='miss')
+        metrics.inc('jobs_scored_total', 7)
+    with metrics.span('outside'):
+        pass
+
+    [entry] = read_log()
+    assert entry['kind'] == 'task' and entry['name'] == 'match' and entry['role'] == 'python developer'
+    assert set(entry['spans']) == {'encode'}
+    assert entry['counts'] == {'cache_requests_total.result.miss': 1, 'jobs_scored_total': 7}
+    assert metrics.active() is None
+    assert 'stage_seconds_count{stage="outside"} 1' in metrics.render()
+
+
+def test_render_sums_snapshots_of_other_processes():
+    metrics.inc('jobs_scored_total', 3)
+    metrics.flush(force=True)
+    other = metrics.Registry()
+    other.inc('jobs_scored_total', 4)
+    other.observe('task_seconds', 0.2, task='match')
+    with open(f"{metrics.METRICS_DIR}/1-1.json", 'w', encoding='utf-8') as f:
+        json.dump(other.snapshot(), f)
+
+    text = metrics.render()
+    assert 'jobs_scored_total 7' in text
+    assert 'task_seconds_count{task="match"} 1' in text
+
+
+def test_slow_records_dump_collapsed_stacks(monkeypatch):
+    monkeypatch.setattr(metrics, 'PROFILE_SLOW_MS', 20.0)
+    monkeypatch.setattr(metrics, 'PROFILE_INTERVAL', 0.001)
+
+    def busy_stage():
+        deadline = time.perf_counter() + 0.1
+        while time.perf_counter() < deadline:
+            sum(range(1000))
+
+    with metrics.record('http', 'results'):
+        busy_stage()
+
+    [entry] = read_log()
+    with open(entry['profile'], encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    assert lines and all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
+    assert any('test_metrics.py:busy_stage' in line for line in lines)
+
+
+def test_requests_are_logged_and_exposed(monkeypatch):
+    import app as app_module
+    client = app_module.app.test_client()
+    assert client.get('/login').status_code == 200
+
+    response = client.get('/metrics')
+    assert response.mimetype == 'text/plain'
+    assert 'http_request_seconds_bucket{endpoint="login",le="+Inf"} 1' in response.get_data(as_text=True)
+    [entry] = [entry for entry in read_log() if entry['name'] == 'login']
+    assert entry['status'] == 200 and entry['method'] == 'GET' and entry['path'] == '/login'
@@ -0,0 +1,55 @@
+import subprocess
+import sys
+import threading
+
+import models
+
+
+def test_models_load_once_on_first_use(monkeypatch):
+    monkeypatch.setattr(models, '_models', {})
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return object()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(models._get(('embedder', 'x'), loader)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(loads) == 1
+    assert all(result is results[0] for result in results)
+    assert models.loaded() == [('embedder', 'x')]
+
+
+def test_hybrid_scores_use_registry_model(stub_model, isolated_caches, monkeypatch):
+    import resume_matcher_utils
+    monkeypatch.setattr(models, 'get_embedder', lambda *args, **kwargs: stub_model)
+
+    jobs = ["python django developer", "registered nurse", "python data engineer"]
+    scores = resume_matcher_utils.hybrid_scores("python developer", jobs)
+
+    assert scores.shape == (3,)
+    assert scores[1] < scores[0] and scores[1] < scores[2]
+    assert stub_model.calls
+
+
+def test_entry_points_do_not_load_models_on_import():
+    code = ("import sys, models, resume_utils, job_store, match_queue; "
+            "print('resume_matcher' in sys.modules, models.loaded())")
+    out = subprocess.run([sys.executable, '-c', code], cwd=models.os.path.dirname(models.__file__),
+                         capture_output=True, text=True, check=True).stdout.split()
+    assert out == ['False', '[]']
+
+
+def test_startup_report_measures_fresh_interpreters():
+    rows = models.startup_report(['text_utils'], preload_models=(False,))
+
+    assert len(rows) == 1
+    assert rows[0]['entry_point'] == 'text_utils'
+    assert rows[0]['import_s'] >= 0
+    assert rows[0]['max_rss_mb'] > 0
@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+import onnx_backend
+from onnx_backend import OnnxEncoder, length_buckets, mean_pool
+
+
+class FakeTokenizer:
+    # Whitespace tokenizer with the call signature of a Hugging Face tokenizer
+    do_lower_case = True
+
+    def __call__(self, texts, padding=False, truncation=False, max_length=None, return_tensors=None):
+        ids = [[hash(word) % 997 + 1 for word in text.split()][:max_length] or [1] for text in texts]
+        if not padding:
+            return {'input_ids': ids}
+        width = max(len(row) for row in ids)
+        input_ids = np.array([row + [0] * (width - len(row)) for row in ids])
+        mask = np.array([[1] * len(row) + [0] * (width - len(row)) for row in ids])
+        return {'input_ids': input_ids, 'attention_mask': mask, 'token_type_ids': np.zeros_like(mask)}
+
+
+class FakeInput:
+    def __init__(self, name):
+        self.name = name
+
+
+class FakeSession:
+    # "Hidden state" of a token is a fixed random vector for its id
+    def __init__(self, dim=8):
+        self.table = np.random.default_rng(0).normal(size=(1000, dim)).astype(np.float32)
+        self.widths = []
+
+    def get_inputs(self):
+        return [FakeInput('input_ids'), FakeInput('attention_mask')]
+
+    def run(self, outputs, feeds):
+        self.widths.append(feeds['input_ids'].shape[1])
+        return [self.table[feeds['input_ids']]]
+
+
+def test_buckets_group_similar_lengths():
+    buckets = length_buckets([3, 50, 4, 48, 5, 47], batch_size=3)
+    assert [sorted(bucket.tolist()) for bucket in buckets] == [[1, 3, 5], [0, 2, 4]]
+
+
+def test_mean_pool_ignores_padding_and_normalises():
+    hidden = np.array([[[1.0, 0.0], [3.0, 0.0], [100.0, 100.0]]], dtype=np.float32)
+    pooled = mean_pool(hidden, np.array([[1, 1, 0]]))
+    assert np.allclose(pooled, [[1.0, 0.0]])
+
+
+def test_encoder_restores_input_order_and_cuts_padding():
+    session = FakeSession()
+    encoder = OnnxEncoder(session, FakeTokenizer(), max_seq_length=64)
+    texts = ["a b", "w " * 40, "c d e", "x " * 38, "f", "y " * 39]
+
+    vectors = encoder.encode(texts, batch_size=3)
+    for text, vector in zip(texts, vectors):
+        alone = encoder.encode([text], batch_size=1)[0]
+        assert np.allclose(vector, alone, atol=1e-6)
+    # Two buckets: the long texts together and the short ones together
+    assert session.widths[:2] == [40, 3]
+    assert encoder.encode("a b").shape == (8,)
+
+
+def test_threads_are_split_between_workers(monkeypatch):
+    monkeypatch.setattr(onnx_backend.os, 'cpu_count', lambda: 8)
+    assert onnx_backend.thread_count(4) == 2
+    assert onnx_backend.thread_count(16) == 1
+
+
+TEXTS = [
+    "python developer building django rest apis", "java spring boot microservices engineer",
+    "registered nurse intensive care unit", "data analyst sql tableau dashboards",
+    "machine learning engineer pytorch deep learning", "frontend react typescript developer",
+    "devops engineer kubernetes terraform aws", "accountant financial reporting excel",
+    "mobile ios swift developer", "data engineer spark airflow pipelines",
+    "customer support representative", "project manager agile scrum delivery",
+    "android kotlin developer", "security analyst incident response",
+]
+
+
+@pytest.fixture(scope='module')
+def torch_model():
+    sentence_transformers = pytest.importorskip('sentence_transformers')
+    pytest.importorskip('onnxruntime')
+    return sentence_transformers.SentenceTransformer('all-MiniLM-L6-v2')
+
+
+@pytest.mark.parametrize('quantized,tolerance', [(False, 1e-3), (True, 0.05)])
+def test_onnx_parity_with_pytorch(torch_model, tmp_path_factory, quantized, tolerance):
+    root = str(tmp_path_factory.getbasetemp() / 'onnx')
+    encoder = OnnxEncoder.load('all-MiniLM-L6-v2', quantized=quantized, root=root)
+    result = onnx_backend.compare(torch_model, encoder, TEXTS, TEXTS, k=10)
+
+    assert result['max_abs_error'] < tolerance
+    assert result['top10_overlap'] == 1.0
+    if not quantized:
+        assert result['top10_exact'] == 1.0
@@ -0,0 +1,82 @@
+import pytest
+
+import pdf_text
+
+
+@pytest.fixture
+def text_cache(tmp_path, monkeypatch):
+    cache = pdf_text.TextCache(str(tmp_path / 'texts'))
+    monkeypatch.setattr(pdf_text, '_cache', cache)
+    return cache
+
+
+def make_pdf(pages):
+    fitz = pytest.importorskip('fitz')
+    doc = fitz.open()
+    for i in range(pages):
+        doc.new_page().insert_text((72, 72), f"Page {i} python sql")
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def test_plain_text_uploads_are_decoded(text_cache):
+    assert pdf_text.extract_text(b"Python developer\nSQL", 'resume.txt') == "Python developer\nSQL"
+
+
+def test_limits_are_enforced(text_cache, monkeypatch):
+    with pytest.raises(pdf_text.ExtractionError):
+        pdf_text.extract_text(b"")
+    monkeypatch.setattr(pdf_text, 'MAX_BYTES', 10)
+    with pytest.raises(pdf_text.ExtractionError, match="larger"):
+        pdf_text.extract_text(b"x" * 11)
+
+
+def test_repeat_uploads_hit_the_cache(text_cache, monkeypatch):
+    calls = []
+    monkeypatch.setattr(pdf_text, 'extract_pdf', lambda data: calls.append(data) or "parsed text")
+    data = b"%PDF-1.7 fake body"
+
+    assert pdf_text.extract_text(data) == "parsed text"
+    assert pdf_text.extract_text(data) == "parsed text"
+    assert len(calls) == 1
+
+    # A fresh process only has the disk tier
+    monkeypatch.setattr(pdf_text, '_cache', pdf_text.TextCache(text_cache.directory))
+    assert pdf_text.extract_text(data) == "parsed text"
+    assert len(calls) == 1
+
+
+def test_sweep_evicts_expired_then_least_recently_used(tmp_path):
+    import os
+    cache = pdf_text.TextCache(str(tmp_path / 'texts'), ttl=100, max_bytes=25)
+    for i, digest in enumerate(('a' * 64, 'b' * 64, 'c' * 64, 'd' * 64)):
+        cache.put(digest, "x" * 10)
+        os.utime(cache._path(digest), (1000 + i * 10, 1000 + i * 10))
+    # 'a' is past the ttl; of the rest, 'b' is least recently used
+    assert cache.sweep(now=1101) == 2
+    assert sorted(path.name[0] for path in (tmp_path / 'texts').rglob('*.txt')) == ['c', 'd']
+    assert cache.sweep(now=1101) == 0
+
+
+def test_page_ranges_cover_every_page_once():
+    ranges = pdf_text._page_ranges(23, 4)
+    assert ranges[0][0] == 0 and ranges[-1][1] == 23
+    assert sum(stop - start for start, stop in ranges) == 23
+    assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+
+
+def test_parallel_extraction_matches_serial(text_cache, monkeypatch):
+    data = make_pdf(12)
+    monkeypatch.setattr(pdf_text, 'POOL_WORKERS', 3)
+    serial = pdf_text.extract_pdf(data, parallel=False)
+
+    assert pdf_text.extract_pdf(data) == serial
+    assert "Page 11 python sql" in serial
+
+
+def test_page_limit(text_cache, monkeypatch):
+    data = make_pdf(3)
+    monkeypatch.setattr(pdf_text, 'MAX_PAGES', 2)
+    with pytest.raises(pdf_text.ExtractionError, match="3 pages"):
+        pdf_text.extract_text(data)
@@ -0,0 +1,116 @@
+import io
+from functools import partial
+
+import pytest
+
+import result_cache
+from result_cache import ResultCache, make_key
+
+
+def test_key_depends_on_every_part():
+    base = make_key('abc', 'python developer', 'v1', '10:5')
+    assert base == make_key('abc', 'python developer', 'v1', '10:5')
+    assert len({base, make_key('abd', 'python developer', 'v1', '10:5'),
+                make_key('abc', 'java developer', 'v1', '10:5'),
+                make_key('abc', 'python developer', 'v2', '10:5'),
+                make_key('abc', 'python developer', 'v1', '11:5')}) == 5
+
+
+def test_entries_expire_after_ttl(tmp_path):
+    cache = ResultCache(str(tmp_path), ttl=60)
+    cache.put('k' * 64, {'matched_jobs': [1]}, now=1000)
+    assert cache.get('k' * 64, now=1030) == ({'matched_jobs': [1]}, 1000)
+    assert cache.get('k' * 64, now=1061) is None
+    assert not list(tmp_path.rglob('*.json'))
+
+
+def test_memory_tier_is_bounded_and_disk_tier_survives(tmp_path):
+    cache = ResultCache(str(tmp_path), memory_entries=2)
+    for i in range(5):
+        cache.put(f"{i:064d}", {'n': i})
+    assert len(cache._memory) == 2
+
+    fresh = ResultCache(str(tmp_path))
+    result, stored_at = fresh.get(f"{0:064d}")
+    assert result == {'n': 0}
+    assert fresh.stats()['hits'] == 1
+
+
+def test_sweep_removes_expired_files(tmp_path):
+    cache = ResultCache(str(tmp_path), ttl=60)
+    cache.put('a' * 64, {}, now=1000)
+    cache.put('b' * 64, {}, now=1100)
+    assert cache.sweep(now=1090) == 1
+    assert cache.get('b' * 64, now=1100) is not None
+
+
+@pytest.fixture
+def client(isolated_caches, tmp_path, monkeypatch, stub_extractor):
+    import app as app_module
+    import job_store
+    import match_queue
+    import pdf_text
+
+    import models
+    import resume_profiles
+    import user_store
+    from conftest import StubModel
+
+    db = str(tmp_path / 'users.db')
+    stub = StubModel()
+    monkeypatch.setattr(models, 'get_embedder', lambda *args, **kwargs: stub)
+    for name in ('save_profile', 'new_matches'):
+        monkeypatch.setattr(resume_profiles, name, partial(getattr(resume_profiles, name), path=db))
+    monkeypatch.setattr(match_queue, 'WORKERS', 0)
+    for name in ('enqueue', 'get_task', 'run_one'):
+        monkeypatch.setattr(match_queue, name, partial(getattr(match_queue, name), path=db))
+    monkeypatch.setattr(result_cache, '_cache', ResultCache(str(tmp_path / 'results')))
+    monkeypatch.setattr(pdf_text, 'extract_text', lambda data, filename=None, digest=None: data.decode())
+    corpus = {'version': '1'}
+    monkeypatch.setattr(job_store, 'ensure_fresh', lambda role: None)
+    monkeypatch.setattr(job_store, 'is_fresh', lambda role: True)
+    monkeypatch.setattr(job_store, 'corpus_version', lambda role: corpus['version'])
+    calls = []
+    monkeypatch.setattr(app_module, 'compute_match', lambda resume, role, filters=None: calls.append(resume.text) or {
+        'matched_jobs': [{'title': 'Python Engineer', 'location': 'Pune, India', 'description': 'python',
+                          'similarity': 80.0, 'matched_skills': [], 'redirect_url': '#'}],
+        'message': None, 'category': None})
+
+    app_module.app.config['TESTING'] = True
+    for name in ('add_user', 'authenticate'):
+        monkeypatch.setattr(user_store, name, partial(getattr(user_store, name), path=db))
+    user_store.add_user('a', 'a@b.c', 'pw', 'India')
+    client = app_module.app.test_client()
+    client.post('/login', data={'email': 'a@b.c', 'password': 'pw'})
+    client.calls = calls
+    client.corpus = corpus
+    return client
+
+
+def upload(client, text=b"python developer"):
+    return client.post('/index', data={'job_role': 'Python Developer',
+                                       'resume': (io.BytesIO(text), 'resume.pdf')})
+
+
+def test_results_revalidate_with_304(client):
+    upload(client)
+    first = client.get('/results')
+    assert first.status_code == 200
+    assert first.headers['ETag'] and first.headers['Last-Modified']
+
+    again = client.get('/results', headers={'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304
+    assert client.calls == ["python developer"]
+
+
+def test_repeat_upload_reuses_result_until_corpus_changes(client):
+    upload(client)
+    etag = client.get('/results').headers['ETag']
+    upload(client)
+    assert client.get('/results').headers['ETag'] == etag
+    assert len(client.calls) == 1
+
+    client.corpus['version'] = '2'
+    upload(client)
+    assert client.get('/results').headers['ETag'] != etag
+    assert len(client.calls) == 2
@@ -0,0 +1,78 @@
+import json
+from functools import partial
+
+import numpy as np
+import pytest
+
+import result_cache
+from conftest import StubModel, make_job
+from job_filters import JobFilters
+
+DESCRIPTIONS = ['java spring backend', 'python sql data engineer', 'python developer',
+                'sql analyst reporting', 'python sql pipelines airflow', 'sales manager']
+
+
+@pytest.fixture
+def streaming(isolated_caches, monkeypatch, stub_extractor):
+    import app
+    import job_store
+    import models
+    stub = StubModel()
+    monkeypatch.setattr(models, 'get_embedder', lambda *args, **kwargs: stub)
+    monkeypatch.setattr(result_cache, '_cache', result_cache.ResultCache(str(isolated_caches / 'results')))
+    import resume_profiles
+    monkeypatch.setattr(resume_profiles, 'save_profile',
+                        partial(resume_profiles.save_profile, path=str(isolated_caches / 'users.db')))
+    monkeypatch.setattr(job_store, 'ensure_fresh', lambda role: None)
+    monkeypatch.setattr(job_store, 'corpus_version', lambda role: '1')
+    jobs = [make_job(str(i), text) for i, text in enumerate(DESCRIPTIONS)]
+    prepared = []
+
+    def prepare(resume, job_role, filters):
+        prepared.append(resume.text)
+        return resume.skills, resume.skills_embedding[None, :], jobs, stub.encode([job['description'] for job in jobs])
+
+    monkeypatch.setattr(app, 'prepare_match', prepare)
+    app.prepared = prepared
+    return app
+
+
+def events(app, resume="python sql"):
+    return list(app.stream_match(resume, 'hash', 'Python', JobFilters(location=None), batch_size=2))
+
+
+def test_best_first_pass_candidates_arrive_first(streaming):
+    streamed = events(streaming)
+    assert streamed[-1][0] == 'done'
+    matches = [data for event, data in streamed if event == 'match']
+    final = streamed[-1][1]['matched_jobs']
+    assert matches[0] == final[0]
+    assert sorted(job['similarity'] for job in matches) == sorted(job['similarity'] for job in final)
+
+
+def test_finished_stream_is_replayed_from_cache(streaming):
+    first = events(streaming)
+    second = events(streaming)
+    assert len(streaming.prepared) == 1
+    assert second[-1] == first[-1]
+
+
+def test_sse_endpoint_and_time_to_first_result(streaming, monkeypatch):
+    import pdf_text
+    monkeypatch.setattr(pdf_text.get_cache(), 'get', lambda digest: "python sql")
+    monkeypatch.setattr(streaming, 'stream_timings', streaming.deque(maxlen=10))
+    client = streaming.app.test_client()
+    with client.session_transaction() as session:
+        session.update({'user_email': 'a@b.c', 'job_role': 'Python', 'uploaded_resume': 'hash',
+                        'filters': {'location': None}})
+
+    response = client.get('/results/stream')
+    assert response.mimetype == 'text/event-stream'
+    body = response.get_data(as_text=True)
+    blocks = [block.split('\n') for block in body.strip().split('\n\n')]
+    assert blocks[0][0] == 'event: match' and blocks[-1][0] == 'event: done'
+    assert json.loads(blocks[-1][1][len('data: '):])['count'] > 0
+
+    stats = client.get('/results/stream/stats').get_json()
+    assert stats['streams'] == 1
+    assert stats['time_to_first_result_ms']['p50'] <= stats['total_ms']['p50']
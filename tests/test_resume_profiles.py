@@ -0,0 +1,69 @@
+import pytest
+
+import job_store
+import resume_profiles
+from conftest import make_job
+
+pytestmark = pytest.mark.usefixtures('stub_extractor')
+
+
+def sync(path, model, role, jobs):
+    return job_store.sync(role, model, fetch=lambda role, **kwargs: jobs, path=path)
+
+
+def save(path, model, email, role, text, filters=None, matches=()):
+    resume_profiles.save_profile(email, 'hash-' + email, role, filters or {'location': None}, text.split(),
+                                 model.encode([text])[0], matches, path=path)
+
+
+def test_new_postings_are_scored_against_saved_profiles(isolated_caches, stub_model):
+    path = str(isolated_caches / 'users.db')
+    sync(path, stub_model, 'python', [make_job('1', 'python django developer')])
+    save(path, stub_model, 'a@x', 'python', 'python django', matches=[('1', 80.0)])
+    save(path, stub_model, 'b@x', 'java', 'python django')
+
+    sync(path, stub_model, 'python', [make_job('2', 'python django rest apis'), make_job('3', 'sales manager')])
+    new = resume_profiles.new_matches('a@x', path=path)
+    assert [row['id'] for row in new] == ['2']
+    # The posting belongs to another role than b@x's profile
+    assert resume_profiles.new_matches('b@x', path=path) == []
+    # Seen once shown
+    assert resume_profiles.new_matches('a@x', path=path) == []
+
+
+def test_only_new_rows_are_encoded_and_scored(isolated_caches, stub_model, monkeypatch):
+    path = str(isolated_caches / 'users.db')
+    sync(path, stub_model, 'python', [make_job('1', 'python django developer')])
+    save(path, stub_model, 'a@x', 'python', 'python django')
+    scored = []
+    rematch = resume_profiles.rematch
+    monkeypatch.setattr(resume_profiles, 'rematch', lambda conn, ids: scored.append(list(ids)) or rematch(conn, ids))
+
+    sync(path, stub_model, 'python', [make_job('1', 'python django developer'), make_job('2', 'python flask')])
+    assert scored == [['2']]
+
+
+def test_top_k_list_is_bounded_and_keeps_the_best(isolated_caches, stub_model, monkeypatch):
+    path = str(isolated_caches / 'users.db')
+    monkeypatch.setattr(resume_profiles, 'THRESHOLD', 0.0)
+    sync(path, stub_model, 'python', [make_job('0', 'python')])
+    save(path, stub_model, 'a@x', 'python', 'python django flask')
+
+    with job_store.closing(job_store.connect(path)) as conn:
+        job_store.upsert_jobs(conn, [make_job(str(i), text) for i, text in
+                                     enumerate(['python django flask', 'python django', 'python', 'java'], 1)],
+                              'python')
+        job_store.encode_missing(conn, stub_model)
+        added = resume_profiles.rematch(conn, ['1', '2', '3', '4'], top_k=2, threshold=0.0)
+    assert added == {'a@x': 2}
+    assert [row['id'] for row in resume_profiles.new_matches('a@x', path=path)] == ['1', '2']
+
+
+def test_profile_filters_apply_to_new_postings(isolated_caches, stub_model):
+    path = str(isolated_caches / 'users.db')
+    sync(path, stub_model, 'python', [make_job('1', 'python django developer')])
+    save(path, stub_model, 'a@x', 'python', 'python django', filters={'location': 'india'})
+
+    sync(path, stub_model, 'python', [make_job('2', 'python django apis', location='Berlin, Germany'),
+                                      make_job('3', 'python django services', location='Pune, India')])
+    assert [row['id'] for row in resume_profiles.new_matches('a@x', path=path)] == ['3']
@@ -0,0 +1,57 @@
+import pytest
+
+import job_store
+import skills
+from conftest import StubSkillExtractor, make_job
+
+
+def test_taxonomy_reads_aliases_and_skips_comments(tmp_path):
+    path = tmp_path / 'skills.txt'
+    path.write_text("# comment\nPython\nJavaScript | JS | ECMAScript\n\nPython | py\n")
+
+    taxonomy = skills.load_taxonomy(str(path))
+
+    assert list(taxonomy) == ['Python', 'JavaScript']
+    assert taxonomy['JavaScript'] == ['JavaScript', 'JS', 'ECMAScript']
+    assert taxonomy['Python'] == ['Python', 'py']
+
+
+def test_phrase_matcher_folds_case_and_maps_aliases():
+    pytest.importorskip('spacy')
+    extractor = skills.SkillExtractor({
+        'Machine Learning': ['Machine Learning', 'ML'],
+        'JavaScript': ['JavaScript', 'JS'],
+        'R': ['R'],
+        'SQL': ['SQL'],
+    })
+
+    found = extractor.extract("Built machine learning models; wrote js and sql. r was not used, R was.")
+    assert found == ['Machine Learning', 'JavaScript', 'R', 'SQL']
+    assert extractor.extract("the candidate is a team player") == []
+
+    batch = extractor.extract_many(["ML engineer", "", "SQL analyst"])
+    assert batch == [['Machine Learning'], [], ['SQL']]
+
+
+def test_masks_intersect_to_shared_skills():
+    extractor = StubSkillExtractor({'Python': ['Python'], 'SQL': ['SQL'], 'Docker': ['Docker']})
+    resume = extractor.mask(['Python', 'SQL'])
+    job = extractor.mask(['SQL', 'Docker'])
+
+    assert extractor.names(resume & job) == ['SQL']
+    assert (resume & job).bit_count() == 1
+
+
+def test_stored_jobs_are_tagged_once_per_taxonomy(isolated_caches, stub_model, stub_extractor):
+    path = str(isolated_caches / 'users.db')
+    jobs = [make_job('1', 'python and sql developer'), make_job('2', 'docker kubernetes engineer')]
+    job_store.sync('dev', stub_model, fetch=lambda role, **kwargs: jobs, path=path)
+
+    stored, _ = job_store.load_candidates('dev', path=path)
+    assert {job['id']: job['skills'] for job in stored} == {'1': ['Python', 'SQL'], '2': ['Docker', 'Kubernetes']}
+
+    with job_store.closing(job_store.connect(path)) as conn:
+        assert job_store.extract_missing_skills(conn) == 0
+        stub_extractor.version = 'stub-2'
+        assert job_store.extract_missing_skills(conn) == 2
+    assert len(stub_extractor.batches) == 2
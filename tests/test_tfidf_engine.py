@@ -0,0 +1,45 @@
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+
+import tfidf_engine
+from tfidf_engine import TfidfScorer, get_scorer
+
+JOBS = [
+    'python developer with django and sql',
+    'java backend engineer spring boot',
+    'data scientist python machine learning sql',
+    'frontend engineer react javascript',
+]
+
+
+def test_score_matches_pairwise_cosine():
+    scorer = TfidfScorer().fit(JOBS)
+    resume = 'python sql machine learning'
+    scores = scorer.score(resume, JOBS)
+    expected = [cosine_similarity(scorer.transform([resume]), scorer.transform([job]))[0][0] for job in JOBS]
+    assert np.allclose(scores, expected)
+    assert int(np.argmax(scores)) == 2
+
+
+def test_save_and_load_roundtrip(tmp_path):
+    path = str(tmp_path / 'tfidf.pkl')
+    scorer = TfidfScorer().fit(JOBS)
+    scorer.save(path)
+    loaded = TfidfScorer.load(path)
+    assert np.allclose(loaded.score('react javascript', JOBS), scorer.score('react javascript', JOBS))
+
+
+def test_get_scorer_fits_once_and_persists(tmp_path, monkeypatch):
+    path = str(tmp_path / 'tfidf.pkl')
+    monkeypatch.setattr(tfidf_engine, '_scorer', None)
+    scorer = get_scorer(JOBS, path=path)
+    assert scorer.is_fitted
+    assert get_scorer(['unrelated corpus'], path=path) is scorer
+
+    monkeypatch.setattr(tfidf_engine, '_scorer', None)
+    reloaded = get_scorer(path=path)
+    assert reloaded.vectorizer.vocabulary_ == scorer.vectorizer.vocabulary_
+
+
+def test_empty_job_list_scores_empty():
+    assert TfidfScorer().fit(JOBS).score('python', []).shape == (0,)
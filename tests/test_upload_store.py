@@ -0,0 +1,73 @@
+import io
+from functools import partial
+
+import pytest
+from flask import Flask, request
+from werkzeug.datastructures import FileStorage
+
+import pdf_text
+import result_cache
+import upload_store
+
+
+@pytest.fixture
+def text_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_text, '_cache', pdf_text.TextCache(str(tmp_path / 'texts')))
+    monkeypatch.setattr(upload_store, 'start_sweeper', partial(upload_store.start_sweeper, interval=0))
+
+
+def upload(data, filename='resume.txt'):
+    return FileStorage(io.BytesIO(data), filename=filename)
+
+
+def test_identical_uploads_share_one_entry(text_cache, monkeypatch):
+    calls = []
+    monkeypatch.setattr(pdf_text, 'extract_pdf', lambda data: calls.append(data) or "parsed text")
+    first = upload_store.receive(upload(b"%PDF-1.7 body", 'cv.pdf'))
+    second = upload_store.receive(upload(b"%PDF-1.7 body", 'other-name.pdf'))
+    assert first == second == (pdf_text.content_hash(b"%PDF-1.7 body"), "parsed text")
+    assert len(calls) == 1
+
+
+def test_oversized_uploads_are_refused(text_cache, monkeypatch):
+    monkeypatch.setattr(pdf_text, 'MAX_BYTES', 100)
+    monkeypatch.setattr(upload_store, 'READ_CHUNK', 16)
+    with pytest.raises(pdf_text.ExtractionError, match="larger"):
+        upload_store.receive(upload(b"x" * 101))
+    assert upload_store.receive(upload(b"x" * 100))[1] == "x" * 100
+
+
+def test_request_body_over_the_limit_gets_a_message(monkeypatch):
+    monkeypatch.setattr(pdf_text, 'MAX_BYTES', 1024)
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    upload_store.configure(app)
+
+    @app.route('/upload', methods=['GET', 'POST'])
+    def handle():
+        if request.method == 'POST':
+            return type(request.files['resume'].stream).__name__
+        return "form"
+
+    client = app.test_client()
+    small = client.post('/upload', data={'resume': (io.BytesIO(b"x" * 10), 'cv.pdf')})
+    assert small.get_data(as_text=True) == 'SpooledTemporaryFile'
+    big = client.post('/upload', data={'resume': (io.BytesIO(b"x" * 200_000), 'cv.pdf')})
+    assert big.status_code == 302
+    with client.session_transaction() as session:
+        assert "larger than" in session['_flashes'][0][1]
+
+
+def test_two_stage_results_are_cached_by_content_hash(tmp_path, monkeypatch):
+    import resume_matcher_utils
+    calls = []
+    monkeypatch.setattr(result_cache, '_cache', result_cache.ResultCache(str(tmp_path / 'results')))
+    monkeypatch.setattr(resume_matcher_utils.job_store, 'ensure_fresh', lambda role: None)
+    monkeypatch.setattr(resume_matcher_utils.job_store, 'corpus_version', lambda role: '1')
+    monkeypatch.setattr(resume_matcher_utils, 'two_stage_match', lambda text, role, **kwargs: calls.append(text) or (
+        [{'title': 'Data Engineer', 'similarity': 55.0}], {'rerank_ms': 1.0}))
+
+    first = resume_matcher_utils.cached_two_stage_match('h' * 64, "resume", 'Data Engineer')
+    again = resume_matcher_utils.cached_two_stage_match('h' * 64, "resume", 'data engineer ')
+    assert first[0] == again[0] and again[1] == {'cached': True}
+    assert calls == ["resume"]
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from vector_index import BruteForceIndex, IVFIndex, normalize, synthetic_vectors, top_k_indices
+
+
+@pytest.fixture
+def data():
+    vectors = synthetic_vectors(3000, dim=32, clusters=40, seed=1)
+    return [str(i) for i in range(len(vectors))], vectors
+
+
+def test_top_k_indices_matches_full_sort():
+    scores = np.random.default_rng(0).normal(size=500)
+    assert list(top_k_indices(scores, 10)) == list(np.argsort(-scores)[:10])
+    assert list(top_k_indices(scores[:5], 10)) == list(np.argsort(-scores[:5]))
+
+
+def test_exact_search_matches_numpy(data):
+    ids, vectors = data
+    index = BruteForceIndex(32)
+    index.add(ids, vectors)
+    query = vectors[7]
+    expected = np.argsort(-(normalize(vectors) @ normalize(query)[0]))[:5]
+    assert [item_id for item_id, _ in index.search(query, 5)] == [ids[i] for i in expected]
+
+
+def test_ivf_recall_against_exact(data):
+    ids, vectors = data
+    exact = BruteForceIndex(32)
+    exact.add(ids, vectors)
+    ivf = IVFIndex(32, nlist=16, nprobe=8)
+    ivf.add(ids, vectors)
+    assert ivf.is_trained
+
+    recall = []
+    for query in vectors[:50]:
+        truth = {item_id for item_id, _ in exact.search(query, 10)}
+        found = {item_id for item_id, _ in ivf.search(query, 10)}
+        recall.append(len(truth & found) / 10)
+    assert np.mean(recall) >= 0.9
+
+
+@pytest.mark.parametrize('factory', [lambda: BruteForceIndex(32), lambda: IVFIndex(32, nlist=16, nprobe=16)])
+def test_filters_delete_and_reinsert(data, factory):
+    ids, vectors = data
+    index = factory()
+    metadata = [{'roles': ['python developer' if i % 2 else 'java developer']} for i in range(len(ids))]
+    index.add(ids, vectors, metadata)
+
+    hits = index.search(vectors[1], 10, filters={'roles': 'python developer'})
+    assert len(hits) == 10
+    assert all(int(item_id) % 2 == 1 for item_id, _ in hits)
+    assert hits[0][0] == '1'
+
+    index.remove(['1'])
+    assert '1' not in index
+    assert '1' not in [item_id for item_id, _ in index.search(vectors[1], 10)]
+
+    # Deleting most rows triggers compaction without losing the survivors
+    index.remove(ids[2:2500])
+    assert len(index) == len(ids) - 2499
+    index.add(['1'], vectors[1:2], [{'roles': ['python developer']}])
+    assert index.search(vectors[1], 1)[0][0] == '1'
+
+
+@pytest.mark.parametrize('factory', [lambda: BruteForceIndex(32), lambda: IVFIndex(32, nlist=16, nprobe=4)])
+def test_save_and_load(tmp_path, data, factory):
+    ids, vectors = data
+    index = factory()
+    index.add(ids, vectors, [{'n': i} for i in range(len(ids))])
+    path = str(tmp_path / 'index.npz')
+    index.save(path)
+
+    loaded = BruteForceIndex.load(path)
+    assert type(loaded) is type(index)
+    assert len(loaded) == len(index)
+    assert loaded.metadata['5'] == {'n': 5}
+    for query in vectors[:5]:
+        assert loaded.search(query, 5) == index.search(query, 5)
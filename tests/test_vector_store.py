@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from vector_index import normalize, synthetic_vectors
+from vector_store import VectorStore, accuracy_report, write_store
+
+
+@pytest.fixture
+def data():
+    vectors = synthetic_vectors(520, dim=64, clusters=20)
+    return [f"job-{i}" for i in range(500)], vectors[:500], vectors[500:]
+
+
+@pytest.mark.parametrize('dtype,tolerance', [('float32', 1e-6), ('float16', 2e-3), ('int8', 1e-2)])
+def test_quantized_scores_stay_close_to_float32(tmp_path, data, dtype, tolerance):
+    ids, vectors, queries = data
+    store = write_store(str(tmp_path / dtype), ids, vectors, dtype)
+
+    assert store.vectors.dtype == np.dtype(dtype)
+    assert isinstance(store.vectors, np.memmap)
+    exact = normalize(queries) @ normalize(vectors).T
+    assert np.abs(store.scores(queries, block_rows=64) - exact).max() < tolerance
+    assert np.allclose(store.vectors_for(['job-7', 'job-3']), normalize(vectors)[[7, 3]], atol=tolerance)
+    assert store.search(vectors[42], k=1)[0][0] == 'job-42'
+
+
+def test_rewrite_switches_generation_and_prunes_old_files(tmp_path, data):
+    ids, vectors, _ = data
+    directory = str(tmp_path / 'store')
+    first = write_store(directory, ids, vectors, 'int8')
+    for _ in range(3):
+        latest = write_store(directory, ids[:10], vectors[:10], 'int8')
+
+    assert len(VectorStore(directory)) == 10
+    assert latest.generation != first.generation
+    # Current and previous generations only: vectors + scales each
+    assert len(list((tmp_path / 'store').glob('*.npy'))) == 4
+    # A store opened before the rewrites keeps reading its own mapping
+    assert len(first) == 500 and first.scores(vectors[:1]).shape == (1, 500)
+
+
+def test_accuracy_report_rows(tmp_path, data):
+    ids, vectors, queries = data
+    rows = {row['dtype']: row for row in accuracy_report(vectors, queries, k=5, directory=str(tmp_path))}
+
+    assert rows['float32']['recall@5'] == 1.0 and rows['float32']['max_abs_error'] == 0.0
+    assert rows['float16']['bytes_per_vector'] == 128
+    assert rows['int8']['bytes_per_vector'] == 68
+    assert rows['int8']['recall@5'] >= 0.9
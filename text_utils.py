@@ -0,0 +1,13 @@
+import re
+
+# Compiled once; clean_text runs on every resume and posting
+CAMEL_CASE = re.compile(r"([a-z])([A-Z])")
+NON_ALNUM = re.compile(r"[^a-zA-Z0-9\s]")
+WHITESPACE = re.compile(r"\s+")
+
+
+def clean_text(text):
+    text = CAMEL_CASE.sub(r"\1 \2", text)
+    text = NON_ALNUM.sub(" ", text)
+    text = WHITESPACE.sub(" ", text).strip()
+    return text.lower()
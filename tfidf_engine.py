@@ -0,0 +1,87 @@
+import os
+import pickle
+import threading
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+# TF-IDF fitted once over the job corpus and persisted, so IDF weights come
+# from real postings instead of a two-document resume/job pair.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TFIDF_PATH = os.environ.get('TFIDF_MODEL_PATH', os.path.join(BASE_DIR, 'tfidf.pkl'))
+
+
+class TfidfScorer:
+    def __init__(self, vectorizer=None):
+        self.vectorizer = vectorizer
+
+    @property
+    def is_fitted(self):
+        return self.vectorizer is not None and hasattr(self.vectorizer, 'idf_')
+
+    def fit(self, corpus):
+        self.vectorizer = TfidfVectorizer().fit(list(corpus))
+        return self
+
+    def transform(self, texts):
+        return self.vectorizer.transform(list(texts))
+
+    def score_matrix(self, resume_text, job_matrix):
+        # Rows are L2-normalised, so one sparse mat-vec gives every cosine
+        resume_vec = self.transform([resume_text])
+        return np.asarray((job_matrix @ resume_vec.T).todense()).ravel()
+
+    def score(self, resume_text, job_texts):
+        job_texts = list(job_texts)
+        if not job_texts:
+            return np.zeros(0)
+        return self.score_matrix(resume_text, self.transform(job_texts))
+
+    def save(self, path=TFIDF_PATH):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(self.vectorizer, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=TFIDF_PATH):
+        with open(path, 'rb') as f:
+            return cls(pickle.load(f))
+
+
+_scorer = None
+_scorer_lock = threading.Lock()
+
+
+def fit_scorer(corpus, path=None):
+    global _scorer
+    scorer = TfidfScorer().fit(corpus)
+    scorer.save(path or TFIDF_PATH)
+    with _scorer_lock:
+        _scorer = scorer
+    return scorer
+
+
+def get_scorer(corpus=None, path=None):
+    # Loads the persisted scorer; the first caller with a corpus fits it
+    global _scorer
+    path = path or TFIDF_PATH
+    with _scorer_lock:
+        if _scorer is None and os.path.exists(path):
+            try:
+                _scorer = TfidfScorer.load(path)
+            except Exception as e:
+                print(f"Error loading TF-IDF model: {e}")
+        scorer = _scorer
+    corpus = [text for text in corpus or [] if text and text.strip()]
+    if scorer is None and corpus:
+        scorer = fit_scorer(corpus, path)
+    return scorer
+
+
+def pair_similarity(text1, text2):
+    # Falls back to the old two-document fit until a corpus model exists
+    scorer = get_scorer()
+    if scorer is None:
+        scorer = TfidfScorer().fit([text1, text2])
+    return float(scorer.score(text1, [text2])[0])
@@ -0,0 +1,78 @@
+import hashlib
+import os
+import tempfile
+import threading
+
+from flask import Request, flash, redirect, request
+
+import pdf_text
+
+# Resume uploads for app.py, resume_matcher.py and resume_utils.py. Nothing
+# is written under a user-supplied name: the body is spooled in memory (up
+# to SPOOL_BYTES, then a temporary file), requests over the size limit are
+# refused before they are read, and the content sha256 is the key of the
+# extracted text, so a resume uploaded again is only a lookup. A background
+# thread keeps the text cache within its TTL and byte budget.
+SPOOL_BYTES = int(os.environ.get('UPLOAD_SPOOL_BYTES', 1024 * 1024))
+FORM_OVERHEAD = 64 * 1024   # multipart headers and the other form fields
+READ_CHUNK = 64 * 1024
+SWEEP_INTERVAL = int(os.environ.get('UPLOAD_SWEEP_INTERVAL', 600))
+
+_sweeper = {'pid': None}
+_sweeper_lock = threading.Lock()
+
+
+class UploadRequest(Request):
+    # Werkzeug spools files over 500 KB to disk; keep resumes in memory
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+
+
+def too_large(error):
+    flash(f"The resume is larger than {pdf_text.MAX_BYTES // (1024 * 1024)} MB.", "danger")
+    return redirect(request.url)
+
+
+def configure(app):
+    app.request_class = UploadRequest
+    app.config['MAX_CONTENT_LENGTH'] = pdf_text.MAX_BYTES + FORM_OVERHEAD
+    app.register_error_handler(413, too_large)
+
+
+def receive(file_storage):
+    # (content hash, extracted text); raises pdf_text.ExtractionError
+    start_sweeper()
+    digest = hashlib.sha256()
+    chunks = []
+    size = 0
+    while True:
+        chunk = file_storage.stream.read(READ_CHUNK)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > pdf_text.MAX_BYTES:
+            raise pdf_text.ExtractionError(f"The resume is larger than {pdf_text.MAX_BYTES // (1024 * 1024)} MB.")
+        digest.update(chunk)
+        chunks.append(chunk)
+    data = b"".join(chunks)
+    resume_hash = digest.hexdigest()
+    return resume_hash, pdf_text.extract_text(data, file_storage.filename, digest=resume_hash)
+
+
+def start_sweeper(interval=SWEEP_INTERVAL):
+    # Started on the first upload, so a preforking server's master (which
+    # takes none) does not fork with the thread running
+    with _sweeper_lock:
+        if _sweeper['pid'] == os.getpid() or not interval:
+            return
+        _sweeper['pid'] = os.getpid()
+    threading.Thread(target=_sweep_loop, args=(interval,), name='upload-sweeper', daemon=True).start()
+
+
+def _sweep_loop(interval):
+    stop = threading.Event()
+    while not stop.wait(interval):
+        try:
+            pdf_text.get_cache().sweep()
+        except Exception as e:
+            print(f"Resume text sweep failed: {e}")
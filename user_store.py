@@ -0,0 +1,54 @@
+import os
+import sqlite3
+from contextlib import closing
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# Accounts for app.py, in the users table of users.db. Every web worker
+# process reads the same table, so a user registered by one worker can log
+# in through any other. Passwords are stored as salted hashes.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.environ.get('USERS_DB', os.path.join(BASE_DIR, 'users.db'))
+
+
+def connect(path=DB_PATH):
+    conn = sqlite3.connect(path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode=WAL')
+    init_users(conn)
+    return conn
+
+
+def init_users(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS users
+                    (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                     username TEXT UNIQUE NOT NULL,
+                     email TEXT UNIQUE NOT NULL,
+                     password TEXT NOT NULL,
+                     country TEXT)''')
+    conn.commit()
+
+
+def add_user(username, email, password, country, path=DB_PATH):
+    # False if the username or email is already registered
+    with closing(connect(path)) as conn:
+        try:
+            conn.execute('INSERT INTO users (username, email, password, country) VALUES (?, ?, ?, ?)',
+                         (username, email, generate_password_hash(password), country))
+        except sqlite3.IntegrityError:
+            return False
+        conn.commit()
+    return True
+
+
+def get_user(email, path=DB_PATH):
+    with closing(connect(path)) as conn:
+        row = conn.execute('SELECT * FROM users WHERE email = ?', (email,)).fetchone()
+    return dict(row) if row else None
+
+
+def authenticate(email, password, path=DB_PATH):
+    user = get_user(email, path)
+    if user and check_password_hash(user['password'], password):
+        return user
+    return None
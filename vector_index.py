@@ -0,0 +1,328 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+# Vector index over job embeddings. BruteForceIndex is the exact NumPy
+# baseline; IVFIndex clusters vectors with spherical k-means and only scans
+# the nprobe closest lists. Both score by cosine (vectors are normalised on
+# insert), support insert/delete and save to a single .npz file.
+
+
+def normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def top_k_indices(scores, k):
+    # argpartition + a sort of only k items instead of sorting everything
+    if k >= len(scores):
+        return np.argsort(-scores)
+    top = np.argpartition(-scores, k)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+def matches_filters(meta, filters):
+    for field, expected in filters.items():
+        value = meta.get(field)
+        if callable(expected):
+            if not expected(value):
+                return False
+        elif isinstance(value, (list, tuple, set)):
+            if expected not in value:
+                return False
+        elif value != expected:
+            return False
+    return True
+
+
+class BruteForceIndex:
+    backend = 'exact'
+    compact_ratio = 0.25   # rebuild once this share of rows is deleted
+
+    def __init__(self, dim):
+        self.dim = dim
+        self._vectors = np.zeros((0, dim), dtype=np.float32)
+        self._alive = np.zeros(0, dtype=bool)
+        self._size = 0
+        self._ids = []
+        self._rows = {}
+        self.metadata = {}
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, item_id):
+        return item_id in self._rows
+
+    def _grow(self, extra):
+        needed = self._size + extra
+        if needed > len(self._vectors):
+            capacity = max(needed, 2 * len(self._vectors), 64)
+            vectors = np.zeros((capacity, self.dim), dtype=np.float32)
+            vectors[:self._size] = self._vectors[:self._size]
+            alive = np.zeros(capacity, dtype=bool)
+            alive[:self._size] = self._alive[:self._size]
+            self._vectors, self._alive = vectors, alive
+
+    def add(self, ids, vectors, metadata=None):
+        ids = list(ids)
+        vectors = normalize(vectors)
+        self.remove([item_id for item_id in ids if item_id in self._rows])
+        self._grow(len(ids))
+        start = self._size
+        self._vectors[start:start + len(ids)] = vectors
+        self._alive[start:start + len(ids)] = True
+        for offset, item_id in enumerate(ids):
+            self._rows[item_id] = start + offset
+            self._ids.append(item_id)
+            self.metadata[item_id] = (metadata[offset] if metadata else None) or {}
+        self._size += len(ids)
+        self._on_add(np.arange(start, start + len(ids)))
+
+    def _on_add(self, rows):
+        pass
+
+    def remove(self, ids):
+        for item_id in ids:
+            row = self._rows.pop(item_id, None)
+            if row is not None:
+                self._alive[row] = False
+                self.metadata.pop(item_id, None)
+        if self._size and (self._size - len(self._rows)) / self._size > self.compact_ratio:
+            self._compact()
+
+    def _compact(self):
+        rows = np.flatnonzero(self._alive[:self._size])
+        ids = [self._ids[row] for row in rows]
+        vectors = self._vectors[rows].copy()
+        metadata = [self.metadata[item_id] for item_id in ids]
+        self._reset()
+        self.add(ids, vectors, metadata)
+
+    def _reset(self):
+        self._vectors = np.zeros((0, self.dim), dtype=np.float32)
+        self._alive = np.zeros(0, dtype=bool)
+        self._size = 0
+        self._ids = []
+        self._rows = {}
+        self.metadata = {}
+
+    def vectors_for(self, ids):
+        return self._vectors[[self._rows[item_id] for item_id in ids]]
+
+    def _candidate_rows(self, query):
+        return None   # every row
+
+    def search(self, query, k=10, filters=None):
+        query = normalize(query)[0]
+        rows = self._candidate_rows(query)
+        if rows is None:
+            # Score the contiguous block in place rather than gathering rows
+            rows = np.flatnonzero(self._alive[:self._size])
+            scores = self._vectors[:self._size] @ query
+            scores = scores if len(rows) == self._size else scores[rows]
+        else:
+            scores = self._vectors[rows] @ query
+        if not len(rows):
+            return []
+        if not filters:
+            top = top_k_indices(scores, k)
+            return [(self._ids[rows[i]], float(scores[i])) for i in top]
+
+        # Walk candidates best-first, widening the window until k pass
+        results = []
+        window = min(len(rows), max(4 * k, 64))
+        order = top_k_indices(scores, window)
+        position = 0
+        while len(results) < k and position < len(rows):
+            if position >= len(order):
+                window = min(len(rows), window * 4)
+                order = top_k_indices(scores, window)
+            item_id = self._ids[rows[order[position]]]
+            if matches_filters(self.metadata[item_id], filters):
+                results.append((item_id, float(scores[order[position]])))
+            position += 1
+        return results
+
+    def _state(self):
+        rows = np.flatnonzero(self._alive[:self._size])
+        ids = [self._ids[row] for row in rows]
+        return {
+            'backend': np.array(self.backend),
+            'dim': np.array(self.dim),
+            'ids': np.array(ids, dtype=str),
+            'vectors': self._vectors[rows],
+            'metadata': np.array(json.dumps([self.metadata[item_id] for item_id in ids])),
+        }
+
+    def save(self, path):
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, **self._state())
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load(path):
+        with np.load(path, allow_pickle=False) as data:
+            backend = str(data['backend'])
+            index = IVFIndex._from_state(data) if backend == IVFIndex.backend else BruteForceIndex(int(data['dim']))
+            ids = [str(item_id) for item_id in data['ids']]
+            if ids:
+                index.add(ids, data['vectors'], json.loads(str(data['metadata'])))
+        return index
+
+
+class IVFIndex(BruteForceIndex):
+    backend = 'ivf'
+    min_train_per_list = 8
+
+    def __init__(self, dim, nlist=64, nprobe=8, train_iterations=10, seed=0):
+        super().__init__(dim)
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_iterations = train_iterations
+        self.seed = seed
+        self.centroids = None
+        self._assignments = np.zeros(0, dtype=np.int32)
+        self._lists = []
+
+    @property
+    def is_trained(self):
+        return self.centroids is not None
+
+    def train(self, vectors=None):
+        if vectors is None:
+            vectors = self._vectors[np.flatnonzero(self._alive[:self._size])]
+        vectors = normalize(vectors)
+        nlist = min(self.nlist, len(vectors))
+        if nlist == 0:
+            return
+        rng = np.random.default_rng(self.seed)
+        sample = vectors[rng.choice(len(vectors), min(len(vectors), 256 * nlist), replace=False)]
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)]
+        for _ in range(self.train_iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = sample[labels == c]
+                if len(members):
+                    centroids[c] = members.mean(axis=0)
+            centroids = normalize(centroids)
+        self.centroids = centroids
+        self._assign_all()
+
+    def _assign_all(self):
+        self._assignments = np.full(len(self._vectors), -1, dtype=np.int32)
+        self._lists = [[] for _ in range(len(self.centroids))]
+        self._on_add(np.arange(self._size))
+
+    def _on_add(self, rows):
+        if len(self._assignments) < len(self._vectors):
+            grown = np.full(len(self._vectors), -1, dtype=np.int32)
+            grown[:len(self._assignments)] = self._assignments
+            self._assignments = grown
+        if not self.is_trained:
+            # Train lazily once there is enough data for meaningful clusters
+            if len(self._rows) >= self.nlist * self.min_train_per_list:
+                self.train()
+            return
+        if not len(rows):
+            return
+        labels = np.argmax(self._vectors[rows] @ self.centroids.T, axis=1)
+        self._assignments[rows] = labels
+        for row, label in zip(rows.tolist(), labels.tolist()):
+            self._lists[label].append(row)
+
+    def _reset(self):
+        super()._reset()
+        self._assignments = np.zeros(0, dtype=np.int32)
+        if self.is_trained:
+            self._lists = [[] for _ in range(len(self.centroids))]
+
+    def _candidate_rows(self, query):
+        if not self.is_trained:
+            return None
+        probes = top_k_indices(self.centroids @ query, self.nprobe)
+        rows = np.fromiter((row for probe in probes for row in self._lists[probe]), dtype=np.int64)
+        return rows[self._alive[rows]]
+
+    def _state(self):
+        state = super()._state()
+        state['centroids'] = self.centroids if self.is_trained else np.zeros((0, self.dim), dtype=np.float32)
+        state['params'] = np.array([self.nlist, self.nprobe, self.train_iterations, self.seed])
+        return state
+
+    @classmethod
+    def _from_state(cls, data):
+        nlist, nprobe, train_iterations, seed = (int(value) for value in data['params'])
+        index = cls(int(data['dim']), nlist, nprobe, train_iterations, seed)
+        if len(data['centroids']):
+            index.centroids = np.array(data['centroids'], dtype=np.float32)
+            index._lists = [[] for _ in range(len(index.centroids))]
+        return index
+
+
+def create_index(dim, backend='exact', **kwargs):
+    if backend == IVFIndex.backend:
+        return IVFIndex(dim, **kwargs)
+    return BruteForceIndex(dim)
+
+
+# --- Recall vs latency report ---
+
+def synthetic_vectors(n, dim=384, clusters=200, seed=0):
+    # Clustered data behaves like real job embeddings far better than noise
+    rng = np.random.default_rng(seed)
+    centers = normalize(rng.normal(size=(clusters, dim)))
+    labels = rng.integers(0, clusters, size=n)
+    return normalize(centers[labels] + rng.normal(scale=1.5 / np.sqrt(dim), size=(n, dim)))
+
+
+def recall_report(vectors, queries, k=10, nlists=(64,), nprobes=(1, 4, 8, 16, 32)):
+    ids = [str(i) for i in range(len(vectors))]
+    exact = BruteForceIndex(vectors.shape[1])
+    exact.add(ids, vectors)
+
+    def timed(index):
+        started = time.perf_counter()
+        results = [[item_id for item_id, _ in index.search(query, k)] for query in queries]
+        return results, (time.perf_counter() - started) * 1000 / len(queries)
+
+    truth, exact_ms = timed(exact)
+    rows = [{'backend': 'exact', 'n': len(vectors), 'recall': 1.0, 'ms_per_query': round(exact_ms, 3)}]
+    for nlist in nlists:
+        ivf = IVFIndex(vectors.shape[1], nlist=nlist)
+        ivf.train(vectors)
+        ivf.add(ids, vectors)
+        for nprobe in nprobes:
+            if nprobe > nlist:
+                continue
+            ivf.nprobe = nprobe
+            found, ms = timed(ivf)
+            recall = np.mean([len(set(a) & set(b)) / k for a, b in zip(found, truth)])
+            rows.append({'backend': f'ivf nlist={nlist} nprobe={nprobe}', 'n': len(vectors),
+                         'recall': round(float(recall), 4), 'ms_per_query': round(ms, 3)})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall vs latency of the IVF index against exact search.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 50000])
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--nlist', type=int, nargs='+', default=[64, 256])
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        vectors = synthetic_vectors(size + args.queries)
+        for row in recall_report(vectors[:size], vectors[size:], args.k, args.nlist):
+            print(json.dumps(row))
+
+
+if __name__ == '__main__':
+    main()
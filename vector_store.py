@@ -0,0 +1,149 @@
+import argparse
+import glob
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from vector_index import normalize, synthetic_vectors, top_k_indices
+
+# Compact on-disk job vectors. A store is a directory holding one contiguous
+# .npy array (float32, float16, or int8 with a float32 scale per vector) and
+# a meta.json with the ids in row order. Arrays are opened with mmap, so every
+# worker process reads the same page-cache pages instead of holding its own
+# copy, and scoring dequantizes one block at a time.
+DTYPES = ('float32', 'float16', 'int8')
+BLOCK_ROWS = 8192
+
+
+def quantize(vectors, dtype):
+    vectors = normalize(vectors)
+    if dtype == 'float32':
+        return vectors, None
+    if dtype == 'float16':
+        return vectors.astype(np.float16), None
+    if dtype == 'int8':
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        return np.round(vectors / scales[:, None]).astype(np.int8), scales.astype(np.float32)
+    raise ValueError(f"Unknown vector dtype: {dtype}")
+
+
+def write_store(directory, ids, vectors, dtype='float16'):
+    # Arrays go to new generation files first; replacing meta.json switches
+    # readers over atomically. The previous generation is kept for readers
+    # that have just read the old meta.json, older ones are removed.
+    os.makedirs(directory, exist_ok=True)
+    data, scales = quantize(vectors, dtype)
+    generation = f"{time.time_ns()}"
+    np.save(os.path.join(directory, f"vectors.{generation}.npy"), data)
+    if scales is not None:
+        np.save(os.path.join(directory, f"scales.{generation}.npy"), scales)
+    meta = {'dtype': dtype, 'dim': int(data.shape[1]) if data.ndim == 2 else 0,
+            'generation': generation, 'ids': [str(item_id) for item_id in ids]}
+    tmp_path = os.path.join(directory, 'meta.json.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, os.path.join(directory, 'meta.json'))
+    generations = sorted({os.path.basename(name).split('.')[1]
+                          for name in glob.glob(os.path.join(directory, '*.npy'))}, key=int)
+    for stale in generations[:-2]:
+        for name in glob.glob(os.path.join(directory, f"*.{stale}.npy")):
+            os.remove(name)
+    return VectorStore(directory)
+
+
+class VectorStore:
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        self.dtype = meta['dtype']
+        self.dim = meta['dim']
+        self.generation = meta['generation']
+        self.ids = meta['ids']
+        self.rows = {item_id: row for row, item_id in enumerate(self.ids)}
+        self.vectors = np.load(os.path.join(directory, f"vectors.{self.generation}.npy"), mmap_mode='r')
+        scales_path = os.path.join(directory, f"scales.{self.generation}.npy")
+        self.scales = np.load(scales_path, mmap_mode='r') if self.dtype == 'int8' else None
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def nbytes(self):
+        return self.vectors.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    def _dequantize(self, start, stop):
+        block = np.asarray(self.vectors[start:stop], dtype=np.float32)
+        if self.scales is not None:
+            block *= self.scales[start:stop, None]
+        return block
+
+    def vectors_for(self, ids):
+        rows = np.array([self.rows[item_id] for item_id in ids], dtype=np.int64)
+        block = np.asarray(self.vectors[rows], dtype=np.float32)
+        if self.scales is not None:
+            block *= self.scales[rows, None]
+        return block
+
+    def iter_blocks(self, block_rows=BLOCK_ROWS):
+        # (first row, float32 block) pairs; only one block is ever expanded
+        for start in range(0, len(self.ids), block_rows):
+            stop = min(start + block_rows, len(self.ids))
+            yield start, self._dequantize(start, stop)
+
+    def scores(self, queries, block_rows=BLOCK_ROWS):
+        # Cosine scores of (Q, dim) queries against every stored vector
+        queries = normalize(queries)
+        out = np.empty((len(queries), len(self.ids)), dtype=np.float32)
+        for start, block in self.iter_blocks(block_rows):
+            out[:, start:start + len(block)] = queries @ block.T
+        return out
+
+    def search(self, query, k=10):
+        scores = self.scores(query)[0]
+        return [(self.ids[i], float(scores[i])) for i in top_k_indices(scores, k)]
+
+
+# --- Accuracy report ---
+
+def accuracy_report(vectors, queries, k=10, dtypes=DTYPES, directory=None):
+    # Score and top-k agreement of each dtype against float32 on a reference set
+    ids = [str(i) for i in range(len(vectors))]
+    rows = []
+    with tempfile.TemporaryDirectory(dir=directory) as tmp:
+        reference = write_store(os.path.join(tmp, 'float32'), ids, vectors, 'float32')
+        truth = reference.scores(queries)
+        truth_top = [set(top_k_indices(row, k).tolist()) for row in truth]
+        for dtype in dtypes:
+            store = write_store(os.path.join(tmp, dtype), ids, vectors, dtype)
+            started = time.perf_counter()
+            scores = store.scores(queries)
+            ms = (time.perf_counter() - started) * 1000 / len(queries)
+            error = np.abs(scores - truth)
+            recall = np.mean([len(set(top_k_indices(row, k).tolist()) & top) / k
+                              for row, top in zip(scores, truth_top)])
+            rows.append({'dtype': dtype, 'n': len(vectors), 'bytes_per_vector': round(store.nbytes / len(store), 1),
+                         'max_abs_error': round(float(error.max()), 5),
+                         'mean_abs_error': round(float(error.mean()), 6),
+                         f'recall@{k}': round(float(recall), 4), 'ms_per_query': round(ms, 3)})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Accuracy of float16/int8 job vectors against float32.")
+    parser.add_argument('--size', type=int, default=50000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    args = parser.parse_args()
+
+    vectors = synthetic_vectors(args.size + args.queries)
+    for row in accuracy_report(vectors[:args.size], vectors[args.size:], args.k):
+        print(json.dumps(row))
+
+
+if __name__ == '__main__':
+    main()